@@ -1,5 +1,9 @@
+import argparse
+from contextlib import nullcontext
 from pathlib import Path
 
+import pandas as pd
+
 from nautilus_trader.analysis import TearsheetConfig
 from nautilus_trader.backtest.config import (
     BacktestVenueConfig,
@@ -13,16 +17,18 @@ from nautilus_trader.model.data import BarType, Bar
 from nautilus_trader.persistence.catalog import ParquetDataCatalog
 from nautilus_trader.trading.strategy import ImportableStrategyConfig
 from nautilus_trader.analysis.tearsheet import create_tearsheet
-from visualization import ChartBuilder
+from visualization import LOD_MAX_POINTS, ChartBuilder
 
-from strategy.timeframe import Timeframe
+from strategy.timeframe import INTERNAL_AGG_TF, Timeframe
 
-from catalog_setup import BAR_SPEC
+from catalog_setup import BAR_SPEC, bar_ts_range
 from strategy.history import StrategyHistory
+from strategy.latency import LatencyRecorder
+from strategy.tracing import TraceRecorder
 
 ROOT = Path(__file__).parent
 CATALOG_DIR = ROOT / "catalog"
-HISTORY_PATH = ROOT / "history.json"
+HISTORY_PATH = ROOT / "history"
 
 venue = BacktestVenueConfig(
     name="SIM",
@@ -38,56 +44,182 @@ instruments = catalog.instruments()
 
 bar_type = BarType(instruments[0].id, BAR_SPEC)
 
-data = BacktestDataConfig(
-    catalog_path=str(catalog.path),
-    data_cls=Bar,
-    instrument_id=instruments[0].id,
-    start_time="2000-06-19",
-    end_time="2000-06-24",
-)
-
 
-engine_config = BacktestEngineConfig(
-    strategies=[
-        ImportableStrategyConfig(
-            strategy_path="strategy.strategy:ICTStrategy",
-            config_path="strategy.strategy:ICTConfig",
-            config={
-                "instrument_id": instruments[0].id,
-                "history_file": str(HISTORY_PATH),
-            },
+def external_htf_data_configs(
+    start_time: str, end_time: str
+) -> list[BacktestDataConfig]:
+    # Internal aggregation emits its first bar for the interval holding the first
+    # 1-minute bar of the run and its last one for the last 1-minute bar, so the
+    # flat bars padding any gap around them are left out. When the run starts
+    # mid-interval that first bar only covers the minutes inside the run, while
+    # the pre-aggregated one covers its whole interval.
+    ts_range = bar_ts_range(
+        catalog.path,
+        bar_type,
+        pd.Timestamp(start_time).value,
+        pd.Timestamp(end_time).value,
+    )
+    if ts_range is None:
+        return []
+    # Its timers fire in bar type name order (1-DAY before 1-HOUR, ...) after the
+    # 1-minute bar closing them. The engine sorts bars stably, so one data config
+    # per timeframe in that order replays bars sharing a timestamp the same way.
+    return [
+        BacktestDataConfig(
+            catalog_path=str(catalog.path),
+            data_cls=Bar,
+            instrument_id=instruments[0].id,
+            bar_types=[str(tf.to_external_bar_type(instruments[0].id))],
+            start_time=ts_range[0],
+            end_time=ts_range[1],
         )
-    ],
-    logging=LoggingConfig(log_level="ERROR"),
-)
+        for tf in sorted(INTERNAL_AGG_TF, key=lambda tf: tf.value)
+    ]
+
+
+def build_run_config(
+    start_time: str,
+    end_time: str,
+    history_path: Path = HISTORY_PATH,
+    strategy_config: dict | None = None,
+) -> BacktestRunConfig:
+    strategy_config = strategy_config or {}
+    data = [
+        BacktestDataConfig(
+            catalog_path=str(catalog.path),
+            data_cls=Bar,
+            instrument_id=instruments[0].id,
+            bar_types=[str(bar_type)],
+            start_time=start_time,
+            end_time=end_time,
+        )
+    ]
+    if strategy_config.get("external_htf_bars", False):
+        data += external_htf_data_configs(start_time, end_time)
+
+    engine_config = BacktestEngineConfig(
+        strategies=[
+            ImportableStrategyConfig(
+                strategy_path="strategy.strategy:ICTStrategy",
+                config_path="strategy.strategy:ICTConfig",
+                config={
+                    "instrument_id": instruments[0].id,
+                    "history_file": str(history_path),
+                    **strategy_config,
+                },
+            )
+        ],
+        logging=LoggingConfig(log_level="ERROR"),
+    )
+
+    return BacktestRunConfig(
+        engine=engine_config,
+        venues=[venue],
+        data=data,
+    )
 
-config = BacktestRunConfig(
-    engine=engine_config,
-    venues=[venue],
-    data=[data],
-)
-node = BacktestNode(configs=[config])
 
 if __name__ == "__main__":
-    results = node.run()
+    parser = argparse.ArgumentParser(description="Backtest the ICT strategy")
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        help="write a Chrome trace-event JSON of the run to this file",
+    )
+    parser.add_argument(
+        "--trace-sample-every",
+        type=int,
+        default=1,
+        help="keep every n-th bar handler call in the trace",
+    )
+    parser.add_argument(
+        "--latency-stats",
+        type=Path,
+        help="time the strategy's handlers and detectors, print a summary and "
+        "write the histograms to this JSON file",
+    )
+    parser.add_argument(
+        "--detail-window",
+        nargs=2,
+        metavar=("START", "END"),
+        help="show the chart's bars at full resolution only in this window",
+    )
+    parser.add_argument(
+        "--max-points",
+        type=int,
+        default=LOD_MAX_POINTS,
+        help="candles per timeframe outside the detail window",
+    )
+    parser.add_argument(
+        "--full-resolution",
+        action="store_true",
+        help="ship every bar of every timeframe in the chart",
+    )
+    args = parser.parse_args()
+
+    strategy_config = {}
+    if args.trace is not None:
+        strategy_config = {
+            "trace_file": str(args.trace),
+            "trace_sample_every": args.trace_sample_every,
+        }
+    if args.latency_stats is not None:
+        strategy_config["latency_stats_file"] = str(args.latency_stats)
+    # Post-processing spans are added to the strategy's trace once it is written
+    tracer = None if args.trace is None else TraceRecorder()
+
+    def span(name: str):
+        return nullcontext() if tracer is None else tracer.span(name)
+
+    node = BacktestNode(
+        configs=[
+            build_run_config(
+                "2000-06-19", "2000-06-24", strategy_config=strategy_config
+            )
+        ]
+    )
+    with span("BacktestNode.run"):
+        results = node.run()
 
     engine: BacktestEngine = node.get_engine(results[0].run_config_id)
-
-    history = StrategyHistory.load_from_json_file(str(HISTORY_PATH))
-
-    chart = ChartBuilder(engine=engine, base_bar_type=bar_type, title="ICT Strategy")
-    chart.add_timeframes(list(Timeframe), instruments[0].id)
-    chart.add_sessions(history)
-    chart.add_key_levels(history)
-    chart.add_confluences(history)
-    chart.save("bars_with_fills.html")
+    # The strategy logs its latency summary, below the backtest's log level
+    if args.latency_stats is not None:
+        print(LatencyRecorder.read(args.latency_stats).summary())
+
+    with span("StrategyHistory.load"):
+        history = StrategyHistory.load_from_file(str(HISTORY_PATH))
+
+    with span("ChartBuilder"):
+        chart = ChartBuilder(
+            engine=engine,
+            base_bar_type=bar_type,
+            title="ICT Strategy",
+            lod=not args.full_resolution,
+            max_points=args.max_points,
+            detail_window=args.detail_window,
+            catalog_path=CATALOG_DIR,
+        )
+        with span("ChartBuilder.add_timeframes"):
+            chart.add_timeframes(list(Timeframe), instruments[0].id)
+        with span("ChartBuilder.add_sessions"):
+            chart.add_sessions(history)
+        with span("ChartBuilder.add_key_levels"):
+            chart.add_key_levels(history)
+        with span("ChartBuilder.add_confluences"):
+            chart.add_confluences(history)
+        with span("ChartBuilder.save"):
+            chart.save("bars_with_fills.html")
 
     config = TearsheetConfig(
         charts=["bars_with_fills"],
         theme="nautilus_dark",
     )
 
-    create_tearsheet(
-        engine=engine,
-        config=config,
-    )
+    with span("create_tearsheet"):
+        create_tearsheet(
+            engine=engine,
+            config=config,
+        )
+
+    if tracer is not None:
+        tracer.write(args.trace, append=True)
@@ -0,0 +1,108 @@
+"""
+Per-bar dispatch overhead of ``ICTStrategy.on_bar``.
+
+Compares a ``BarType`` equality chain, as ``on_bar`` was before the routing
+table, with the specification-keyed routing table over every 1-minute bar in
+the catalog. Handlers are replaced with no-ops. Both paths read the bar into a
+``RawBar`` and append it to its timeframe's buffer before calling the handler,
+so they do the same work besides routing. That work is timed on its own too,
+to show how much of a bar it takes.
+
+Run from the repository root:
+
+    python -m benchmarks.bar_dispatch
+"""
+
+import time
+from pathlib import Path
+
+from nautilus_trader.model.data import Bar, BarType
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+from catalog_setup import BAR_SPEC
+from strategy.bar import RawBar
+from strategy.strategy import ICTStrategy, ICTConfig
+from strategy.timeframe import Timeframe
+
+ROOT = Path(__file__).parent.parent
+CATALOG_DIR = ROOT / "catalog"
+
+
+class NoopStrategy(ICTStrategy):
+    def _handle_minutely_bar(self, bar: RawBar):
+        pass
+
+    def _handle_minute5ly_bar(self, bar: RawBar):
+        pass
+
+    def _handle_minute15ly_bar(self, bar: RawBar):
+        pass
+
+    def _handle_hour1ly_bar(self, bar: RawBar):
+        pass
+
+    def _handle_hour4ly_bar(self, bar: RawBar):
+        pass
+
+    def _handle_daily_bar(self, bar: RawBar):
+        pass
+
+
+def legacy_on_bar(strategy: ICTStrategy, bar: Bar):
+    """An if-chain ``on_bar``, as before the routing table, over every timeframe."""
+
+    def handle(timeframe: Timeframe, handler) -> None:
+        if bar.bar_type == strategy.bar_types[timeframe]:
+            raw_bar = RawBar.from_bar(bar)
+            strategy.bar_buffers[timeframe].append(raw_bar)
+            handler(raw_bar)
+
+    handle(Timeframe.ONE_MINUTE, strategy._handle_minutely_bar)
+    handle(Timeframe.FIVE_MINUTE, strategy._handle_minute5ly_bar)
+    handle(Timeframe.FIFTEEN_MINUTE, strategy._handle_minute15ly_bar)
+    handle(Timeframe.ONE_HOUR, strategy._handle_hour1ly_bar)
+    handle(Timeframe.FOUR_HOUR, strategy._handle_hour4ly_bar)
+    handle(Timeframe.ONE_DAY, strategy._handle_daily_bar)
+
+
+def buffer_bar(strategy: ICTStrategy, bar: Bar):
+    """The work both paths do for a 1-minute bar besides routing it."""
+    strategy.bar_buffers[Timeframe.ONE_MINUTE].append(RawBar.from_bar(bar))
+
+
+def time_per_bar(fn, bars: list[Bar], repeat: int = 1) -> float:
+    """The fastest of ``repeat`` passes over ``bars``."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for bar in bars:
+            fn(bar)
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(bars)
+
+
+if __name__ == "__main__":
+    catalog = ParquetDataCatalog(CATALOG_DIR)
+    instrument = catalog.instruments()[0]
+    bar_type = BarType(instrument.id, BAR_SPEC)
+    bars: list[Bar] = catalog.bars([str(bar_type)])
+    print(f"Loaded {len(bars)} 1-minute bars for {instrument.id}")
+
+    strategy = NoopStrategy(
+        ICTConfig(instrument_id=instrument.id, history_file="history.json")
+    )
+
+    paths = {
+        "RawBar + append": lambda b: buffer_bar(strategy, b),
+        "if-chain": lambda b: legacy_on_bar(strategy, b),
+        "routing table": strategy.on_bar,
+    }
+    # Warm up every path once before timing
+    for fn in paths.values():
+        time_per_bar(fn, bars[:1000])
+    times = {name: time_per_bar(fn, bars, repeat=5) for name, fn in paths.items()}
+    for name, ns in times.items():
+        print(f"{name + ':':17}{ns:8.1f} ns/bar")
+
+    print(f"speed-up:        {times['if-chain'] / times['routing table']:8.1f}x")
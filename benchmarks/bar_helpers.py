@@ -0,0 +1,101 @@
+"""
+``Price``-based bar helpers versus their ``RawBar`` counterparts.
+
+Runs the per-bar work the strategy handlers do with the helpers (pivot checks
+against the previous bar, picking the extreme bar, running high/low) over a
+year of 1-minute bars, once on ``Bar`` and once on ``RawBar``. The raw path is
+timed with and without building the ``RawBar`` views, which ``on_bar`` does
+once per bar.
+
+Run from the repository root:
+
+    python -m benchmarks.bar_helpers
+"""
+
+import time
+from pathlib import Path
+
+from nautilus_trader.model.data import Bar, BarType
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+from catalog_setup import BAR_SPEC
+from strategy.bar import (
+    RawBar,
+    bar_is_high,
+    bar_is_low,
+    bar_max_high,
+    bar_min_low,
+    raw_bar_is_high,
+    raw_bar_is_low,
+    raw_bar_max_high,
+    raw_bar_min_low,
+)
+
+ROOT = Path(__file__).parent.parent
+CATALOG_DIR = ROOT / "catalog"
+YEAR_NS = 365 * 24 * 60 * 60 * 1_000_000_000
+
+
+def run_price_path(bars: list[Bar]) -> tuple:
+    pivots = 0
+    high = low = None
+    last_bar = bars[0]
+    for bar in bars[1:]:
+        if bar_is_high(last_bar, bar):
+            pivots += bar_max_high(last_bar, bar).ts_init > 0
+        if bar_is_low(last_bar, bar):
+            pivots += bar_min_low(last_bar, bar).ts_init > 0
+        if high is None or bar.high > high:
+            high = bar.high
+        if low is None or bar.low < low:
+            low = bar.low
+        last_bar = bar
+    return pivots, high.raw, low.raw
+
+
+def run_raw_path(bars: list[RawBar]) -> tuple:
+    pivots = 0
+    high = low = None
+    last_bar = bars[0]
+    for bar in bars[1:]:
+        if raw_bar_is_high(last_bar, bar):
+            pivots += raw_bar_max_high(last_bar, bar).ts_init > 0
+        if raw_bar_is_low(last_bar, bar):
+            pivots += raw_bar_min_low(last_bar, bar).ts_init > 0
+        if high is None or bar.high > high:
+            high = bar.high
+        if low is None or bar.low < low:
+            low = bar.low
+        last_bar = bar
+    return pivots, high, low
+
+
+def timed(fn, *args) -> tuple[object, float]:
+    start = time.perf_counter_ns()
+    result = fn(*args)
+    return result, (time.perf_counter_ns() - start) / len(args[0])
+
+
+if __name__ == "__main__":
+    catalog = ParquetDataCatalog(CATALOG_DIR)
+    instrument = catalog.instruments()[0]
+    bar_type = BarType(instrument.id, BAR_SPEC)
+    bars: list[Bar] = catalog.bars([str(bar_type)])
+    year_end = bars[0].ts_event + YEAR_NS
+    bars = [bar for bar in bars if bar.ts_event < year_end]
+    print(f"Loaded {len(bars)} 1-minute bars for {instrument.id}")
+
+    # Warm up both paths once before timing
+    run_price_path(bars[:1000])
+    run_raw_path([RawBar.from_bar(bar) for bar in bars[:1000]])
+
+    price_result, price_ns = timed(run_price_path, bars)
+    raw_bars, build_ns = timed(lambda bs: [RawBar.from_bar(b) for b in bs], bars)
+    raw_result, raw_ns = timed(run_raw_path, raw_bars)
+    assert price_result == raw_result, "paths disagree"
+
+    print(f"Price helpers:      {price_ns:8.1f} ns/bar")
+    print(f"RawBar views:       {build_ns:8.1f} ns/bar")
+    print(f"raw helpers:        {raw_ns:8.1f} ns/bar")
+    print(f"speed-up:           {price_ns / raw_ns:8.1f}x")
+    print(f"incl. views:        {price_ns / (build_ns + raw_ns):8.1f}x")
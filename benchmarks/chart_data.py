@@ -0,0 +1,139 @@
+"""
+Chart candle traces built from ``Bar`` objects versus catalog columns.
+
+For a year of bars of every timeframe in the catalog, builds the candlestick
+traces the way ``ChartBuilder.add_timeframes`` used to (``float(b.open)`` and
+``datetime.fromtimestamp`` per bar, shipped as decimal JSON text) and the way it
+does now (catalog columns into NumPy arrays, epoch-millisecond x values and
+float32 prices, shipped as base64 typed arrays). The ``Bar`` objects are loaded
+up front, as the engine's cache would hold them, while the column path is timed
+including its catalog reads. Both figures must encode the same candles once
+prices are rounded to the instrument's precision. The size of the same traces
+in ``ChartBuilder``'s LOD mode is reported too.
+
+Run from the repository root once ``catalog_setup.py --aggregate`` has run:
+
+    python -m benchmarks.chart_data
+"""
+
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import plotly.graph_objects as go
+from nautilus_trader.model.data import Bar
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+from catalog_setup import catalog_bar_dir
+from strategy.timeframe import Timeframe
+from visualization import (
+    LOD_MAX_POINTS,
+    _ms,
+    _prices,
+    catalog_bar_arrays,
+    lod_ohlc,
+)
+
+ROOT = Path(__file__).parent.parent
+CATALOG_DIR = ROOT / "catalog"
+YEAR_NS = 365 * 24 * 60 * 60 * 1_000_000_000
+
+
+def build_from_bars(bars_by_tf: dict[Timeframe, list[Bar]]) -> go.Figure:
+    fig = go.Figure()
+    for tf, bars in bars_by_tf.items():
+        fig.add_trace(
+            go.Candlestick(
+                x=[
+                    datetime.fromtimestamp(b.ts_init / 1_000_000_000, tz=timezone.utc)
+                    for b in bars
+                ],
+                open=[float(b.open) for b in bars],
+                high=[float(b.high) for b in bars],
+                low=[float(b.low) for b in bars],
+                close=[float(b.close) for b in bars],
+                name=tf.value,
+            )
+        )
+    return fig
+
+
+def build_from_columns(
+    bar_types: dict, start: int, end: int, lod: bool = False
+) -> go.Figure:
+    fig = go.Figure()
+    fig.update_xaxes(type="date")
+    for tf, bar_type in bar_types.items():
+        a = catalog_bar_arrays(CATALOG_DIR, bar_type, start, end)
+        if lod:
+            a = lod_ohlc(a, LOD_MAX_POINTS)
+        fig.add_trace(
+            go.Candlestick(
+                x=_ms(a["ts_init"]),
+                open=_prices(a["open"]),
+                high=_prices(a["high"]),
+                low=_prices(a["low"]),
+                close=_prices(a["close"]),
+                name=tf.value,
+            )
+        )
+    return fig
+
+
+def timed(fn, *args) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    catalog = ParquetDataCatalog(CATALOG_DIR)
+    instrument = catalog.instruments()[0]
+    precision = instrument.price_precision
+    bar_types = {
+        tf: tf.to_external_bar_type(instrument.id)
+        for tf in Timeframe
+        if catalog_bar_dir(CATALOG_DIR, tf.to_external_bar_type(instrument.id)).exists()
+    }
+    start = catalog.bars([str(bar_types[Timeframe.ONE_MINUTE])])[0].ts_init
+    end = start + YEAR_NS
+    bars_by_tf = {
+        tf: catalog.bars([str(bar_type)], start=start, end=end)
+        for tf, bar_type in bar_types.items()
+    }
+    print(f"Loaded {sum(map(len, bars_by_tf.values()))} bars for {instrument.id}")
+
+    bars_fig, bars_build_s = timed(build_from_bars, bars_by_tf)
+    bars_json, bars_encode_s = timed(bars_fig.to_json)
+    columns_fig, columns_build_s = timed(build_from_columns, bar_types, start, end)
+    columns_json, columns_encode_s = timed(columns_fig.to_json)
+    lod_json = build_from_columns(bar_types, start, end, lod=True).to_json()
+
+    for old, new in zip(bars_fig.data, columns_fig.data):
+        assert len(old.x) == len(new.x), f"{old.name} bar count differs"
+        old_ms = [x.timestamp() * 1000 for x in old.x]
+        assert np.allclose(old_ms, new.x, rtol=0, atol=1e-3), f"{old.name} x differs"
+        for name in ["open", "high", "low", "close"]:
+            prices = np.round(getattr(new, name).astype(np.float64), precision)
+            assert np.array_equal(getattr(old, name), prices), f"{old.name} {name}"
+
+    bars_s = bars_build_s + bars_encode_s
+    columns_s = columns_build_s + columns_encode_s
+    print(
+        f"Bar objects:     build {bars_build_s:6.2f}s, encode {bars_encode_s:6.2f}s, "
+        f"{len(bars_json) / 2**20:7.1f} MiB"
+    )
+    print(
+        f"catalog columns: build {columns_build_s:6.2f}s, "
+        f"encode {columns_encode_s:6.2f}s, {len(columns_json) / 2**20:7.1f} MiB"
+    )
+    print(
+        f"speed-up {bars_s / columns_s:5.1f}x, "
+        f"size {len(bars_json) / len(columns_json):5.1f}x smaller"
+    )
+    print(
+        f"LOD mode, {LOD_MAX_POINTS} candles per timeframe: "
+        f"{len(lod_json) / 2**20:7.1f} MiB, "
+        f"{len(bars_json) / len(lod_json):5.1f}x smaller"
+    )
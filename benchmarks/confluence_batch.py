@@ -0,0 +1,160 @@
+"""
+Batch order block and liquidity sweep detection versus the streaming detectors.
+
+Order blocks are scanned on every timeframe with bars in the catalog. Sweeps
+are checked against the H1 pivots and previous-day ranges the strategy would
+hand out, each active from the bar that confirms it, on the timeframes the
+strategy runs the sweep detector on. The script reports how many confluences
+each path found and how long it took, loading included. That both paths agree
+is tested in ``tests/test_confluence_batch.py``.
+
+Run from the repository root once ``catalog_setup.py --aggregate`` has run:
+
+    python -m benchmarks.confluence_batch
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+from nautilus_trader.model.data import Bar
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+from catalog_setup import catalog_bar_dir, read_catalog_bar_arrays
+from strategy.bar import (
+    RawBar,
+    raw_bar_is_high,
+    raw_bar_is_low,
+    raw_bar_max_high,
+    raw_bar_min_low,
+)
+from strategy.bar_buffer import BarBuffer
+from strategy.confluence.detector import ConfluenceDetector
+from strategy.confluence.liquidity_sweep import (
+    LiquiditySweepDetector,
+    detect_sweep_arrays,
+)
+from strategy.confluence.order_block import (
+    OrderBlockDetector,
+    detect_order_block_arrays,
+)
+from strategy.key_level import KeyLevel
+from strategy.timeframe import Timeframe
+
+ROOT = Path(__file__).parent.parent
+CATALOG_DIR = ROOT / "catalog"
+SWEEP_TFS = [Timeframe.FIVE_MINUTE, Timeframe.FIFTEEN_MINUTE, Timeframe.ONE_HOUR]
+
+
+def detect_streaming(
+    detector: ConfluenceDetector, bars: list[Bar], tf: Timeframe
+) -> list:
+    buffer = BarBuffer(detector.window_size)
+    found = []
+    for bar in bars:
+        buffer.append(RawBar.from_bar(bar))
+        if len(buffer) == detector.window_size:
+            found.extend(detector.detect(tf, buffer.window(detector.window_size)))
+    return found
+
+
+def liquidity_levels(
+    hour_bars: list[Bar], day_bars: list[Bar]
+) -> list[tuple[KeyLevel, bool, int]]:
+    """H1 pivots and previous-day ranges as ``(level, is_high, active_from)``."""
+    levels = []
+    hours = [RawBar.from_bar(bar) for bar in hour_bars]
+    for last_bar, bar in zip(hours, hours[1:]):
+        if raw_bar_is_high(last_bar, bar):
+            high_bar = raw_bar_max_high(last_bar, bar)
+            level = KeyLevel(
+                high_bar.price(high_bar.high),
+                "H1H",
+                high_bar.ts_init,
+                Timeframe.ONE_HOUR,
+            )
+            levels.append((level, True, bar.ts_init))
+        if raw_bar_is_low(last_bar, bar):
+            low_bar = raw_bar_min_low(last_bar, bar)
+            level = KeyLevel(
+                low_bar.price(low_bar.low), "H1L", low_bar.ts_init, Timeframe.ONE_HOUR
+            )
+            levels.append((level, False, bar.ts_init))
+    days = [RawBar.from_bar(bar) for bar in day_bars]
+    for prev_day, day in zip(days, days[1:]):
+        low = KeyLevel(
+            prev_day.price(prev_day.low), "PDL", prev_day.ts_init, Timeframe.ONE_DAY
+        )
+        high = KeyLevel(
+            prev_day.price(prev_day.high), "PDH", prev_day.ts_init, Timeframe.ONE_DAY
+        )
+        levels.append((low, False, day.ts_init))
+        levels.append((high, True, day.ts_init))
+    return levels
+
+
+if __name__ == "__main__":
+    catalog = ParquetDataCatalog(CATALOG_DIR)
+    instrument = catalog.instruments()[0]
+
+    def bar_type(tf: Timeframe):
+        return tf.to_external_bar_type(instrument.id)
+
+    for tf in Timeframe:
+        if not catalog_bar_dir(CATALOG_DIR, bar_type(tf)).exists():
+            print(f"{tf.value:>9}: no bars in the catalog, skipped")
+            continue
+
+        start = time.perf_counter()
+        bars: list[Bar] = catalog.bars([str(bar_type(tf))])
+        streaming = detect_streaming(OrderBlockDetector([tf]), bars, tf)
+        streaming_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        a = read_catalog_bar_arrays(CATALOG_DIR, bar_type(tf))
+        batch = detect_order_block_arrays(
+            a["open"], a["high"], a["low"], a["close"], a["ts_init"]
+        )
+        batch_s = time.perf_counter() - start
+
+        print(
+            f"{tf.value:>9} order blocks: streaming {len(streaming):>7} "
+            f"in {streaming_s:7.3f}s, batch {len(batch):>7} in {batch_s:7.3f}s "
+            f"({streaming_s / batch_s:6.1f}x)"
+        )
+
+    levels = liquidity_levels(
+        catalog.bars([str(bar_type(Timeframe.ONE_HOUR))]),
+        catalog.bars([str(bar_type(Timeframe.ONE_DAY))]),
+    )
+    level_price = np.array([level.price.raw for level, _, _ in levels], np.int64)
+    level_is_high = np.array([is_high for _, is_high, _ in levels])
+    level_active_from = np.array([ts for _, _, ts in levels], np.int64)
+
+    for tf in SWEEP_TFS:
+        start = time.perf_counter()
+        bars = catalog.bars([str(bar_type(tf))])
+        detector = LiquiditySweepDetector([tf])
+        for level, is_high, active_from in levels:
+            detector.add_level(level, is_high, active_from)
+        streaming = detect_streaming(detector, bars, tf)
+        streaming_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        a = read_catalog_bar_arrays(CATALOG_DIR, bar_type(tf), ["high", "low", "close"])
+        batch = detect_sweep_arrays(
+            a["high"],
+            a["low"],
+            a["close"],
+            a["ts_init"],
+            level_price,
+            level_is_high,
+            level_active_from,
+        )
+        batch_s = time.perf_counter() - start
+
+        print(
+            f"{tf.value:>9} sweeps of {len(levels)} levels: streaming "
+            f"{len(streaming):>5} in {streaming_s:7.3f}s, batch {len(batch):>5} "
+            f"in {batch_s:7.3f}s ({streaming_s / batch_s:6.1f}x)"
+        )
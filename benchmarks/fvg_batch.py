@@ -0,0 +1,69 @@
+"""
+Batch FVG detection over columnar catalog arrays versus the per-bar detector.
+
+For every timeframe with bars in the catalog (higher timeframes once
+``catalog_setup.py --aggregate`` has run), both detectors scan the full history
+and the script reports how long each took, loading included. That they find the
+same gaps is tested in tests/test_fvg.py.
+
+Run from the repository root:
+
+    python -m benchmarks.fvg_batch
+"""
+
+import time
+from pathlib import Path
+
+from nautilus_trader.model.data import Bar
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+
+from catalog_setup import catalog_bar_dir, read_catalog_bar_arrays
+from strategy.bar import RawBar
+from strategy.bar_buffer import BarBuffer
+from strategy.confluence.fvg import (
+    FairValueGap,
+    FairValueGapDetector,
+    detect_fvg_arrays,
+)
+from strategy.timeframe import Timeframe
+
+ROOT = Path(__file__).parent.parent
+CATALOG_DIR = ROOT / "catalog"
+
+
+def detect_per_bar(bars: list[Bar], tf: Timeframe) -> list[FairValueGap]:
+    detector = FairValueGapDetector([tf])
+    buffer = BarBuffer(detector.window_size)
+    fvgs = []
+    for bar in bars:
+        buffer.append(RawBar.from_bar(bar))
+        if len(buffer) == detector.window_size:
+            fvgs.extend(detector.detect(tf, buffer.window(detector.window_size)))
+    return fvgs
+
+
+if __name__ == "__main__":
+    catalog = ParquetDataCatalog(CATALOG_DIR)
+    instrument = catalog.instruments()[0]
+
+    for tf in Timeframe:
+        bar_type = tf.to_external_bar_type(instrument.id)
+        if not catalog_bar_dir(CATALOG_DIR, bar_type).exists():
+            print(f"{tf.value:>9}: no bars in the catalog, skipped")
+            continue
+
+        start = time.perf_counter()
+        bars: list[Bar] = catalog.bars([str(bar_type)])
+        per_bar = detect_per_bar(bars, tf)
+        per_bar_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        arrays = read_catalog_bar_arrays(CATALOG_DIR, bar_type, ["high", "low"])
+        batch = detect_fvg_arrays(arrays["high"], arrays["low"], arrays["ts_init"])
+        batch_s = time.perf_counter() - start
+
+        print(
+            f"{tf.value:>9}: {len(bars):>8} bars, {len(batch):>7} FVGs, "
+            f"per-bar {per_bar_s:7.3f}s, batch {batch_s:7.3f}s "
+            f"({per_bar_s / batch_s:6.1f}x)"
+        )
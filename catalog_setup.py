@@ -1,13 +1,30 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from os import PathLike
 from pathlib import Path
 
-from nautilus_trader.model.data import BarSpecification, BarAggregation, BarType
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from nautilus_trader.model import InstrumentId
+from nautilus_trader.model.data import Bar, BarSpecification, BarAggregation, BarType
 from nautilus_trader.model.enums import PriceType
+from nautilus_trader.model.objects import FIXED_PRECISION
 from nautilus_trader.persistence.catalog import ParquetDataCatalog
+from nautilus_trader.persistence.funcs import urisafe_identifier
 from nautilus_trader.persistence.wranglers import BarDataWrangler
-from nautilus_trader.test_kit.providers import CSVTickDataLoader
 from nautilus_trader.test_kit.providers import TestInstrumentProvider
 
+from strategy.timeframe import INTERNAL_AGG_TF, Timeframe
+
 
 ROOT = Path(__file__).parent
 CATALOG_DIR = ROOT / "catalog"
@@ -20,34 +37,498 @@ BAR_SPEC = BarSpecification(
     price_type=PriceType.LAST,
 )
 
+# HistData M1 ASCII rows look like `20000530 172800;1.497500;1.497500;1.497500;1.497500;0`
+CSV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+CSV_DTYPES = {
+    "timestamp": "string",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+}
+CSV_DATETIME_FORMAT = "%Y%m%d %H%M%S"
+CHUNK_SIZE = 100_000
+
+
+def read_fx_hist_chunks(
+    filename: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    for chunk in pd.read_csv(
+        filename,
+        sep=";",
+        header=None,
+        names=CSV_COLUMNS,
+        dtype=CSV_DTYPES,
+        chunksize=chunk_size,
+    ):
+        timestamps = chunk.pop("timestamp")
+        chunk.index = pd.to_datetime(timestamps, format=CSV_DATETIME_FORMAT, utc=True)
+        chunk.index.name = "timestamp"
+        yield chunk
+
+
 def load_fx_hist_data(
     filename: str,
     currency: str,
     catalog_path: PathLike[str] | str,
-) -> None:
+    chunk_size: int = CHUNK_SIZE,
+    write_instrument: bool = True,
+) -> tuple[int, int, int]:
+    """
+    Stream a HistData M1 CSV into the catalog, one Parquet file per month.
+
+    The CSV is read in ``chunk_size`` rows at a time, so peak memory is bounded
+    by one chunk plus the month currently being assembled. Returns the number of
+    bars written and the first and last bar timestamps.
+    """
     instrument = TestInstrumentProvider.default_fx_ccy(currency)
     bar_type = BarType(instrument.id, BAR_SPEC)
     wrangler = BarDataWrangler(bar_type, instrument)
 
-    df = CSVTickDataLoader.load(
-        filename, index_col=0, datetime_format="%Y%m%d %H%M%S%f", sep=";"
+    catalog = ParquetDataCatalog(catalog_path)
+    if write_instrument:
+        catalog.write_data([instrument])
+
+    written = [0, None, None]
+
+    def write_month(frames: list[pd.DataFrame]) -> None:
+        df = pd.concat(frames)
+        bars = wrangler.process(df)
+        print(f"Writing {len(bars)} {bar_type} bars for {df.index[0]:%Y-%m}...")
+        catalog.write_data(bars)
+        written[0] += len(bars)
+        written[1] = bars[0].ts_event if written[1] is None else written[1]
+        written[2] = bars[-1].ts_event
+
+    month_frames: list[pd.DataFrame] = []
+    current_month = None
+    for chunk in read_fx_hist_chunks(filename, chunk_size):
+        months = chunk.index.year * 12 + chunk.index.month
+        for month, frame in chunk.groupby(months, sort=False):
+            if month != current_month and month_frames:
+                write_month(month_frames)
+                month_frames = []
+            current_month = month
+            month_frames.append(frame)
+
+    if month_frames:
+        write_month(month_frames)
+
+    return written[0], written[1], written[2]
+
+
+# e.g. DAT_ASCII_GBPUSD_M1_2000.csv, or DAT_ASCII_GBPUSD_M1_202401.csv for monthly files
+HIST_DATA_FILE_RE = re.compile(r"DAT_ASCII_([A-Z]{6})_M1_(\d{4})(\d{2})?\.csv")
+MANIFEST_NAME = "ingest_manifest.json"
+
+
+@dataclass(frozen=True)
+class HistDataFile:
+    path: Path
+    currency: str
+    period: str
+
+
+def discover_hist_data_files(data_dir: Path) -> list[HistDataFile]:
+    files = []
+    for path in sorted(data_dir.rglob("DAT_ASCII_*.csv")):
+        match = HIST_DATA_FILE_RE.fullmatch(path.name)
+        if match is None:
+            print(f"Skipping {path.name}: not a HistData M1 file name")
+            continue
+        pair, year, month = match.groups()
+        files.append(
+            HistDataFile(
+                path=path,
+                currency=f"{pair[:3]}/{pair[3:]}",
+                period=f"{year}-{month}" if month else year,
+            )
+        )
+    return files
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(catalog_path: Path) -> dict:
+    manifest_file = catalog_path / MANIFEST_NAME
+    if not manifest_file.exists():
+        return {}
+    with open(manifest_file) as f:
+        return json.load(f)
+
+
+def save_manifest(catalog_path: Path, manifest: dict) -> None:
+    tmp_file = catalog_path / f".{MANIFEST_NAME}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    tmp_file.replace(catalog_path / MANIFEST_NAME)
+
+
+def ingest_file(
+    file: HistDataFile,
+    catalog_path: Path,
+    chunk_size: int,
+    replaced: dict | None,
+) -> tuple[int, int, int]:
+    if replaced is not None and replaced["start"] is not None:
+        # The file changed since it was last ingested; drop its old bars first
+        instrument = TestInstrumentProvider.default_fx_ccy(file.currency)
+        ParquetDataCatalog(catalog_path).delete_data_range(
+            Bar,
+            str(BarType(instrument.id, BAR_SPEC)),
+            start=replaced["start"],
+            end=replaced["end"],
+        )
+    return load_fx_hist_data(
+        str(file.path),
+        file.currency,
+        catalog_path,
+        chunk_size=chunk_size,
+        write_instrument=False,
     )
-    df.columns = [["open", "high", "low", "close", "volume"]]
-    print(df)
 
-    print("Preparing ticks...")
-    ticks = wrangler.process(df)
 
-    print("Writing data to catalog...")
+def ingest_hist_data(
+    data_dir: Path = DATA_DIR,
+    catalog_path: Path = CATALOG_DIR,
+    max_workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Ingest every HistData file under ``data_dir``, one file per worker process.
+
+    Files whose content hash matches the catalog manifest are skipped, so adding
+    one new year only ingests that year. Every worker writes a different
+    instrument/period, which lands in its own catalog files; instruments are
+    written once up front by this process.
+    """
+    catalog_path.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(catalog_path)
+
+    pending = []
+    for file in discover_hist_data_files(data_dir):
+        key = file.path.relative_to(data_dir).as_posix()
+        sha256 = file_sha256(file.path)
+        entry = manifest.get(key)
+        if entry is not None and entry["sha256"] == sha256:
+            print(f"Skipping {key}: already ingested")
+            continue
+        pending.append((key, sha256, file, entry))
+
+    if not pending:
+        print("Catalog is up to date")
+        return
+
     catalog = ParquetDataCatalog(catalog_path)
-    catalog.write_data([instrument])
-    catalog.write_data(ticks)
+    currencies = sorted({file.currency for _, _, file, _ in pending})
+    catalog.write_data([TestInstrumentProvider.default_fx_ccy(c) for c in currencies])
+
+    # Nautilus starts native threads, which don't survive a fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(), mp_context=context
+    ) as pool:
+        futures = {
+            pool.submit(ingest_file, file, catalog_path, chunk_size, entry): (
+                key,
+                sha256,
+                file,
+            )
+            for key, sha256, file, entry in pending
+        }
+        for future in as_completed(futures):
+            key, sha256, file = futures[future]
+            try:
+                bars, start, end = future.result()
+            except Exception as e:
+                print(f"Failed to ingest {key}: {e}")
+                continue
+            manifest[key] = {
+                "sha256": sha256,
+                "currency": file.currency,
+                "period": file.period,
+                "bars": bars,
+                "start": start,
+                "end": end,
+            }
+            save_manifest(catalog_path, manifest)
+            print(f"Ingested {key}: {bars} bars")
+
+
+# Bar prices and sizes are stored as raw fixed-point integers: 8 bytes scaled by
+# 1e9 when written by the standard build, 16 bytes scaled by 1e16 by the
+# high-precision one
+FIXED_WIDTH_PRECISION = {8: 9, 16: 16}
+BAR_VALUE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def fixed_words(column: pa.ChunkedArray) -> np.ndarray:
+    """A fixed-point column's little-endian int64 words, one row per value."""
+    array = column.combine_chunks()
+    width = array.type.byte_width
+    if width not in FIXED_WIDTH_PRECISION:
+        raise ValueError(f"Unsupported fixed-point width: {width} bytes")
+    words = np.frombuffer(array.buffers()[1], dtype="<i8")
+    words = words[array.offset * width // 8 :][: len(array) * width // 8]
+    return words.reshape(len(array), width // 8)
+
+
+def fixed_to_raw(column: pa.ChunkedArray) -> np.ndarray:
+    """
+    Decode a fixed-point column to int64 raw values at this build's scale.
+
+    Raises ``ValueError`` for values that don't fit an int64 at this scale, like
+    large 16-byte sizes, or that would lose digits scaling down to it.
+    """
+    words = fixed_words(column)
+    raw = words[:, 0]
+    # A 16-byte value fits an int64 when its high word only repeats the sign of
+    # its low word
+    if words.shape[1] == 2 and not np.array_equal(words[:, 1], raw >> 63):
+        raise ValueError(f"{column.type} values out of int64 range")
+    shift = FIXED_PRECISION - FIXED_WIDTH_PRECISION[words.shape[1] * 8]
+    if shift > 0:
+        limit = np.iinfo(np.int64).max // 10**shift
+        if np.any((raw > limit) | (raw < -limit)):
+            raise ValueError(
+                f"Values out of int64 range at precision {FIXED_PRECISION}"
+            )
+        return raw * 10**shift
+    if shift < 0:
+        if np.any(raw % 10**-shift):
+            raise ValueError(f"Values finer than precision {FIXED_PRECISION}")
+        return raw // 10**-shift
+    return raw
+
+
+def fixed_to_float(column: pa.ChunkedArray) -> np.ndarray:
+    """Decode a fixed-point column to floats, whatever its range."""
+    words = fixed_words(column)
+    value = words[:, 0].astype(np.float64)
+    if words.shape[1] == 2:
+        low, high = words[:, 0], words[:, 1]
+        wide = high != low >> 63
+        value[wide] = high[wide] * 2.0**64 + low[wide].view(np.uint64)
+    return value / 10 ** FIXED_WIDTH_PRECISION[words.shape[1] * 8]
+
+
+def catalog_bar_dir(catalog_path: PathLike[str] | str, bar_type: BarType) -> Path:
+    return Path(catalog_path) / "data" / "bar" / urisafe_identifier(bar_type)
+
+
+def bar_ts_range(
+    catalog_path: PathLike[str] | str, bar_type: BarType, start: int, end: int
+) -> tuple[int, int] | None:
+    """The first and last ``ts_event`` of the ``bar_type`` bars in [start, end]."""
+    directory = catalog_bar_dir(catalog_path, bar_type)
+    if not directory.exists():
+        return None
+    ts = pq.read_table(
+        directory,
+        columns=["ts_event"],
+        filters=[("ts_event", ">=", start), ("ts_event", "<=", end)],
+    ).column("ts_event")
+    if len(ts) == 0:
+        return None
+    ts = ts.to_numpy()
+    return int(ts.min()), int(ts.max())
+
+
+def bar_interval_ns(catalog_path: PathLike[str] | str, bar_type: BarType) -> int | None:
+    """
+    The shortest time between consecutive ``bar_type`` bars in the catalog.
+
+    None when there are fewer than two. Gaps in the data only lengthen others, so
+    this is the interval the bars were actually written at, whatever directory
+    they were filed under.
+    """
+    directory = catalog_bar_dir(catalog_path, bar_type)
+    if not directory.exists():
+        return None
+    ts = pq.read_table(directory, columns=["ts_event"]).column("ts_event").to_numpy()
+    steps = np.diff(np.unique(ts))
+    return int(steps.min()) if len(steps) else None
+
+
+def read_catalog_bar_arrays(
+    catalog_path: PathLike[str] | str,
+    bar_type: BarType,
+    columns: list[str] = BAR_VALUE_COLUMNS,
+    start: int | None = None,
+    end: int | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Load the catalog bars of ``bar_type`` as columnar arrays.
+
+    Prices and sizes come back as raw int64 values, so comparisons match those
+    of ``Price``/``Quantity``; ``ts_event`` and ``ts_init`` are always included.
+    Sizes too large for an int64 raw value raise ``ValueError``.
+    ``start`` and ``end`` restrict the bars to a ``ts_init`` range, inclusive.
+    """
+    filters = []
+    if start is not None:
+        filters.append(("ts_init", ">=", start))
+    if end is not None:
+        filters.append(("ts_init", "<=", end))
+    files = sorted(catalog_bar_dir(catalog_path, bar_type).glob("*.parquet"))
+    tables = [
+        pq.read_table(
+            file, columns=[*columns, "ts_event", "ts_init"], filters=filters or None
+        )
+        for file in files
+    ]
+    tables = [table for table in tables if table.num_rows > 0]
+    if not tables:
+        return {
+            name: np.empty(0, np.int64) for name in [*columns, "ts_event", "ts_init"]
+        }
+    arrays = {
+        name: np.concatenate([fixed_to_raw(t.column(name)) for t in tables])
+        for name in columns
+    }
+    for name in ["ts_event", "ts_init"]:
+        arrays[name] = np.concatenate(
+            [t.column(name).to_numpy().astype(np.int64) for t in tables]
+        )
+    return arrays
+
+
+def read_catalog_bars(
+    catalog_path: PathLike[str] | str, bar_type: BarType
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the catalog bars of ``bar_type`` as one DataFrame per Parquet file.
+
+    Frames are indexed by ``ts_event`` like ``read_fx_hist_chunks``, and come in
+    time order since catalog files never overlap.
+    """
+    for file in sorted(catalog_bar_dir(catalog_path, bar_type).glob("*.parquet")):
+        table = pq.read_table(file)
+        frame = pd.DataFrame(
+            {name: fixed_to_float(table.column(name)) for name in BAR_VALUE_COLUMNS},
+            index=pd.to_datetime(
+                table.column("ts_event").to_numpy().astype(np.int64), utc=True
+            ),
+        )
+        frame.index.name = "ts_event"
+        yield frame
+
+
+def resample_bars(
+    minutes: pd.DataFrame,
+    interval: pd.Timedelta,
+    last_label: pd.Timestamp | None = None,
+    prev_close: float | None = None,
+) -> pd.DataFrame:
+    """
+    Aggregate 1-minute bars the way Nautilus' internal time bar aggregator does.
+
+    Intervals are aligned to the epoch, closed and labelled on the right, and an
+    interval is only emitted once a 1-minute bar at or past its close has been
+    seen. Intervals without any 1-minute bar become flat, zero volume bars at the
+    previous close. ``last_label`` and ``prev_close`` carry that state over from
+    the previous call when aggregating in chunks.
+    """
+    bars = minutes.resample(interval, closed="right", label="right", origin="epoch")
+    bars = bars.agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    )
+    start = bars.index[0] if last_label is None else last_label + interval
+    bars = bars.reindex(
+        pd.date_range(start, minutes.index[-1].floor(interval), freq=interval)
+    )
+
+    empty = bars["open"].isna()
+    bars["close"] = bars["close"].ffill()
+    if prev_close is not None:
+        bars["close"] = bars["close"].fillna(prev_close)
+    for column in ["open", "high", "low"]:
+        bars.loc[empty, column] = bars.loc[empty, "close"]
+    bars.loc[empty, "volume"] = 0.0
+    return bars
+
+
+def aggregate_catalog_bars(
+    catalog_path: PathLike[str] | str,
+    instrument_id: InstrumentId,
+    timeframes: list[Timeframe] = INTERNAL_AGG_TF,
+) -> dict[Timeframe, int]:
+    """
+    Materialise higher-timeframe bars from the 1-minute catalog bars.
+
+    Each timeframe is written as an ``EXTERNAL`` bar type, replacing whatever was
+    aggregated before, so a backtest can subscribe to it directly instead of
+    aggregating at runtime. Returns the number of bars written per timeframe.
+    """
+    catalog = ParquetDataCatalog(catalog_path)
+    instrument = catalog.instruments(instrument_ids=[str(instrument_id)])[0]
+    source = Timeframe.ONE_MINUTE.to_bar_type(instrument.id)
+    targets = {tf: tf.to_external_bar_type(instrument.id) for tf in timeframes}
+    for bar_type in targets.values():
+        catalog.delete_data_range(Bar, str(bar_type))
+
+    # 1-minute bars past each timeframe's last emitted interval, and its state
+    carry: dict[Timeframe, pd.DataFrame | None] = dict.fromkeys(timeframes)
+    last_label: dict[Timeframe, pd.Timestamp | None] = dict.fromkeys(timeframes)
+    prev_close: dict[Timeframe, float | None] = dict.fromkeys(timeframes)
+    written = dict.fromkeys(timeframes, 0)
+
+    for minutes in read_catalog_bars(catalog_path, source):
+        for tf, bar_type in targets.items():
+            frame = minutes if carry[tf] is None else pd.concat([carry[tf], minutes])
+            bars = resample_bars(
+                frame, bar_type.spec.timedelta, last_label[tf], prev_close[tf]
+            )
+            if len(bars) > 0:
+                ts = bars.index.asi8.astype(np.uint64)
+                catalog.write_data(
+                    Bar.from_raw_arrays_to_list(
+                        bar_type,
+                        instrument.price_precision,
+                        instrument.size_precision,
+                        *(
+                            bars[name].to_numpy(np.float64)
+                            for name in BAR_VALUE_COLUMNS
+                        ),
+                        ts,
+                        ts,
+                    )
+                )
+                written[tf] += len(bars)
+                last_label[tf] = bars.index[-1]
+                prev_close[tf] = bars["close"].iloc[-1]
+            if last_label[tf] is not None:
+                frame = frame[frame.index > last_label[tf]]
+            carry[tf] = frame
+
+    for tf, count in written.items():
+        print(f"Wrote {count} {targets[tf]} bars")
+    return written
 
-    print("Done")
 
 if __name__ == "__main__":
-    load_fx_hist_data(
-        filename=str(DATA_DIR / "DAT_ASCII_GBPUSD_M1_2000.csv"),
-        currency="GBP/USD",
-        catalog_path=CATALOG_DIR,
-    )
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Ingest HistData M1 CSV files into the Parquet catalog"
+    )
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--catalog", type=Path, default=CATALOG_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="also materialise higher-timeframe bars for every catalog instrument",
+    )
+    args = parser.parse_args()
+
+    ingest_hist_data(args.data_dir, args.catalog, args.workers, args.chunk_size)
+    if args.aggregate:
+        for instrument in ParquetDataCatalog(args.catalog).instruments():
+            aggregate_catalog_bars(args.catalog, instrument.id)
@@ -0,0 +1,290 @@
+"""
+Local chart server streaming windows of a backtest from the catalog and history.
+
+The page asks for the timeframe and time window in view and gets back a figure
+holding only the bars, sessions, key levels and FVGs around it. The figure is
+built by ``ChartBuilder`` from the Parquet catalog and a Parquet history, both
+read for that window alone, with its candles decimated to a point budget.
+Windows are snapped to a grid, so nearby pans and zooms share a figure, and
+recently viewed ones are kept in an LRU cache. Panning or zooming fetches the
+next window, so a year of 1-minute bars never has to be in the browser at
+once. plotly.js is served from the installed package and the server only
+listens on localhost, so it runs fully offline.
+
+Run from the repository root once ``backtest.py`` has written its history:
+
+    python chart_server.py --port 8050
+
+and open http://127.0.0.1:8050.
+"""
+
+import argparse
+import json
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import PathLike
+from pathlib import Path
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from nautilus_trader.model import InstrumentId
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+from plotly.offline import get_plotlyjs
+
+from catalog_setup import bar_interval_ns, bar_ts_range
+from strategy.history import StrategyHistory
+from strategy.timeframe import Timeframe
+from visualization import ChartBuilder
+
+ROOT = Path(__file__).parent
+CATALOG_DIR = ROOT / "catalog"
+HISTORY_PATH = ROOT / "history"
+
+MINUTE_NS = 60 * 1_000_000_000
+DAY_NS = 24 * 60 * MINUTE_NS
+# Candles a window figure keeps after decimation
+WINDOW_MAX_POINTS = 4_000
+WINDOW_CACHE_SIZE = 64
+# History read before a window, so gaps formed earlier still show in it
+HISTORY_LOOKBACK_NS = 7 * DAY_NS
+# Span the page opens on, from the first bar
+INITIAL_SPAN_NS = 7 * DAY_NS
+
+PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>ICT Strategy</title>
+<script src="/plotly.min.js"></script>
+</head>
+<body style="margin: 0; font-family: sans-serif">
+<select id="tf" style="margin: 8px"></select>
+<div id="chart" style="height: calc(100vh - 48px)"></div>
+<script>
+const config = $config;
+const chart = document.getElementById("chart");
+const select = document.getElementById("tf");
+for (const tf of config.timeframes) select.add(new Option(tf, tf));
+
+let view = config.initial;
+let latest = 0;
+let timer = null;
+
+// Plotly reports date axis ranges as "YYYY-MM-DD HH:MM:SS.sss" UTC strings
+function toMs(value) {
+  if (typeof value === "number") return value;
+  const [day, time = "00:00"] = value.split(" ");
+  return Date.parse(day + "T" + time + "Z");
+}
+
+async function load() {
+  const request = ++latest;
+  const [start, end] = view.map(Math.round);
+  const response = await fetch(
+    "/window?tf=" + select.value + "&start=" + start + "&end=" + end
+  );
+  const fig = await response.json();
+  // A newer view was asked for while this one loaded
+  if (request !== latest) return;
+  fig.layout.xaxis.range = view;
+  fig.layout.xaxis.rangeslider = {visible: false};
+  fig.layout.yaxis.autorange = true;
+  delete fig.layout.height;
+  const first = !chart.data;
+  await Plotly.react(chart, fig.data, fig.layout, {responsive: true});
+  if (first) chart.on("plotly_relayout", relayout);
+}
+
+function relayout(event) {
+  if ("xaxis.range[0]" in event) {
+    view = [toMs(event["xaxis.range[0]"]), toMs(event["xaxis.range[1]"])];
+  } else if ("xaxis.range" in event) {
+    view = event["xaxis.range"].map(toMs);
+  } else if (event["xaxis.autorange"]) {
+    view = config.bounds;
+  } else {
+    return;
+  }
+  clearTimeout(timer);
+  timer = setTimeout(load, 250);
+}
+
+select.addEventListener("change", load);
+load();
+</script>
+</body>
+</html>
+""")
+
+
+def snap_window(start: int, end: int) -> tuple[int, int]:
+    """
+    Widen ``[start, end]`` nanoseconds to the window served for it.
+
+    The span is rounded up to a power of two minutes, the window aligned to
+    that span and padded by one span either side. Small pans and zooms map to
+    the same window, and there are bars to show while the next one loads.
+    """
+    span = MINUTE_NS << (max(end - start, 1) // MINUTE_NS).bit_length()
+    return (start // span - 1) * span, (end // span + 2) * span
+
+
+def catalog_timeframes(
+    catalog_path: PathLike[str] | str, instrument_id: InstrumentId
+) -> list[Timeframe]:
+    """The timeframes with bars in the catalog, written at their own interval."""
+    timeframes = []
+    for tf in Timeframe:
+        bar_type = tf.to_external_bar_type(instrument_id)
+        if bar_interval_ns(catalog_path, bar_type) == bar_type.spec.timedelta.value:
+            timeframes.append(tf)
+    return timeframes
+
+
+class ChartWindows:
+    """
+    Window figures of one instrument, built on demand and cached.
+
+    A timeframe is offered when the catalog has bars of it written at its own
+    interval, so empty series and bars filed under the wrong timeframe are
+    left out. A catalog without any is refused with a ``ValueError``.
+    """
+
+    def __init__(
+        self,
+        catalog_path: PathLike[str] | str,
+        history_path: PathLike[str] | str,
+        max_points: int = WINDOW_MAX_POINTS,
+        cache_size: int = WINDOW_CACHE_SIZE,
+    ):
+        self.catalog_path = Path(catalog_path)
+        self.history_path = str(history_path)
+        self.max_points = max_points
+        instruments = ParquetDataCatalog(self.catalog_path).instruments()
+        if not instruments:
+            raise ValueError(
+                f"No instrument in {self.catalog_path}, run catalog_setup.py first"
+            )
+        self.instrument_id = instruments[0].id
+        self.timeframes = catalog_timeframes(self.catalog_path, self.instrument_id)
+        if not self.timeframes:
+            raise ValueError(
+                f"No {self.instrument_id} bars in {self.catalog_path}, "
+                "run catalog_setup.py first"
+            )
+        self.bounds = bar_ts_range(
+            self.catalog_path,
+            self.timeframes[0].to_external_bar_type(self.instrument_id),
+            0,
+            np.iinfo(np.int64).max,
+        )
+        self.figure_json = lru_cache(maxsize=cache_size)(self._figure_json)
+
+    def window(self, start: int, end: int) -> tuple[int, int] | None:
+        """
+        The window served for ``[start, end]`` nanoseconds, snapped and then
+        clamped to the bars in the catalog, or None if it holds none of them.
+        """
+        first, last = self.bounds
+        if end < first or start > last:
+            return None
+        start, end = snap_window(start, end)
+        # Inside the bars, the history read HISTORY_LOOKBACK_NS earlier stays
+        # within int64 too
+        return max(start, first), min(end, last)
+
+    def _figure_json(self, tf: Timeframe, start: int, end: int) -> str:
+        history = StrategyHistory.load_from_parquet(
+            self.history_path, start - HISTORY_LOOKBACK_NS, end
+        )
+        chart = ChartBuilder(
+            engine=None,
+            base_bar_type=tf.to_external_bar_type(self.instrument_id),
+            title=f"ICT Strategy - {tf.value}",
+            lod=True,
+            max_points=self.max_points,
+            catalog_path=self.catalog_path,
+            start=start,
+            end=end,
+        )
+        chart.add_sessions(history)
+        chart.add_key_levels(history)
+        chart.add_confluences(history, [tf])
+        return chart.fig.to_json()
+
+    def page(self) -> str:
+        first, last = (ts // 1_000_000 for ts in self.bounds)
+        config = {
+            "timeframes": [tf.value for tf in self.timeframes],
+            "bounds": [first, last],
+            "initial": [first, min(last, first + INITIAL_SPAN_NS // 1_000_000)],
+        }
+        return PAGE.substitute(config=json.dumps(config))
+
+
+def make_handler(windows: ChartWindows) -> type[BaseHTTPRequestHandler]:
+    class ChartRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/":
+                self._send(windows.page(), "text/html")
+            elif url.path == "/plotly.min.js":
+                self._send(get_plotlyjs(), "application/javascript")
+            elif url.path == "/window":
+                query = parse_qs(url.query)
+                try:
+                    tf = Timeframe(query["tf"][0])
+                    # The page speaks epoch milliseconds, like Plotly
+                    start = int(query["start"][0]) * 1_000_000
+                    end = int(query["end"][0]) * 1_000_000
+                except (KeyError, ValueError):
+                    self.send_error(HTTPStatus.BAD_REQUEST)
+                    return
+                window = windows.window(start, end)
+                if tf not in windows.timeframes or end <= start or window is None:
+                    self.send_error(HTTPStatus.BAD_REQUEST)
+                    return
+                self._send(windows.figure_json(tf, *window), "application/json")
+            else:
+                self.send_error(HTTPStatus.NOT_FOUND)
+
+        def _send(self, body: str, content_type: str):
+            data = body.encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ChartRequestHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve an interactive chart of a backtest on localhost"
+    )
+    parser.add_argument("--catalog", type=Path, default=CATALOG_DIR)
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=HISTORY_PATH,
+        help="Parquet history directory written by the strategy",
+    )
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--max-points", type=int, default=WINDOW_MAX_POINTS)
+    args = parser.parse_args()
+
+    try:
+        windows = ChartWindows(args.catalog, args.history, args.max_points)
+    except ValueError as e:
+        parser.error(str(e))
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(windows))
+    print(f"Serving the chart on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -1,4 +1,4 @@
-from nautilus_trader.model import Bar
+from nautilus_trader.model import Bar, Price
 
 
 def bar_is_up(bar: Bar) -> bool:
@@ -23,3 +23,71 @@ def bar_max_high(bar1: Bar, bar2: Bar) -> Bar:
 
 def bar_min_low(bar1: Bar, bar2: Bar) -> Bar:
     return bar1 if bar1.low <= bar2.low else bar2
+
+
+class RawBar:
+    """
+    A bar's OHLC as raw fixed-point integers, read off the ``Bar`` once.
+
+    Comparing ints skips ``Price``'s rich comparison, so the strategy handlers
+    work on these and only build a ``Price`` for what they record.
+    """
+
+    __slots__ = ("open", "high", "low", "close", "ts_event", "ts_init", "precision")
+
+    def __init__(
+        self,
+        open: int,
+        high: int,
+        low: int,
+        close: int,
+        ts_event: int,
+        ts_init: int,
+        precision: int,
+    ):
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.ts_event = ts_event
+        self.ts_init = ts_init
+        self.precision = precision
+
+    @classmethod
+    def from_bar(cls, bar: Bar) -> "RawBar":
+        return cls(
+            bar.open.raw,
+            bar.high.raw,
+            bar.low.raw,
+            bar.close.raw,
+            bar.ts_event,
+            bar.ts_init,
+            bar.open.precision,
+        )
+
+    def price(self, raw: int) -> Price:
+        return Price.from_raw(raw, self.precision)
+
+
+def raw_bar_is_up(bar: RawBar) -> bool:
+    return bar.close > bar.open
+
+
+def raw_bar_is_down(bar: RawBar) -> bool:
+    return bar.close < bar.open
+
+
+def raw_bar_is_high(prev_bar: RawBar, bar: RawBar) -> bool:
+    return raw_bar_is_up(prev_bar) and raw_bar_is_down(bar)
+
+
+def raw_bar_is_low(prev_bar: RawBar, bar: RawBar) -> bool:
+    return raw_bar_is_down(prev_bar) and raw_bar_is_up(bar)
+
+
+def raw_bar_max_high(bar1: RawBar, bar2: RawBar) -> RawBar:
+    return bar1 if bar1.high >= bar2.high else bar2
+
+
+def raw_bar_min_low(bar1: RawBar, bar2: RawBar) -> RawBar:
+    return bar1 if bar1.low <= bar2.low else bar2
@@ -0,0 +1,93 @@
+import numpy as np
+
+from strategy.bar import RawBar
+
+BAR_FIELDS = ("open", "high", "low", "close", "ts_event", "ts_init")
+
+
+class BarWindow:
+    """The latest bars of a ``BarBuffer``, oldest first, as views into it."""
+
+    __slots__ = ("data", "precision")
+
+    def __init__(self, data: np.ndarray, precision: int):
+        self.data = data
+        self.precision = precision
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.data[:, 3]
+
+    @property
+    def ts_event(self) -> np.ndarray:
+        return self.data[:, 4]
+
+    @property
+    def ts_init(self) -> np.ndarray:
+        return self.data[:, 5]
+
+    def bar(self, i: int) -> RawBar:
+        return RawBar(*self.data[i].tolist(), self.precision)
+
+
+class BarBuffer:
+    """
+    Fixed-capacity ring buffer of the latest bars of one timeframe.
+
+    Raw OHLC and timestamps live in one preallocated int64 array, a row per bar.
+    Every bar is written twice, ``capacity`` rows apart, so the latest ``n`` bars
+    are always one contiguous slice and windows are views, never copies.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.precision = 0
+        self._data = np.zeros((2 * capacity, len(BAR_FIELDS)), dtype=np.int64)
+        # Item assignment through a memoryview skips NumPy's indexing machinery,
+        # which would otherwise dominate appending a 1-minute bar
+        self._cells = memoryview(self._data.reshape(-1)).cast("B").cast("q")
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, bar: RawBar) -> None:
+        i = self._head * len(BAR_FIELDS)
+        j = i + self.capacity * len(BAR_FIELDS)
+        cells = self._cells
+        cells[i] = cells[j] = bar.open
+        cells[i + 1] = cells[j + 1] = bar.high
+        cells[i + 2] = cells[j + 2] = bar.low
+        cells[i + 3] = cells[j + 3] = bar.close
+        cells[i + 4] = cells[j + 4] = bar.ts_event
+        cells[i + 5] = cells[j + 5] = bar.ts_init
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.precision = bar.precision
+
+    def window(self, n: int) -> BarWindow:
+        """The latest ``n`` bars, or all of them while fewer have arrived."""
+        end = self._head + self.capacity
+        return BarWindow(self._data[end - min(n, self._count) : end], self.precision)
+
+    def bar(self, i: int) -> RawBar:
+        """The ``i``-th latest bar: 1 is the last one appended."""
+        row = self._data[self._head + self.capacity - i]
+        return RawBar(*row.tolist(), self.precision)
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
-from abc import ABC
-from typing import TypeVar, Type
+from abc import ABC, abstractmethod
+from typing import ClassVar, TypeVar, Type
 
+from strategy.price_range import PriceRange
 from strategy.timeframe import Timeframe
 
 TConfluence = TypeVar("TConfluence", bound="ConfluenceBase")
 
 
 class ConfluenceBase(ABC):
+    # Key of this type's list in a serialised ConfluenceRegistry
+    registry_key: ClassVar[str]
     name: str
     observed_tf: Timeframe
     obsolete: bool
+    range: PriceRange
 
     def __init__(
         self,
@@ -23,6 +27,16 @@ class ConfluenceBase(ABC):
         self.observed_tf = observed_tf
         self.obsolete = obsolete
 
+    @property
+    @abstractmethod
+    def key(self) -> tuple:
+        """Identity of the confluence, the same however often it is detected."""
+
+    @property
+    @abstractmethod
+    def formation_ts(self) -> int:
+        """When the confluence was complete, as the ``ts_init`` of its last bar."""
+
     def to_dict(self) -> dict:
         return {
             "name": self.name,
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from typing import Generic
+
+from strategy.bar_buffer import BarWindow
+from strategy.confluence.base import TConfluence
+from strategy.key_level import KeyLevel
+from strategy.timeframe import Timeframe
+
+
+class ConfluenceDetector(ABC, Generic[TConfluence]):
+    """
+    Streaming detection of one confluence type on closed bars.
+
+    A detector declares the timeframes it runs on and how many of the latest
+    bars it looks at. The ``ConfluenceManager`` only calls it for bars of those
+    timeframes, once at least ``window_size`` of them have closed. The hooks let
+    a detector follow what it found or take liquidity levels; both do nothing
+    unless overridden.
+    """
+
+    confluence_type: type[TConfluence]
+    window_size: int
+
+    def __init__(self, timeframes: Iterable[Timeframe]):
+        self.timeframes = frozenset(timeframes)
+
+    @abstractmethod
+    def detect(self, tf: Timeframe, window: BarWindow) -> list[TConfluence]:
+        """Confluences completed by the last bar of ``window``, oldest bar first."""
+
+    def on_detected(self, found: list[TConfluence]) -> None:
+        """Called with what ``detect`` found once it is in the registry."""
+
+    def add_level(self, level: KeyLevel, is_high: bool, active_from: int) -> None:
+        """A liquidity level, watched from the first bar closing after ``active_from``."""
@@ -1,8 +1,15 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
 from nautilus_trader.model import Bar, Price
 
+from strategy.bar import RawBar
+from strategy.bar_buffer import BarBuffer, BarWindow
 from strategy.confluence.base import ConfluenceBase
+from strategy.confluence.detector import ConfluenceDetector
+from strategy.interval_index import IntervalIndex
 from strategy.price_range import PriceRange
 from strategy.timeframe import Timeframe
 
@@ -13,9 +20,13 @@ class FairValueGapType(Enum):
 
 
 class FairValueGap(ConfluenceBase):
+    registry_key = "fvgs"
     range: PriceRange
     type: FairValueGapType
     related_ts: list[int]
+    # Deepest share of the gap price has traded back into, and when it got to 1
+    fill_pct: float
+    filled_ts: int | None
 
     def __init__(
         self,
@@ -28,36 +39,54 @@ class FairValueGap(ConfluenceBase):
         self.range = rg
         self.related_ts = related_ts
         self.type = type
+        self.fill_pct = 0.0
+        self.filled_ts = None
+
+    @property
+    def key(self) -> tuple[int, ...]:
+        return tuple(self.related_ts)
+
+    @property
+    def formation_ts(self) -> int:
+        return max(self.related_ts)
 
     @classmethod
     def detect(cls, bars: list[Bar], tf: Timeframe) -> list["FairValueGap"]:
-        fvg_list: list[FairValueGap] = []
-        for i in range(1, len(bars) - 1):
-            prev_bar = bars[i + 1]
-            curr_bar = bars[i]
-            next_bar = bars[i - 1]
-
-            if prev_bar.high < next_bar.low:
-                rg = PriceRange(min_price=prev_bar.high, max_price=next_bar.low)
-                fvg = FairValueGap(
-                    rg,
-                    related_ts=[prev_bar.ts_init, curr_bar.ts_init, next_bar.ts_init],
-                    tf=tf,
-                    type=FairValueGapType.BULLISH,
-                )
-                fvg_list.append(fvg)
-
-            if prev_bar.low > next_bar.high:
-                rg = PriceRange(min_price=next_bar.high, max_price=prev_bar.low)
-                fvg = FairValueGap(
-                    rg,
-                    related_ts=[prev_bar.ts_init, curr_bar.ts_init, next_bar.ts_init],
-                    tf=tf,
-                    type=FairValueGapType.BEARISH,
-                )
-                fvg_list.append(fvg)
-
-        return fvg_list
+        if len(bars) < 3:
+            return []
+        # Bars come newest first, as the cache hands them out
+        buffer = BarBuffer(len(bars))
+        for bar in reversed(bars):
+            buffer.append(RawBar.from_bar(bar))
+        window = buffer.window(len(bars))
+        arrays = detect_fvg_arrays(window.high, window.low, window.ts_init)
+        return arrays.to_fair_value_gaps(tf, window.precision)[::-1]
+
+    @classmethod
+    def from_window(cls, window: BarWindow, tf: Timeframe) -> "FairValueGap | None":
+        """The FVG left by the middle of three bars, given oldest first."""
+        prev_high, _, next_high = window.high.tolist()
+        prev_low, _, next_low = window.low.tolist()
+        # A bar can't leave a gap on both sides, so at most one FVG per window
+        if prev_high < next_low:
+            min_raw, max_raw = prev_high, next_low
+            type_ = FairValueGapType.BULLISH
+        elif prev_low > next_high:
+            min_raw, max_raw = next_high, prev_low
+            type_ = FairValueGapType.BEARISH
+        else:
+            return None
+        rg = PriceRange(
+            min_price=Price.from_raw(min_raw, window.precision),
+            max_price=Price.from_raw(max_raw, window.precision),
+        )
+
+        return cls(
+            rg,
+            related_ts=window.ts_init.tolist(),
+            tf=tf,
+            type=type_,
+        )
 
     def to_dict(self) -> dict:
         data = super().to_dict()
@@ -84,3 +113,163 @@ class FairValueGap(ConfluenceBase):
         type_ = FairValueGapType(data["type"])
         related_ts = [b for b in data["related_ts"]]
         return cls(rg, related_ts, base_kwargs["observed_tf"], type_)
+
+
+class FairValueGapDetector(ConfluenceDetector[FairValueGap]):
+    """
+    Streaming FVG detection over the last three closed bars of a timeframe.
+
+    Gaps it finds are handed to ``tracker``, when given, to follow their fills.
+    """
+
+    confluence_type = FairValueGap
+    window_size = 3
+
+    def __init__(
+        self,
+        timeframes: Iterable[Timeframe],
+        tracker: "FairValueGapTracker | None" = None,
+    ):
+        super().__init__(timeframes)
+        self.tracker = tracker
+
+    def detect(self, tf: Timeframe, window: BarWindow) -> list[FairValueGap]:
+        fvg = FairValueGap.from_window(window, tf)
+        return [] if fvg is None else [fvg]
+
+    def on_detected(self, found: list[FairValueGap]) -> None:
+        if self.tracker is not None:
+            for fvg in found:
+                self.tracker.add(fvg)
+
+
+@dataclass(frozen=True)
+class FairValueGapFill:
+    """Price trading deeper into a gap, up to ``fill_pct`` of it at ``ts``."""
+
+    observed_tf: Timeframe
+    related_ts: tuple[int, ...]
+    ts: int
+    fill_pct: float
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FairValueGapFill":
+        return cls(
+            observed_tf=Timeframe(data["observed_tf"]),
+            related_ts=tuple(data["related_ts"]),
+            ts=data["ts"],
+            fill_pct=data["fill_pct"],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "observed_tf": self.observed_tf.value,
+            "related_ts": list(self.related_ts),
+            "ts": self.ts,
+            "fill_pct": self.fill_pct,
+        }
+
+
+class FairValueGapTracker:
+    """
+    Mitigation of the gaps that are not filled yet, across all timeframes.
+
+    Active gaps sit in an interval index over their raw price range, so a bar
+    only visits the gaps its own range overlaps: price jumping over a gap
+    between bars, across a weekend or a hole in the data, does not fill it. A
+    bullish gap fills from its top down and a bearish one from its bottom up;
+    once filled it is marked obsolete and retired.
+    """
+
+    def __init__(self):
+        self.active: IntervalIndex[FairValueGap] = IntervalIndex()
+
+    def add(self, fvg: FairValueGap) -> None:
+        self.active.add(fvg.range.min_price.raw, fvg.range.max_price.raw, fvg)
+
+    def update(self, bar: RawBar) -> list[FairValueGapFill]:
+        low, high = bar.low, bar.high
+        fills = []
+        for fvg in self.active.overlapping(low, high):
+            gap_low, gap_high = fvg.range.min_price.raw, fvg.range.max_price.raw
+            if fvg.type is FairValueGapType.BULLISH:
+                depth = gap_high - low
+            else:
+                depth = high - gap_low
+            fill_pct = min(1.0, depth / (gap_high - gap_low))
+            if fill_pct <= fvg.fill_pct:
+                continue
+            fvg.fill_pct = fill_pct
+            if fill_pct == 1.0:
+                fvg.filled_ts = bar.ts_event
+                fvg.obsolete = True
+                self.active.remove(fvg)
+            fills.append(
+                FairValueGapFill(fvg.observed_tf, fvg.key, bar.ts_event, fill_pct)
+            )
+        return fills
+
+
+@dataclass(frozen=True)
+class FairValueGapArrays:
+    """
+    Columnar FVGs, one row per gap in formation order.
+
+    Bounds are raw fixed-point prices and ``related_ts`` holds the ``ts_init`` of
+    the three bars of each window, oldest first.
+    """
+
+    bullish: np.ndarray
+    min_price: np.ndarray
+    max_price: np.ndarray
+    related_ts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.bullish)
+
+    @property
+    def formation_ts(self) -> np.ndarray:
+        return self.related_ts[:, 2]
+
+    def to_fair_value_gaps(self, tf: Timeframe, precision: int) -> list[FairValueGap]:
+        return [
+            FairValueGap(
+                PriceRange(
+                    min_price=Price.from_raw(int(min_price), precision),
+                    max_price=Price.from_raw(int(max_price), precision),
+                ),
+                related_ts=[int(ts) for ts in related_ts],
+                tf=tf,
+                type=FairValueGapType.BULLISH if bullish else FairValueGapType.BEARISH,
+            )
+            for bullish, min_price, max_price, related_ts in zip(
+                self.bullish, self.min_price, self.max_price, self.related_ts
+            )
+        ]
+
+
+def detect_fvg_arrays(
+    high: np.ndarray, low: np.ndarray, ts_init: np.ndarray
+) -> FairValueGapArrays:
+    """
+    Find every FVG over consecutive bars given as oldest first columns.
+
+    Gives the same gaps as feeding the bars one by one to a
+    ``FairValueGapDetector``, but compares whole shifted columns at once.
+    """
+    prev_high, next_high = high[:-2], high[2:]
+    prev_low, next_low = low[:-2], low[2:]
+
+    bullish = prev_high < next_low
+    bearish = ~bullish & (prev_low > next_high)
+    start = np.flatnonzero(bullish | bearish)
+    is_bullish = bullish[start]
+
+    return FairValueGapArrays(
+        bullish=is_bullish,
+        min_price=np.where(is_bullish, prev_high[start], next_high[start]),
+        max_price=np.where(is_bullish, next_low[start], prev_low[start]),
+        related_ts=np.stack(
+            [ts_init[start], ts_init[start + 1], ts_init[start + 2]], axis=1
+        ),
+    )
@@ -0,0 +1,252 @@
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+from heapq import heappop, heappush
+from itertools import count
+
+import numpy as np
+from nautilus_trader.model import Price
+
+from strategy.bar import RawBar
+from strategy.bar_buffer import BarWindow
+from strategy.confluence.base import ConfluenceBase
+from strategy.confluence.detector import ConfluenceDetector
+from strategy.key_level import KeyLevel, KeyLevelBook, KeyLevelTouch
+from strategy.price_range import PriceRange
+from strategy.timeframe import Timeframe
+
+
+class LiquiditySweepType(Enum):
+    # Stops resting above a high, taken out by a wick up
+    BUY_SIDE = "BUY_SIDE"
+    # Stops resting below a low, taken out by a wick down
+    SELL_SIDE = "SELL_SIDE"
+
+
+class LiquiditySweep(ConfluenceBase):
+    """
+    A bar trading through a liquidity level and closing back on its side.
+
+    The range spans the level and the tip of the wick that swept it.
+    """
+
+    registry_key = "liquidity_sweeps"
+    range: PriceRange
+    type: LiquiditySweepType
+    level: KeyLevel
+    ts: int
+
+    def __init__(
+        self,
+        level: KeyLevel,
+        rg: PriceRange,
+        ts: int,
+        tf: Timeframe,
+        type: LiquiditySweepType,
+    ):
+        super().__init__("LS", observed_tf=tf)
+        self.level = level
+        self.range = rg
+        self.ts = ts
+        self.type = type
+
+    @property
+    def key(self) -> tuple:
+        return self.level.name, self.level.ts, self.ts
+
+    @property
+    def formation_ts(self) -> int:
+        return self.ts
+
+    @classmethod
+    def from_touch(
+        cls, touch: KeyLevelTouch, bar: RawBar, tf: Timeframe
+    ) -> "LiquiditySweep":
+        level = touch.level
+        # Swept highs close back below the level, swept lows back above it
+        if bar.close < level.price.raw:
+            rg = PriceRange(min_price=level.price, max_price=bar.price(bar.high))
+            type_ = LiquiditySweepType.BUY_SIDE
+        else:
+            rg = PriceRange(min_price=bar.price(bar.low), max_price=level.price)
+            type_ = LiquiditySweepType.SELL_SIDE
+        return cls(level, rg, bar.ts_init, tf, type_)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update(
+            {
+                "level": self.level.to_dict(),
+                "range": {
+                    "min": str(self.range.min_price),
+                    "max": str(self.range.max_price),
+                },
+                "type": self.type.value,
+                "ts": self.ts,
+            }
+        )
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LiquiditySweep":
+        base_kwargs = cls._parse_base(data)
+        rg = PriceRange(
+            min_price=Price.from_str(data["range"]["min"]),
+            max_price=Price.from_str(data["range"]["max"]),
+        )
+        return cls(
+            KeyLevel.from_dict(data["level"]),
+            rg,
+            data["ts"],
+            base_kwargs["observed_tf"],
+            LiquiditySweepType(data["type"]),
+        )
+
+
+class LiquiditySweepDetector(ConfluenceDetector[LiquiditySweep]):
+    """
+    Sweeps of the liquidity levels handed to it, on each timeframe it runs on.
+
+    A level joins a timeframe's ``KeyLevelBook`` with the first bar closing after
+    its ``active_from`` and leaves it with the first bar that reaches it, which
+    is a sweep if it closes back. A bar costs O(log n + k) for k levels reached,
+    plus an O(n) insert per level joining the book.
+    """
+
+    confluence_type = LiquiditySweep
+    window_size = 1
+
+    def __init__(self, timeframes: Iterable[Timeframe]):
+        super().__init__(timeframes)
+        self.books = {tf: KeyLevelBook() for tf in self.timeframes}
+        # Levels not active yet, as heaps of (active_from, seq, level, is_high)
+        self._pending: dict[Timeframe, list[tuple]] = {tf: [] for tf in self.timeframes}
+        self._seq = count()
+
+    def add_level(self, level: KeyLevel, is_high: bool, active_from: int) -> None:
+        entry = (active_from, next(self._seq), level, is_high)
+        for pending in self._pending.values():
+            heappush(pending, entry)
+
+    def detect(self, tf: Timeframe, window: BarWindow) -> list[LiquiditySweep]:
+        bar = window.bar(-1)
+        book, pending = self.books[tf], self._pending[tf]
+        while pending and pending[0][0] < bar.ts_init:
+            _, _, level, is_high = heappop(pending)
+            if is_high:
+                book.add_high(level)
+            else:
+                book.add_low(level)
+        return [
+            LiquiditySweep.from_touch(touch, bar, tf)
+            for touch in book.update(bar)
+            if touch.swept
+        ]
+
+
+@dataclass(frozen=True)
+class LiquiditySweepArrays:
+    """
+    Columnar sweeps, one row per swept level in level order.
+
+    ``level`` indexes the levels given to ``detect_sweep_arrays``, ``extreme`` is
+    the raw tip of the sweeping wick and ``ts`` that bar's ``ts_init``.
+    """
+
+    level: np.ndarray
+    is_high: np.ndarray
+    extreme: np.ndarray
+    ts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.level)
+
+    def to_liquidity_sweeps(
+        self, levels: list[KeyLevel], tf: Timeframe, precision: int
+    ) -> list[LiquiditySweep]:
+        sweeps = []
+        for i, is_high, extreme, ts in zip(
+            self.level, self.is_high, self.extreme, self.ts
+        ):
+            level = levels[i]
+            wick = Price.from_raw(int(extreme), precision)
+            if is_high:
+                rg = PriceRange(min_price=level.price, max_price=wick)
+                type_ = LiquiditySweepType.BUY_SIDE
+            else:
+                rg = PriceRange(min_price=wick, max_price=level.price)
+                type_ = LiquiditySweepType.SELL_SIDE
+            sweeps.append(LiquiditySweep(level, rg, int(ts), tf, type_))
+        return sweeps
+
+
+def detect_sweep_arrays(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    ts_init: np.ndarray,
+    level_price: np.ndarray,
+    level_is_high: np.ndarray,
+    level_active_from: np.ndarray,
+) -> LiquiditySweepArrays:
+    """
+    Find which levels get swept over consecutive bars given as oldest first columns.
+
+    Gives the same sweeps as a ``LiquiditySweepDetector`` fed the same levels and
+    bars. The first bar to reach each level is found for all levels at once.
+    """
+    start = np.searchsorted(ts_init, level_active_from, side="right")
+    # A low is reached when the negated lows climb to its negated price
+    first = np.where(
+        level_is_high,
+        _first_reaching(high, start, level_price),
+        _first_reaching(-low, start, -level_price),
+    )
+
+    reached = np.flatnonzero(first < len(high))
+    bar = first[reached]
+    price, is_high = level_price[reached], level_is_high[reached]
+    swept = np.where(
+        is_high,
+        (high[bar] > price) & (close[bar] < price),
+        (low[bar] < price) & (close[bar] > price),
+    )
+
+    bar, is_high = bar[swept], is_high[swept]
+    return LiquiditySweepArrays(
+        level=reached[swept],
+        is_high=is_high,
+        extreme=np.where(is_high, high[bar], low[bar]),
+        ts=ts_init[bar],
+    )
+
+
+def _first_reaching(
+    values: np.ndarray, start: np.ndarray, target: np.ndarray
+) -> np.ndarray:
+    """
+    For each ``start``, the first index from it where ``values`` is at least
+    ``target``, or ``len(values)`` if there is none.
+
+    Binary lifting over a sparse table of window maxima: each of the log n steps
+    moves every query past the next power-of-two window still below its target.
+    """
+    n = len(values)
+    depth = n.bit_length()
+    size = 1 << depth
+    # Padding always reaches the target, so a search stops at n at the latest
+    padded = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+    padded[:n] = values
+    # maxima[k][i] is the maximum of padded[i : i + 2**k]
+    maxima = [padded]
+    for k in range(1, depth + 1):
+        half = 1 << (k - 1)
+        maxima.append(np.maximum(maxima[-1][:-half], maxima[-1][half:]))
+
+    pos = start.astype(np.int64)
+    for k in range(depth, -1, -1):
+        window_max = maxima[k]
+        fits = pos < len(window_max)
+        below = fits & (window_max[np.minimum(pos, len(window_max) - 1)] < target)
+        pos = np.where(below, pos + (1 << k), pos)
+    return pos
@@ -1,21 +1,89 @@
 from nautilus_trader.model import Bar
 
-from strategy.confluence.fvg import FairValueGap
+from strategy.bar import RawBar
+from strategy.bar_buffer import BarBuffer
+from strategy.confluence.detector import ConfluenceDetector
+from strategy.confluence.fvg import (
+    FairValueGapDetector,
+    FairValueGapFill,
+    FairValueGapTracker,
+)
+from strategy.confluence.liquidity_sweep import LiquiditySweepDetector
+from strategy.confluence.order_block import OrderBlockDetector
 from strategy.confluence.registry import ConfluenceRegistry
+from strategy.key_level import KeyLevel
 from strategy.timeframe import Timeframe
 
 
+def default_detectors(fvg_tracker: FairValueGapTracker) -> list[ConfluenceDetector]:
+    higher_tfs = [tf for tf in Timeframe if tf is not Timeframe.ONE_MINUTE]
+    return [
+        FairValueGapDetector(higher_tfs, fvg_tracker),
+        OrderBlockDetector(higher_tfs),
+        LiquiditySweepDetector(
+            [Timeframe.FIVE_MINUTE, Timeframe.FIFTEEN_MINUTE, Timeframe.ONE_HOUR]
+        ),
+    ]
+
+
 class ConfluenceManager:
     confluences: dict[Timeframe, ConfluenceRegistry]
+    detectors: list[ConfluenceDetector]
+    schedule: dict[Timeframe, list[ConfluenceDetector]]
+    fvg_tracker: FairValueGapTracker
 
-    def __init__(self):
+    def __init__(
+        self,
+        detectors: list[ConfluenceDetector] | None = None,
+        fvg_tracker: FairValueGapTracker | None = None,
+    ):
         self.confluences = {}
         self.init_confluences()
+        # Gaps stay tracked across days, until they are filled. Custom detectors
+        # feed the tracker by being given it
+        self.fvg_tracker = FairValueGapTracker() if fvg_tracker is None else fvg_tracker
+        # Detectors keep any state they have across the daily registry reset
+        self.detectors = (
+            default_detectors(self.fvg_tracker) if detectors is None else detectors
+        )
+        self.schedule = {
+            tf: [d for d in self.detectors if tf in d.timeframes] for tf in Timeframe
+        }
 
     def init_confluences(self):
         for tf in Timeframe:
             self.confluences[tf] = ConfluenceRegistry()
 
+    def window_size(self, tf: Timeframe) -> int:
+        """Latest bars the detectors scheduled on ``tf`` look at."""
+        return max((d.window_size for d in self.schedule[tf]), default=0)
+
     def detect_confluences(self, tf: Timeframe, bars: list[Bar]) -> None:
-        fvgs = FairValueGap.detect(bars, tf)
-        self.confluences[tf].add_fvgs(fvgs)
\ No newline at end of file
+        """Run ``tf``'s detectors over ``bars``, newest first as the cache has them."""
+        buffer = BarBuffer(max(len(bars), 1))
+        for bar in reversed(bars):
+            buffer.append(RawBar.from_bar(bar))
+            for detector in self.schedule[tf]:
+                if len(buffer) >= detector.window_size:
+                    window = buffer.window(detector.window_size)
+                    self.confluences[tf].add(detector.detect(tf, window))
+
+    def update_confluences(self, tf: Timeframe, bars: BarBuffer) -> None:
+        for detector in self.schedule[tf]:
+            if len(bars) < detector.window_size:
+                continue
+            found = detector.detect(tf, bars.window(detector.window_size))
+            if not found:
+                continue
+            self.confluences[tf].add(found)
+            detector.on_detected(found)
+
+    def add_liquidity_level(
+        self, level: KeyLevel, is_high: bool, active_from: int
+    ) -> None:
+        """Hand a level to every detector, watched from after ``active_from``."""
+        for detector in self.detectors:
+            detector.add_level(level, is_high, active_from)
+
+    def update_fvg_fills(self, bar: RawBar) -> list[FairValueGapFill]:
+        return self.fvg_tracker.update(bar)
@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from enum import Enum
+
+import numpy as np
+from nautilus_trader.model import Price
+
+from strategy.bar_buffer import BarWindow
+from strategy.confluence.base import ConfluenceBase
+from strategy.confluence.detector import ConfluenceDetector
+from strategy.price_range import PriceRange
+from strategy.timeframe import Timeframe
+
+
+class OrderBlockType(Enum):
+    BULLISH = "BULLISH"
+    BEARISH = "BEARISH"
+
+
+class OrderBlock(ConfluenceBase):
+    """
+    The last opposite bar before a displacement that closes beyond it.
+
+    A bullish block is a down bar followed by an up bar closing above its high,
+    a bearish block an up bar followed by a down bar closing below its low. The
+    block spans the range of the first bar.
+    """
+
+    registry_key = "order_blocks"
+    range: PriceRange
+    type: OrderBlockType
+    related_ts: list[int]
+
+    def __init__(
+        self,
+        rg: PriceRange,
+        related_ts: list[int],
+        tf: Timeframe,
+        type: OrderBlockType,
+    ):
+        super().__init__("OB", observed_tf=tf)
+        self.range = rg
+        self.related_ts = related_ts
+        self.type = type
+
+    @property
+    def key(self) -> tuple[int, ...]:
+        return tuple(self.related_ts)
+
+    @property
+    def formation_ts(self) -> int:
+        return max(self.related_ts)
+
+    @classmethod
+    def from_window(cls, window: BarWindow, tf: Timeframe) -> "OrderBlock | None":
+        """The order block left by the last two bars, given oldest first."""
+        prev_open, open_ = window.open.tolist()
+        prev_high, _ = window.high.tolist()
+        prev_low, _ = window.low.tolist()
+        prev_close, close = window.close.tolist()
+        if prev_close < prev_open and close > open_ and close > prev_high:
+            type_ = OrderBlockType.BULLISH
+        elif prev_close > prev_open and close < open_ and close < prev_low:
+            type_ = OrderBlockType.BEARISH
+        else:
+            return None
+        rg = PriceRange(
+            min_price=Price.from_raw(prev_low, window.precision),
+            max_price=Price.from_raw(prev_high, window.precision),
+        )
+
+        return cls(rg, related_ts=window.ts_init.tolist(), tf=tf, type=type_)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data.update(
+            {
+                "range": {
+                    "min": str(self.range.min_price),
+                    "max": str(self.range.max_price),
+                },
+                "type": self.type.value,
+                "related_ts": list(self.related_ts),
+            }
+        )
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "OrderBlock":
+        base_kwargs = cls._parse_base(data)
+        rg = PriceRange(
+            min_price=Price.from_str(data["range"]["min"]),
+            max_price=Price.from_str(data["range"]["max"]),
+        )
+        type_ = OrderBlockType(data["type"])
+        return cls(rg, list(data["related_ts"]), base_kwargs["observed_tf"], type_)
+
+
+class OrderBlockDetector(ConfluenceDetector[OrderBlock]):
+    """Streaming order block detection over the last two closed bars."""
+
+    confluence_type = OrderBlock
+    window_size = 2
+
+    def detect(self, tf: Timeframe, window: BarWindow) -> list[OrderBlock]:
+        block = OrderBlock.from_window(window, tf)
+        return [] if block is None else [block]
+
+
+@dataclass(frozen=True)
+class OrderBlockArrays:
+    """
+    Columnar order blocks, one row per block in formation order.
+
+    Bounds are raw fixed-point prices and ``related_ts`` holds the ``ts_init`` of
+    the two bars of each window, oldest first.
+    """
+
+    bullish: np.ndarray
+    min_price: np.ndarray
+    max_price: np.ndarray
+    related_ts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.bullish)
+
+    @property
+    def formation_ts(self) -> np.ndarray:
+        return self.related_ts[:, 1]
+
+    def to_order_blocks(self, tf: Timeframe, precision: int) -> list[OrderBlock]:
+        return [
+            OrderBlock(
+                PriceRange(
+                    min_price=Price.from_raw(int(min_price), precision),
+                    max_price=Price.from_raw(int(max_price), precision),
+                ),
+                related_ts=[int(ts) for ts in related_ts],
+                tf=tf,
+                type=OrderBlockType.BULLISH if bullish else OrderBlockType.BEARISH,
+            )
+            for bullish, min_price, max_price, related_ts in zip(
+                self.bullish, self.min_price, self.max_price, self.related_ts
+            )
+        ]
+
+
+def detect_order_block_arrays(
+    open: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    ts_init: np.ndarray,
+) -> OrderBlockArrays:
+    """
+    Find every order block over consecutive bars given as oldest first columns.
+
+    Gives the same blocks as an ``OrderBlockDetector`` fed the bars one by one.
+    """
+    prev_up, prev_down = close[:-1] > open[:-1], close[:-1] < open[:-1]
+    up, down = close[1:] > open[1:], close[1:] < open[1:]
+
+    bullish = prev_down & up & (close[1:] > high[:-1])
+    bearish = prev_up & down & (close[1:] < low[:-1])
+    start = np.flatnonzero(bullish | bearish)
+
+    return OrderBlockArrays(
+        bullish=bullish[start],
+        min_price=low[start],
+        max_price=high[start],
+        related_ts=np.stack([ts_init[start], ts_init[start + 1]], axis=1),
+    )
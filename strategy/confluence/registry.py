@@ -1,25 +1,123 @@
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from typing import Generic
 
+from nautilus_trader.model import Price
+
+from strategy.confluence.base import ConfluenceBase, TConfluence
 from strategy.confluence.fvg import FairValueGap
+from strategy.confluence.liquidity_sweep import LiquiditySweep
+from strategy.confluence.order_block import OrderBlock
+from strategy.interval_index import IntervalIndex
+
+# Confluence types a registry (de)serialises, by their registry key
+CONFLUENCE_TYPES: dict[str, type[ConfluenceBase]] = {
+    cls.registry_key: cls for cls in (FairValueGap, OrderBlock, LiquiditySweep)
+}
+
+
+class ConfluenceStore(Generic[TConfluence]):
+    """Confluences of one type, indexed by formation time and price range."""
+
+    def __init__(self):
+        self.items: list[TConfluence] = []
+        self._keys: set[tuple] = set()
+        # Parallel lists kept sorted by formation time. Confluences mostly
+        # arrive in formation order, where an insert is an append, but one
+        # landing earlier shifts the entries after it, O(n)
+        self._formed_ts: list[int] = []
+        self._by_formation: list[TConfluence] = []
+        self._ranges: IntervalIndex[TConfluence] = IntervalIndex()
+
+    def add(self, confluence: TConfluence) -> None:
+        if confluence.key in self._keys:
+            return
+        self._keys.add(confluence.key)
+        self.items.append(confluence)
+
+        idx = bisect_right(self._formed_ts, confluence.formation_ts)
+        self._formed_ts.insert(idx, confluence.formation_ts)
+        self._by_formation.insert(idx, confluence)
+
+        rg = confluence.range
+        self._ranges.add(rg.min_price.raw, rg.max_price.raw, confluence)
+
+    def containing(
+        self, price: Price, include_obsolete: bool = False
+    ) -> list[TConfluence]:
+        found = self._ranges.containing(price.raw)
+        if include_obsolete:
+            return found
+        return [c for c in found if not c.obsolete]
+
+    def overlapping(
+        self, low: Price, high: Price, include_obsolete: bool = False
+    ) -> list[TConfluence]:
+        found = self._ranges.overlapping(low.raw, high.raw)
+        if include_obsolete:
+            return found
+        return [c for c in found if not c.obsolete]
+
+    def formed_between(self, start_ts: int, end_ts: int) -> list[TConfluence]:
+        lo = bisect_left(self._formed_ts, start_ts)
+        hi = bisect_right(self._formed_ts, end_ts)
+        return self._by_formation[lo:hi]
 
 
-@dataclass()
 class ConfluenceRegistry:
-    fvgs: list[FairValueGap]
+    """
+    The confluences of one timeframe, with a store per confluence type.
+
+    Stores are created by the first confluence of their type, so types that are
+    never detected on a timeframe cost it nothing.
+    """
 
     def __init__(self):
-        self.fvgs = list()
+        self._stores: dict[type[ConfluenceBase], ConfluenceStore] = {}
+
+    def add(self, confluences: list[ConfluenceBase]):
+        for confluence in confluences:
+            store = self._stores.get(type(confluence))
+            if store is None:
+                store = self._stores[type(confluence)] = ConfluenceStore()
+            store.add(confluence)
+
+    def store(self, cls: type[TConfluence]) -> ConfluenceStore[TConfluence]:
+        store = self._stores.get(cls)
+        return store if store is not None else ConfluenceStore()
+
+    def of_type(self, cls: type[TConfluence]) -> list[TConfluence]:
+        store = self._stores.get(cls)
+        return store.items if store is not None else []
+
+    @property
+    def fvgs(self) -> list[FairValueGap]:
+        return self.of_type(FairValueGap)
 
     def add_fvgs(self, fvgs: list[FairValueGap]):
-        for fvg in fvgs:
-            if fvg.related_ts not in [existing.related_ts for existing in self.fvgs]:
-                self.fvgs.append(fvg)
+        self.add(fvgs)
+
+    def fvgs_containing(
+        self, price: Price, include_obsolete: bool = False
+    ) -> list[FairValueGap]:
+        return self.store(FairValueGap).containing(price, include_obsolete)
+
+    def fvgs_overlapping(
+        self, low: Price, high: Price, include_obsolete: bool = False
+    ) -> list[FairValueGap]:
+        return self.store(FairValueGap).overlapping(low, high, include_obsolete)
+
+    def fvgs_formed_between(self, start_ts: int, end_ts: int) -> list[FairValueGap]:
+        return self.store(FairValueGap).formed_between(start_ts, end_ts)
 
     def to_dict(self) -> dict:
-        return {"fvgs": [fvg.to_dict() for fvg in self.fvgs]}
+        return {
+            key: [c.to_dict() for c in self.of_type(cls)]
+            for key, cls in CONFLUENCE_TYPES.items()
+        }
 
     @classmethod
     def from_dict(cls, data: dict):
         registry = cls()
-        registry.fvgs = list([FairValueGap.from_dict(d) for d in data.get("fvgs", [])])
+        for key, confluence_type in CONFLUENCE_TYPES.items():
+            registry.add([confluence_type.from_dict(d) for d in data.get(key, [])])
         return registry
@@ -1,7 +1,10 @@
+from dataclasses import replace
+
+from strategy.confluence.fvg import FairValueGapFill
 from strategy.confluence.registry import ConfluenceRegistry
 import json
 from strategy.session import SessionEntity
-from strategy.key_level import KeyLevels
+from strategy.key_level import KeyLevels, KeyLevelTouch
 from strategy.timeframe import Timeframe
 
 
@@ -10,6 +13,86 @@ class StrategyHistory:
         self.sessions: list[SessionEntity] = []
         self.daily_key_levels: list[KeyLevels] = []
         self.daily_confluences: list[dict[Timeframe, ConfluenceRegistry]] = []
+        self.daily_ts: list[int] = []
+        self.key_level_touches: list[KeyLevelTouch] = []
+        self.fvg_fills: list[FairValueGapFill] = []
+
+    def add_session(self, session: SessionEntity):
+        self.sessions.append(session)
+
+    def add_key_level_touch(self, touch: KeyLevelTouch):
+        self.key_level_touches.append(touch)
+
+    def add_fvg_fill(self, fill: FairValueGapFill):
+        self.fvg_fills.append(fill)
+
+    def add_day(
+        self,
+        ts: int,
+        key_levels: KeyLevels,
+        confluences: dict[Timeframe, ConfluenceRegistry],
+    ):
+        self.daily_ts.append(ts)
+        self.daily_key_levels.append(key_levels)
+        self.daily_confluences.append(confluences)
+
+    def mark_touched_key_levels(self):
+        """Set ``touched`` on the recorded key levels that have a touch event."""
+        touched = {touch.level.key for touch in self.key_level_touches}
+        for levels in self.daily_key_levels:
+            for slot, value in vars(levels).items():
+                if isinstance(value, list):
+                    setattr(
+                        levels,
+                        slot,
+                        [
+                            replace(kl, touched=True) if kl.key in touched else kl
+                            for kl in value
+                        ],
+                    )
+                elif value is not None and value.key in touched:
+                    setattr(levels, slot, replace(value, touched=True))
+
+    def mark_fvg_fills(self):
+        """Set fill state and ``obsolete`` on the recorded FVGs from fill events."""
+        fills = {}
+        for fill in sorted(self.fvg_fills, key=lambda f: f.ts):
+            fills[(fill.observed_tf, fill.related_ts)] = fill
+        for confluences in self.daily_confluences:
+            for tf, registry in confluences.items():
+                for fvg in registry.fvgs:
+                    fill = fills.get((tf, fvg.key))
+                    if fill is None:
+                        continue
+                    fvg.fill_pct = fill.fill_pct
+                    if fill.fill_pct == 1.0:
+                        fvg.filled_ts = fill.ts
+                        fvg.obsolete = True
+
+    def dump_to_file(self, file_path: str):
+        if file_path.endswith(".json"):
+            self.dump_to_json_file(file_path)
+        else:
+            self.dump_to_parquet(file_path)
+
+    @staticmethod
+    def load_from_file(file_path: str) -> "StrategyHistory":
+        if file_path.endswith(".json"):
+            return StrategyHistory.load_from_json_file(file_path)
+        return StrategyHistory.load_from_parquet(file_path)
+
+    def dump_to_parquet(self, dir_path: str):
+        from strategy.history_store import write_history
+
+        write_history(self, dir_path)
+
+    @staticmethod
+    def load_from_parquet(
+        dir_path: str, start_ts: int | None = None, end_ts: int | None = None
+    ) -> "StrategyHistory":
+        from strategy.history_store import read_history
+
+        return read_history(dir_path, start_ts, end_ts)
 
     def dump_to_json_file(self, file_path: str):
         import json
@@ -21,6 +104,9 @@ class StrategyHistory:
                 {tf.value: registry.to_dict() for tf, registry in confluences.items()}
                 for confluences in self.daily_confluences
             ],
+            "daily_ts": self.daily_ts,
+            "key_level_touches": [touch.to_dict() for touch in self.key_level_touches],
+            "fvg_fills": [fill.to_dict() for fill in self.fvg_fills],
         }
 
         with open(file_path, "w") as f:
@@ -35,10 +121,16 @@ class StrategyHistory:
             sessions_data = data
             key_levels_data = []
             confluences_data = []
+            daily_ts = []
+            touches_data = []
+            fills_data = []
         else:
             sessions_data = data.get("sessions", [])
             key_levels_data = data.get("daily_key_levels", [])
             confluences_data = data.get("daily_confluences", [])
+            daily_ts = data.get("daily_ts", [])
+            touches_data = data.get("key_level_touches", [])
+            fills_data = data.get("fvg_fills", [])
 
         history = StrategyHistory()
 
@@ -59,4 +151,15 @@ class StrategyHistory:
                 day_confluences[tf] = registry
             history.daily_confluences.append(day_confluences)
 
+        history.daily_ts = list(daily_ts)
+
+        history.key_level_touches = [
+            KeyLevelTouch.from_dict(touch_data) for touch_data in touches_data
+        ]
+        history.fvg_fills = [
+            FairValueGapFill.from_dict(fill_data) for fill_data in fills_data
+        ]
+        history.mark_touched_key_levels()
+        history.mark_fvg_fills()
+
         return history
@@ -0,0 +1,643 @@
+"""
+Columnar Parquet storage for ``StrategyHistory``.
+
+A history is a directory with one sub-directory per table, each holding one or
+more ``part-*.parquet`` files:
+
+- ``sessions``: one row per closed session
+- ``key_levels``: one row per key level, tagged with its ``day`` and ``slot``
+- ``fvgs``: one row per fair value gap, tagged with its ``day``
+- ``order_blocks``: one row per order block, tagged with its ``day``
+- ``liquidity_sweeps``: one row per swept liquidity level, tagged with its ``day``
+- ``key_level_touches``: one row per key level reached by price, whatever day
+  the level itself belongs to
+- ``fvg_fills``: one row each time price trades deeper into a fair value gap
+- ``days``: one row per closed trading day (``day`` index, daily bar ``ts``)
+
+Timestamps are int64 unix nanoseconds and prices are int64 fixed-point values
+at the row's ``price_precision``, so nothing needs string parsing on the way
+back in. Tables can be read column by column or filtered by time range.
+"""
+
+import queue
+import threading
+from contextlib import nullcontext
+from datetime import time
+from os import PathLike
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from nautilus_trader.model import Price
+from nautilus_trader.model.objects import FIXED_PRECISION
+
+from strategy.confluence.fvg import FairValueGap, FairValueGapFill, FairValueGapType
+from strategy.confluence.liquidity_sweep import LiquiditySweep, LiquiditySweepType
+from strategy.confluence.order_block import OrderBlock, OrderBlockType
+from strategy.confluence.registry import ConfluenceRegistry
+from strategy.history import StrategyHistory
+from strategy.key_level import KeyLevel, KeyLevels, KeyLevelTouch
+from strategy.price_range import PriceRange
+from strategy.session import (
+    SessionEntity,
+    SessionMetadata,
+    SessionState,
+    dt_to_unix_nanos,
+    unix_nanos_to_dt,
+)
+from strategy.timeframe import Timeframe
+from strategy.tracing import TraceRecorder
+
+KEY_LEVEL_SLOTS = [
+    "hour_4_high",
+    "hour_4_low",
+    "hour_1_high",
+    "hour_1_low",
+    "prev_day_high",
+    "prev_day_low",
+]
+
+SCHEMAS: dict[str, pa.Schema] = {
+    "sessions": pa.schema(
+        [
+            ("name", pa.string()),
+            ("tz", pa.string()),
+            ("open_time", pa.string()),
+            ("close_time", pa.string()),
+            ("open_utc", pa.int64()),
+            ("close_utc", pa.int64()),
+            ("high", pa.int64()),
+            ("low", pa.int64()),
+            ("price_precision", pa.int8()),
+        ]
+    ),
+    "key_levels": pa.schema(
+        [
+            ("day", pa.int32()),
+            ("slot", pa.string()),
+            ("name", pa.string()),
+            ("price", pa.int64()),
+            ("price_precision", pa.int8()),
+            ("ts", pa.int64()),
+            ("observed_tf", pa.string()),
+            ("touched", pa.bool_()),
+        ]
+    ),
+    "fvgs": pa.schema(
+        [
+            ("day", pa.int32()),
+            ("observed_tf", pa.string()),
+            ("type", pa.string()),
+            ("min_price", pa.int64()),
+            ("max_price", pa.int64()),
+            ("price_precision", pa.int8()),
+            ("ts", pa.int64()),
+            ("related_ts", pa.list_(pa.int64())),
+        ]
+    ),
+    "order_blocks": pa.schema(
+        [
+            ("day", pa.int32()),
+            ("observed_tf", pa.string()),
+            ("type", pa.string()),
+            ("min_price", pa.int64()),
+            ("max_price", pa.int64()),
+            ("price_precision", pa.int8()),
+            ("ts", pa.int64()),
+            ("related_ts", pa.list_(pa.int64())),
+        ]
+    ),
+    "liquidity_sweeps": pa.schema(
+        [
+            ("day", pa.int32()),
+            ("observed_tf", pa.string()),
+            ("type", pa.string()),
+            ("min_price", pa.int64()),
+            ("max_price", pa.int64()),
+            ("price_precision", pa.int8()),
+            ("ts", pa.int64()),
+            ("level_name", pa.string()),
+            ("level_price", pa.int64()),
+            ("level_ts", pa.int64()),
+            ("level_observed_tf", pa.string()),
+        ]
+    ),
+    "key_level_touches": pa.schema(
+        [
+            ("name", pa.string()),
+            ("price", pa.int64()),
+            ("price_precision", pa.int8()),
+            ("level_ts", pa.int64()),
+            ("observed_tf", pa.string()),
+            ("ts", pa.int64()),
+            ("swept", pa.bool_()),
+        ]
+    ),
+    "fvg_fills": pa.schema(
+        [
+            ("observed_tf", pa.string()),
+            ("related_ts", pa.list_(pa.int64())),
+            ("ts", pa.int64()),
+            ("fill_pct", pa.float64()),
+        ]
+    ),
+    # Written last, so a day only shows up once its rows are on disk
+    "days": pa.schema([("day", pa.int32()), ("ts", pa.int64())]),
+}
+
+# Column each table is filtered on when reading a time range
+TIME_COLUMNS = {
+    "days": "ts",
+    "sessions": "open_utc",
+    "key_levels": "ts",
+    "fvgs": "ts",
+    "order_blocks": "ts",
+    "liquidity_sweeps": "ts",
+    "key_level_touches": "ts",
+    "fvg_fills": "ts",
+}
+
+
+def price_to_fixed(price: Price) -> int:
+    return price.raw // 10 ** (FIXED_PRECISION - price.precision)
+
+
+def fixed_to_price(value: int, precision: int) -> Price:
+    return Price.from_raw(value * 10 ** (FIXED_PRECISION - precision), precision)
+
+
+def history_to_tables(
+    history: StrategyHistory, first_day: int = 0
+) -> dict[str, pa.Table]:
+    rows: dict[str, list[dict]] = {name: [] for name in SCHEMAS}
+
+    for session in history.sessions:
+        rows["sessions"].append(_session_row(session))
+
+    for i, levels in enumerate(history.daily_key_levels):
+        for slot in KEY_LEVEL_SLOTS:
+            for kl in _slot_levels(levels, slot):
+                rows["key_levels"].append(_key_level_row(first_day + i, slot, kl))
+
+    for i, confluences in enumerate(history.daily_confluences):
+        for registry in confluences.values():
+            for fvg in registry.fvgs:
+                rows["fvgs"].append(_fvg_row(first_day + i, fvg))
+            for block in registry.of_type(OrderBlock):
+                rows["order_blocks"].append(_order_block_row(first_day + i, block))
+            for sweep in registry.of_type(LiquiditySweep):
+                rows["liquidity_sweeps"].append(_sweep_row(first_day + i, sweep))
+
+    for touch in history.key_level_touches:
+        rows["key_level_touches"].append(_key_level_touch_row(touch))
+
+    for fill in history.fvg_fills:
+        rows["fvg_fills"].append(fill.to_dict())
+
+    n_days = max(len(history.daily_key_levels), len(history.daily_confluences))
+    for i in range(n_days):
+        ts = history.daily_ts[i] if i < len(history.daily_ts) else None
+        rows["days"].append({"day": first_day + i, "ts": ts})
+
+    return {
+        name: pa.Table.from_pylist(table_rows, schema=SCHEMAS[name])
+        for name, table_rows in rows.items()
+    }
+
+
+def write_history(history: StrategyHistory, path: PathLike[str] | str) -> None:
+    path = Path(path)
+    clear_history(path)
+    for name, table in history_to_tables(history).items():
+        write_part(path, name, table, 0)
+
+
+def clear_history(path: Path) -> None:
+    for name in SCHEMAS:
+        for file in (path / name).glob("*part-*.parquet*"):
+            file.unlink()
+
+
+def write_part(path: Path, name: str, table: pa.Table, part: int) -> None:
+    table_dir = path / name
+    table_dir.mkdir(parents=True, exist_ok=True)
+    # Write then rename so readers never see a half-written part
+    tmp_file = table_dir / f".part-{part:06d}.parquet.tmp"
+    pq.write_table(table, tmp_file)
+    tmp_file.replace(table_dir / f"part-{part:06d}.parquet")
+
+
+class HistoryWriter:
+    """
+    Streams strategy history to disk while the backtest runs.
+
+    Records are buffered per trading day and every ``batch_days`` days handed to
+    a background thread, which writes them as a new set of Parquet parts. The
+    hand-off queue is bounded, so the strategy only ever holds a few batches in
+    memory, and everything flushed before an aborted run stays readable with
+    ``read_history``. A ``.json`` path falls back to a single JSON dump on close.
+    With a ``tracer``, flushes and the writes of each batch are traced.
+    """
+
+    def __init__(
+        self,
+        path: PathLike[str] | str,
+        batch_days: int = 1,
+        max_pending_batches: int = 4,
+        tracer: TraceRecorder | None = None,
+    ):
+        self.path = Path(path)
+        self.tracer = tracer
+        if tracer is not None:
+            self.flush = tracer.timed("HistoryWriter.flush", self.flush, "history")
+        self.batch_days = batch_days
+        self.streaming = self.path.suffix != ".json"
+        self._buffer = StrategyHistory()
+        self._next_day = 0
+        self._next_part = 0
+        self._error: BaseException | None = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+        self._thread: threading.Thread | None = None
+        if self.streaming:
+            clear_history(self.path)
+            self._thread = threading.Thread(
+                target=self._run, name="history-writer", daemon=True
+            )
+            self._thread.start()
+
+    def add_session(self, session: SessionEntity) -> None:
+        self._buffer.add_session(session)
+
+    def add_key_level_touch(self, touch: KeyLevelTouch) -> None:
+        self._buffer.add_key_level_touch(touch)
+
+    def add_fvg_fill(self, fill: FairValueGapFill) -> None:
+        self._buffer.add_fvg_fill(fill)
+
+    def add_day(
+        self,
+        ts: int,
+        key_levels: KeyLevels,
+        confluences: dict[Timeframe, ConfluenceRegistry],
+    ) -> None:
+        self._buffer.add_day(ts, key_levels, confluences)
+        if self.streaming and len(self._buffer.daily_ts) >= self.batch_days:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.streaming:
+            return
+        if self._error is not None:
+            raise RuntimeError("History writer failed") from self._error
+        batch, self._buffer = self._buffer, StrategyHistory()
+        self._queue.put((batch, self._next_day, self._next_part))
+        self._next_day += len(batch.daily_ts)
+        self._next_part += 1
+
+    def close(self) -> None:
+        if not self.streaming:
+            self._buffer.dump_to_json_file(str(self.path))
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError("History writer failed") from self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            batch, first_day, part = item
+            span = nullcontext()
+            if self.tracer is not None:
+                args = {"part": part, "days": len(batch.daily_ts)}
+                if batch.daily_ts:
+                    args["ts"] = batch.daily_ts[0]
+                span = self.tracer.span("HistoryWriter.write", "history", **args)
+            try:
+                with span:
+                    for name, table in history_to_tables(batch, first_day).items():
+                        if table.num_rows:
+                            write_part(self.path, name, table, part)
+            except BaseException as e:
+                self._error = e
+
+
+def read_table(
+    path: PathLike[str] | str,
+    name: str,
+    columns: list[str] | None = None,
+    start_ts: int | None = None,
+    end_ts: int | None = None,
+) -> pa.Table:
+    """Read one history table, optionally only some columns and a ``[start, end)`` range."""
+    ts_col = ds.field(TIME_COLUMNS[name])
+    expr = None
+    if start_ts is not None:
+        expr = ts_col >= start_ts
+    if end_ts is not None:
+        expr = ts_col < end_ts if expr is None else expr & (ts_col < end_ts)
+    return _read(path, name, columns, expr)
+
+
+def _read(
+    path: PathLike[str] | str,
+    name: str,
+    columns: list[str] | None = None,
+    expr: ds.Expression | None = None,
+) -> pa.Table:
+    table_dir = Path(path) / name
+    files = sorted(table_dir.glob("part-*.parquet")) if table_dir.exists() else []
+    if not files:
+        table = SCHEMAS[name].empty_table()
+        return table.select(columns) if columns else table
+    dataset = ds.dataset(files, schema=SCHEMAS[name], format="parquet")
+    return dataset.to_table(columns=columns, filter=expr)
+
+
+def read_dataframe(
+    path: PathLike[str] | str,
+    name: str,
+    columns: list[str] | None = None,
+    start_ts: int | None = None,
+    end_ts: int | None = None,
+) -> pd.DataFrame:
+    return read_table(path, name, columns, start_ts, end_ts).to_pandas()
+
+
+def read_history(
+    path: PathLike[str] | str,
+    start_ts: int | None = None,
+    end_ts: int | None = None,
+) -> StrategyHistory:
+    """
+    Load a history, or the part of it inside ``[start_ts, end_ts)``.
+
+    When a range is given, sessions are selected by their open time, key level
+    touches and FVG fills by their own time and days by their daily bar
+    timestamp, along with all key levels and FVGs of those days.
+    """
+    history = StrategyHistory()
+
+    sessions = read_table(path, "sessions", start_ts=start_ts, end_ts=end_ts)
+    history.sessions = [_session_from_row(row) for row in sessions.to_pylist()]
+
+    days = read_table(path, "days", start_ts=start_ts, end_ts=end_ts).to_pylist()
+    days.sort(key=lambda row: row["day"])
+    day_pos = {row["day"]: i for i, row in enumerate(days)}
+    history.daily_ts = [row["ts"] for row in days]
+    history.daily_key_levels = [KeyLevels() for _ in days]
+    history.daily_confluences = [
+        {tf: ConfluenceRegistry() for tf in Timeframe} for _ in days
+    ]
+
+    day_filter = ds.field("day").isin(list(day_pos.keys()))
+    for row in _read(path, "key_levels", expr=day_filter).to_pylist():
+        _add_key_level(history.daily_key_levels[day_pos[row["day"]]], row)
+    for row in _read(path, "fvgs", expr=day_filter).to_pylist():
+        fvg = _fvg_from_row(row)
+        history.daily_confluences[day_pos[row["day"]]][fvg.observed_tf].add([fvg])
+    for row in _read(path, "order_blocks", expr=day_filter).to_pylist():
+        block = _order_block_from_row(row)
+        history.daily_confluences[day_pos[row["day"]]][block.observed_tf].add([block])
+    for row in _read(path, "liquidity_sweeps", expr=day_filter).to_pylist():
+        sweep = _sweep_from_row(row)
+        history.daily_confluences[day_pos[row["day"]]][sweep.observed_tf].add([sweep])
+
+    touches = read_table(path, "key_level_touches", start_ts=start_ts, end_ts=end_ts)
+    history.key_level_touches = [
+        _key_level_touch_from_row(row) for row in touches.to_pylist()
+    ]
+    fills = read_table(path, "fvg_fills", start_ts=start_ts, end_ts=end_ts)
+    history.fvg_fills = [FairValueGapFill.from_dict(row) for row in fills.to_pylist()]
+    history.mark_touched_key_levels()
+    history.mark_fvg_fills()
+
+    return history
+
+
+def convert_json_history(
+    json_path: PathLike[str] | str, path: PathLike[str] | str
+) -> None:
+    """Convert a history written by ``StrategyHistory.dump_to_json_file``."""
+    history = StrategyHistory.load_from_json_file(str(json_path))
+    if not history.daily_ts:
+        # Older files have no daily timestamps; the latest item of each day
+        # is a close enough stand-in for range queries
+        history.daily_ts = [
+            _latest_ts(levels, confluences)
+            for levels, confluences in zip(
+                history.daily_key_levels, history.daily_confluences
+            )
+        ]
+    write_history(history, path)
+
+
+def _latest_ts(levels: KeyLevels, confluences: dict[Timeframe, ConfluenceRegistry]):
+    ts = [kl.ts for slot in KEY_LEVEL_SLOTS for kl in _slot_levels(levels, slot)]
+    ts.extend(
+        fvg.formation_ts for registry in confluences.values() for fvg in registry.fvgs
+    )
+    return max(ts) if ts else None
+
+
+def _slot_levels(levels: KeyLevels, slot: str) -> list[KeyLevel]:
+    value = getattr(levels, slot)
+    if isinstance(value, list):
+        return value
+    return [value] if value is not None else []
+
+
+def _session_row(session: SessionEntity) -> dict:
+    state = session.state
+    price = state.high or state.low
+    return {
+        "name": session.metadata.name,
+        "tz": session.metadata.tz,
+        "open_time": session.metadata.open_time.isoformat(),
+        "close_time": session.metadata.close_time.isoformat(),
+        "open_utc": dt_to_unix_nanos(state.open_utc) if state.open_utc else None,
+        "close_utc": dt_to_unix_nanos(state.close_utc) if state.close_utc else None,
+        "high": price_to_fixed(state.high) if state.high else None,
+        "low": price_to_fixed(state.low) if state.low else None,
+        "price_precision": price.precision if price else None,
+    }
+
+
+def _session_from_row(row: dict) -> SessionEntity:
+    metadata = SessionMetadata(
+        name=row["name"],
+        tz=row["tz"],
+        open_time=time.fromisoformat(row["open_time"]),
+        close_time=time.fromisoformat(row["close_time"]),
+    )
+    precision = row["price_precision"]
+    state = SessionState(
+        high=fixed_to_price(row["high"], precision)
+        if row["high"] is not None
+        else None,
+        low=fixed_to_price(row["low"], precision) if row["low"] is not None else None,
+        open_utc=(
+            unix_nanos_to_dt(row["open_utc"]) if row["open_utc"] is not None else None
+        ),
+        close_utc=(
+            unix_nanos_to_dt(row["close_utc"]) if row["close_utc"] is not None else None
+        ),
+    )
+    return SessionEntity(metadata, state)
+
+
+def _key_level_row(day: int, slot: str, kl: KeyLevel) -> dict:
+    return {
+        "day": day,
+        "slot": slot,
+        "name": kl.name,
+        "price": price_to_fixed(kl.price),
+        "price_precision": kl.price.precision,
+        "ts": kl.ts,
+        "observed_tf": kl.observed_tf.value,
+        "touched": kl.touched,
+    }
+
+
+def _add_key_level(levels: KeyLevels, row: dict) -> None:
+    kl = KeyLevel(
+        price=fixed_to_price(row["price"], row["price_precision"]),
+        name=row["name"],
+        ts=row["ts"],
+        observed_tf=Timeframe(row["observed_tf"]),
+        touched=row["touched"],
+    )
+    slot = row["slot"]
+    if isinstance(getattr(levels, slot), list):
+        getattr(levels, slot).append(kl)
+    else:
+        setattr(levels, slot, kl)
+
+
+def _key_level_touch_row(touch: KeyLevelTouch) -> dict:
+    return {
+        "name": touch.level.name,
+        "price": price_to_fixed(touch.level.price),
+        "price_precision": touch.level.price.precision,
+        "level_ts": touch.level.ts,
+        "observed_tf": touch.level.observed_tf.value,
+        "ts": touch.ts,
+        "swept": touch.swept,
+    }
+
+
+def _key_level_touch_from_row(row: dict) -> KeyLevelTouch:
+    level = KeyLevel(
+        price=fixed_to_price(row["price"], row["price_precision"]),
+        name=row["name"],
+        ts=row["level_ts"],
+        observed_tf=Timeframe(row["observed_tf"]),
+    )
+    return KeyLevelTouch(level, ts=row["ts"], swept=row["swept"])
+
+
+def _fvg_row(day: int, fvg: FairValueGap) -> dict:
+    return {
+        "day": day,
+        "observed_tf": fvg.observed_tf.value,
+        "type": fvg.type.value,
+        "min_price": price_to_fixed(fvg.range.min_price),
+        "max_price": price_to_fixed(fvg.range.max_price),
+        "price_precision": fvg.range.min_price.precision,
+        "ts": fvg.formation_ts,
+        "related_ts": list(fvg.related_ts),
+    }
+
+
+def _fvg_from_row(row: dict) -> FairValueGap:
+    precision = row["price_precision"]
+    rg = PriceRange(
+        min_price=fixed_to_price(row["min_price"], precision),
+        max_price=fixed_to_price(row["max_price"], precision),
+    )
+    return FairValueGap(
+        rg,
+        related_ts=row["related_ts"],
+        tf=Timeframe(row["observed_tf"]),
+        type=FairValueGapType(row["type"]),
+    )
+
+
+def _order_block_row(day: int, block: OrderBlock) -> dict:
+    return {
+        "day": day,
+        "observed_tf": block.observed_tf.value,
+        "type": block.type.value,
+        "min_price": price_to_fixed(block.range.min_price),
+        "max_price": price_to_fixed(block.range.max_price),
+        "price_precision": block.range.min_price.precision,
+        "ts": block.formation_ts,
+        "related_ts": list(block.related_ts),
+    }
+
+
+def _order_block_from_row(row: dict) -> OrderBlock:
+    precision = row["price_precision"]
+    rg = PriceRange(
+        min_price=fixed_to_price(row["min_price"], precision),
+        max_price=fixed_to_price(row["max_price"], precision),
+    )
+    return OrderBlock(
+        rg,
+        related_ts=row["related_ts"],
+        tf=Timeframe(row["observed_tf"]),
+        type=OrderBlockType(row["type"]),
+    )
+
+
+def _sweep_row(day: int, sweep: LiquiditySweep) -> dict:
+    return {
+        "day": day,
+        "observed_tf": sweep.observed_tf.value,
+        "type": sweep.type.value,
+        "min_price": price_to_fixed(sweep.range.min_price),
+        "max_price": price_to_fixed(sweep.range.max_price),
+        "price_precision": sweep.range.min_price.precision,
+        "ts": sweep.ts,
+        "level_name": sweep.level.name,
+        "level_price": price_to_fixed(sweep.level.price),
+        "level_ts": sweep.level.ts,
+        "level_observed_tf": sweep.level.observed_tf.value,
+    }
+
+
+def _sweep_from_row(row: dict) -> LiquiditySweep:
+    precision = row["price_precision"]
+    rg = PriceRange(
+        min_price=fixed_to_price(row["min_price"], precision),
+        max_price=fixed_to_price(row["max_price"], precision),
+    )
+    level = KeyLevel(
+        price=fixed_to_price(row["level_price"], precision),
+        name=row["level_name"],
+        ts=row["level_ts"],
+        observed_tf=Timeframe(row["level_observed_tf"]),
+    )
+    return LiquiditySweep(
+        level,
+        rg,
+        ts=row["ts"],
+        tf=Timeframe(row["observed_tf"]),
+        type=LiquiditySweepType(row["type"]),
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("usage: python -m strategy.history_store <history.json> <output dir>")
+        sys.exit(1)
+    convert_json_history(sys.argv[1], sys.argv[2])
@@ -0,0 +1,115 @@
+from math import isqrt
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """
+    Overlap queries over closed integer intervals ``[lo, hi]``.
+
+    Entries are kept in an array sorted by ``lo`` and viewed as an implicitly
+    balanced binary tree (the middle element of every slice is its root), where
+    each node stores the largest ``hi`` of its subtree. A query only descends
+    into subtrees that can still reach it, so the tree part of it visits
+    O((k + 1) log n) nodes for ``k`` entries found.
+
+    New intervals land in an unsorted pending buffer that every query scans,
+    and that is merged into the tree once it outgrows sqrt(n). Removed entries
+    stay in the tree, still visited by queries but not returned, until they
+    make up half of it. Each merge or purge re-sorts every entry, O(n log n).
+    Amortised, that makes an add O(sqrt(n) log n), a removal O(log n) plus a
+    scan of the pending buffer, and a query O(sqrt(n) + (k + 1) log n), with
+    removed entries still in the tree counted in ``k``.
+    """
+
+    def __init__(self):
+        self._lo: list[int] = []
+        self._hi: list[int] = []
+        self._items: list[T] = []
+        self._max_hi: list[int] = []
+        self._pending: list[tuple[int, int, T]] = []
+        self._live: set[int] = set()
+        self._removed: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, item: T) -> bool:
+        return id(item) in self._live
+
+    def add(self, lo: int, hi: int, item: T) -> None:
+        if id(item) in self._live:
+            return
+        if id(item) in self._removed:
+            # Purge the stale tree entry before the item comes back
+            self._rebuild()
+        self._live.add(id(item))
+        self._pending.append((lo, hi, item))
+        if len(self._pending) > max(8, isqrt(len(self._items))):
+            self._rebuild()
+
+    def remove(self, item: T) -> None:
+        if id(item) not in self._live:
+            return
+        self._live.remove(id(item))
+        for i, (_, _, pending) in enumerate(self._pending):
+            if pending is item:
+                del self._pending[i]
+                return
+        self._removed.add(id(item))
+        if len(self._removed) * 2 > len(self._items):
+            self._rebuild()
+
+    def overlapping(self, lo: int, hi: int) -> list[T]:
+        """All items whose interval intersects ``[lo, hi]``."""
+        found = [
+            item for p_lo, p_hi, item in self._pending if p_lo <= hi and p_hi >= lo
+        ]
+
+        stack = [(0, len(self._items))]
+        while stack:
+            left, right = stack.pop()
+            if left >= right:
+                continue
+            mid = (left + right) // 2
+            if self._max_hi[mid] < lo:
+                continue
+            stack.append((left, mid))
+            if self._lo[mid] <= hi:
+                stack.append((mid + 1, right))
+                item = self._items[mid]
+                if self._hi[mid] >= lo and id(item) not in self._removed:
+                    found.append(item)
+
+        return found
+
+    def containing(self, value: int) -> list[T]:
+        """All items whose interval contains ``value``."""
+        return self.overlapping(value, value)
+
+    def _rebuild(self) -> None:
+        entries = [
+            (lo, hi, item)
+            for lo, hi, item in zip(self._lo, self._hi, self._items)
+            if id(item) not in self._removed
+        ]
+        entries.extend(self._pending)
+        entries.sort(key=lambda e: e[0])
+
+        self._lo = [e[0] for e in entries]
+        self._hi = [e[1] for e in entries]
+        self._items = [e[2] for e in entries]
+        self._max_hi = list(self._hi)
+        self._pending = []
+        self._removed = set()
+        self._fill_max_hi(0, len(entries))
+
+    def _fill_max_hi(self, left: int, right: int) -> int | None:
+        if left >= right:
+            return None
+        mid = (left + right) // 2
+        for child in (self._fill_max_hi(left, mid), self._fill_max_hi(mid + 1, right)):
+            if child is not None and child > self._max_hi[mid]:
+                self._max_hi[mid] = child
+        return self._max_hi[mid]
@@ -1,16 +1,20 @@
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 
 from nautilus_trader.model import Price
 
+from strategy.bar import RawBar
 from strategy.timeframe import Timeframe
 
 
-@dataclass(frozen=True)
+@dataclass
 class KeyLevel:
     price: Price
     name: str
     ts: int
     observed_tf: Timeframe
+    # Set by the KeyLevelBook that sees price reach the level during a run, and
+    # from the touch events when a history is loaded
     touched: bool = False
 
     @classmethod
@@ -32,6 +36,95 @@ class KeyLevel:
             "observed_tf": self.observed_tf.value,
         }
 
+    @property
+    def key(self) -> tuple[str, int]:
+        return self.name, self.ts
+
+
+@dataclass(frozen=True)
+class KeyLevelTouch:
+    """
+    The first bar to reach a key level.
+
+    The level is swept when the bar traded through it but closed back on the
+    side it came from, and only touched otherwise.
+    """
+
+    level: KeyLevel
+    ts: int
+    swept: bool
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KeyLevelTouch":
+        return cls(
+            level=KeyLevel.from_dict(data["level"]),
+            ts=data["ts"],
+            swept=data["swept"],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "level": self.level.to_dict(),
+            "ts": self.ts,
+            "swept": self.swept,
+        }
+
+
+class KeyLevelBook:
+    """
+    Untouched key levels, sorted by raw price.
+
+    Highs wait for price to trade up to them and lows for price to trade down to
+    them. Highs are kept by descending and lows by ascending price, so the levels
+    a bar reaches always form the tail of their list: one bisect per side finds
+    them, and checking a bar costs O(log n + k) for k touched levels, which are
+    marked ``touched`` and retired. Adding a level is a list insert, O(n).
+    """
+
+    def __init__(self):
+        # Highs are keyed by their negated price to keep both lists ascending
+        self._high_keys: list[int] = []
+        self._highs: list[KeyLevel] = []
+        self._low_keys: list[int] = []
+        self._lows: list[KeyLevel] = []
+
+    def __len__(self) -> int:
+        return len(self._highs) + len(self._lows)
+
+    def add_high(self, level: KeyLevel) -> None:
+        i = bisect_right(self._high_keys, -level.price.raw)
+        self._high_keys.insert(i, -level.price.raw)
+        self._highs.insert(i, level)
+
+    def add_low(self, level: KeyLevel) -> None:
+        i = bisect_right(self._low_keys, level.price.raw)
+        self._low_keys.insert(i, level.price.raw)
+        self._lows.insert(i, level)
+
+    def update(self, bar: RawBar) -> list[KeyLevelTouch]:
+        """Retire and return the levels reached by ``bar``."""
+        touches = []
+
+        i = bisect_left(self._high_keys, -bar.high)
+        if i < len(self._highs):
+            for key, level in zip(self._high_keys[i:], self._highs[i:]):
+                level.touched = True
+                swept = bar.high > -key and bar.close < -key
+                touches.append(KeyLevelTouch(level, bar.ts_event, swept))
+            del self._high_keys[i:]
+            del self._highs[i:]
+
+        i = bisect_left(self._low_keys, bar.low)
+        if i < len(self._lows):
+            for key, level in zip(self._low_keys[i:], self._lows[i:]):
+                level.touched = True
+                swept = bar.low < key and bar.close > key
+                touches.append(KeyLevelTouch(level, bar.ts_event, swept))
+            del self._low_keys[i:]
+            del self._lows[i:]
+
+        return touches
+
 
 @dataclass()
 class KeyLevels:
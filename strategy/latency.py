@@ -0,0 +1,156 @@
+"""
+Latency histograms for the strategy's handlers and detectors.
+
+``LatencyHistogram`` buckets nanosecond durations the way HdrHistogram does:
+values below ``2**SUB_BUCKET_BITS`` get a bucket each, and every power of two
+above is split into ``2**(SUB_BUCKET_BITS - 1)`` equal buckets, so any recorded
+value is known to within 1/64 of itself in a few KB of counts.
+``LatencyRecorder`` keeps one histogram per name and wraps callables to time
+them. Nothing is timed unless something is wrapped.
+"""
+
+import json
+import time
+from collections.abc import Callable
+from functools import wraps
+from os import PathLike
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS >> 1
+# Durations above ~18 minutes all land in the last bucket
+MAX_MAGNITUDE = 40 - SUB_BUCKET_BITS
+SUMMARY_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def bucket_index(value: int) -> int:
+    magnitude = value.bit_length() - SUB_BUCKET_BITS
+    if magnitude <= 0:
+        return value
+    magnitude = min(magnitude, MAX_MAGNITUDE)
+    top = min(value >> magnitude, SUB_BUCKETS - 1)
+    return SUB_BUCKETS + (magnitude - 1) * HALF_SUB_BUCKETS + top - HALF_SUB_BUCKETS
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Lowest and highest value counted in bucket ``index``."""
+    if index < SUB_BUCKETS:
+        return index, index
+    magnitude, offset = divmod(index - SUB_BUCKETS, HALF_SUB_BUCKETS)
+    magnitude += 1
+    low = (HALF_SUB_BUCKETS + offset) << magnitude
+    return low, low + (1 << magnitude) - 1
+
+
+class LatencyHistogram:
+    __slots__ = ("count", "total", "min", "max", "counts")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+        self.counts = [0] * (SUB_BUCKETS + MAX_MAGNITUDE * HALF_SUB_BUCKETS)
+
+    def record(self, value: int) -> None:
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+        self.counts[bucket_index(value)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """Highest value of the bucket holding the ``p``-th percentile, in ns."""
+        if self.count == 0:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ns": self.total,
+            "min_ns": self.min,
+            "max_ns": self.max,
+            "mean_ns": self.mean,
+            "percentiles_ns": {str(p): self.percentile(p) for p in SUMMARY_PERCENTILES},
+            # Non-empty buckets as [lowest, highest, count]
+            "buckets": [
+                [*bucket_bounds(index), count]
+                for index, count in enumerate(self.counts)
+                if count
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.count = data["count"]
+        histogram.total = data["total_ns"]
+        histogram.min = data["min_ns"]
+        histogram.max = data["max_ns"]
+        for low, _, count in data["buckets"]:
+            histogram.counts[bucket_index(low)] = count
+        return histogram
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """``fn`` recording each call's duration into the ``name`` histogram."""
+        record = self.histograms.setdefault(name, LatencyHistogram()).record
+        clock = time.perf_counter_ns
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(clock() - start)
+
+        return wrapper
+
+    def summary(self) -> str:
+        header = (
+            f"{'name':<40} {'count':>9} {'mean':>9} {'p50':>9} {'p90':>9} "
+            f"{'p99':>9} {'p99.9':>9} {'max':>10} {'total':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, h in sorted(self.histograms.items(), key=lambda item: -item[1].total):
+            us = [h.mean / 1e3] + [h.percentile(p) / 1e3 for p in SUMMARY_PERCENTILES]
+            lines.append(
+                f"{name:<40} {h.count:>9} "
+                + " ".join(f"{v:>9.1f}" for v in us)
+                + f" {h.max / 1e3:>10.1f} {h.total / 1e9:>8.2f}s"
+            )
+        lines.append("(latencies in microseconds)")
+        return "\n".join(lines)
+
+    def write(self, path: PathLike[str] | str) -> None:
+        data = {name: h.to_dict() for name, h in self.histograms.items()}
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+
+    @classmethod
+    def read(cls, path: PathLike[str] | str) -> "LatencyRecorder":
+        with open(path) as f:
+            data = json.load(f)
+        recorder = cls()
+        recorder.histograms = {
+            name: LatencyHistogram.from_dict(h) for name, h in data.items()
+        }
+        return recorder
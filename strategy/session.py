@@ -1,11 +1,15 @@
 import enum
 import uuid
+from bisect import bisect_right
 from dataclasses import dataclass
-from datetime import time, datetime
+from datetime import time, datetime, date, timedelta, timezone
 from zoneinfo import ZoneInfo
 
+import numpy as np
 from nautilus_trader.model.objects import Price
 
+from strategy.bar import RawBar
+
 
 @dataclass(frozen=True)
 class SessionMetadata:
@@ -35,18 +39,31 @@ class SessionMetadata:
         if ts_utc.tzinfo is None:
             raise ValueError("ts_utc must be timezone-aware (UTC)")
 
-        tz = ZoneInfo(self.tz)
-        local_dt = ts_utc.astimezone(tz)
-        day = local_dt.date()
+        day = ts_utc.astimezone(ZoneInfo(self.tz)).date()
+        return self.open_close_on(day)
 
+    def open_close_on(self, day: date) -> tuple[datetime, datetime]:
+        tz = ZoneInfo(self.tz)
         open_local = datetime.combine(day, self.open_time, tzinfo=tz)
         close_local = datetime.combine(day, self.close_time, tzinfo=tz)
 
-        open_utc = open_local.astimezone(ZoneInfo("UTC"))
-        close_utc = close_local.astimezone(ZoneInfo("UTC"))
+        open_utc = open_local.astimezone(timezone.utc)
+        close_utc = close_local.astimezone(timezone.utc)
         return open_utc, close_utc
 
-    def is_active(self, ts_utc: datetime) -> bool:
+    def is_active(
+        self, ts_utc: datetime, calendar: "SessionCalendar | None" = None
+    ) -> bool:
+        """
+        Whether the session is open at ``ts_utc``.
+
+        Looked up in ``calendar`` when given, and worked out from the time zone
+        otherwise.
+        """
+        if ts_utc.tzinfo is None:
+            raise ValueError("ts_utc must be timezone-aware (UTC)")
+        if calendar is not None:
+            return calendar.is_active(self, dt_to_unix_nanos(ts_utc))
         open_utc, close_utc = self.open_close_for(ts_utc)
         return open_utc <= ts_utc < close_utc
 
@@ -57,6 +74,104 @@ class SessionMetadataList(enum.Enum):
     NEW_YORK = SessionMetadata("New York", "America/New_York", time(8, 0), time(17, 0))
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Session extremes before any bar, as raw int64 prices
+_NO_HIGH = int(np.iinfo(np.int64).min)
+_NO_LOW = int(np.iinfo(np.int64).max)
+
+
+def dt_to_unix_nanos(dt: datetime) -> int:
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1_000
+
+
+def unix_nanos_to_dt(ts: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=ts // 1_000)
+
+
+class SessionCalendar:
+    """
+    DST-correct UTC session windows as unix nanoseconds.
+
+    Windows are precomputed for whole blocks of days the first time a timestamp
+    in them is queried, so a lookup is a bisect over integers instead of
+    timezone arithmetic. The covered range grows in either direction on demand.
+    """
+
+    def __init__(self, sessions: list[SessionMetadata], block_days: int = 366):
+        self.block_days = block_days
+        self._first_day: date | None = None
+        self._last_day: date | None = None
+        self._covered_from: int = 0
+        self._covered_to: int = 0
+        self._opens: dict[SessionMetadata, list[int]] = {s: [] for s in sessions}
+        self._closes: dict[SessionMetadata, list[int]] = {s: [] for s in sessions}
+        self._transitions: list[int] = []
+
+    def window(self, metadata: SessionMetadata, ts: int) -> tuple[int, int] | None:
+        """The ``[open, close)`` window of ``metadata`` containing ``ts``, if any."""
+        self._ensure_covered(ts)
+        if metadata not in self._opens:
+            self._add_sessions([metadata])
+        opens = self._opens[metadata]
+        i = bisect_right(opens, ts) - 1
+        if i >= 0 and ts < self._closes[metadata][i]:
+            return opens[i], self._closes[metadata][i]
+        return None
+
+    def is_active(self, metadata: SessionMetadata, ts: int) -> bool:
+        return self.window(metadata, ts) is not None
+
+    def next_transition(self, ts: int) -> int:
+        """The first open or close of any calendar session strictly after ``ts``."""
+        if not self._opens:
+            raise ValueError("SessionCalendar has no sessions")
+        self._ensure_covered(ts)
+        i = bisect_right(self._transitions, ts)
+        while i == len(self._transitions):
+            self._extend(self._first_day, self._last_day + timedelta(self.block_days))
+            i = bisect_right(self._transitions, ts)
+        return self._transitions[i]
+
+    def _ensure_covered(self, ts: int) -> None:
+        if self._first_day is None:
+            day = unix_nanos_to_dt(ts).date()
+            self._extend(day, day + timedelta(self.block_days - 1))
+        while ts < self._covered_from:
+            self._extend(self._first_day - timedelta(self.block_days), self._last_day)
+        while ts >= self._covered_to:
+            self._extend(self._first_day, self._last_day + timedelta(self.block_days))
+
+    def _extend(self, first_day: date, last_day: date) -> None:
+        self._first_day = first_day
+        self._last_day = last_day
+        self._covered_from = dt_to_unix_nanos(
+            datetime.combine(first_day, time(0), tzinfo=timezone.utc)
+        )
+        self._covered_to = dt_to_unix_nanos(
+            datetime.combine(last_day + timedelta(1), time(0), tzinfo=timezone.utc)
+        )
+        self._add_sessions(list(self._opens.keys()))
+
+    def _add_sessions(self, sessions: list[SessionMetadata]) -> None:
+        for metadata in sessions:
+            # Local days either side of the UTC range catch windows that
+            # straddle a UTC midnight at the edges
+            opens, closes = [], []
+            day = self._first_day - timedelta(1)
+            while day <= self._last_day + timedelta(1):
+                open_utc, close_utc = metadata.open_close_on(day)
+                opens.append(dt_to_unix_nanos(open_utc))
+                closes.append(dt_to_unix_nanos(close_utc))
+                day += timedelta(1)
+            self._opens[metadata] = opens
+            self._closes[metadata] = closes
+
+        self._transitions = sorted(
+            {ts for opens in self._opens.values() for ts in opens}
+            | {ts for closes in self._closes.values() for ts in closes}
+        )
+
+
 @dataclass
 class SessionState:
     high: Price = None
@@ -114,3 +229,70 @@ class SessionEntity:
             "metadata": self.metadata.to_dict(),
             "state": self.state.to_dict(),
         }
+
+
+class SessionTracker:
+    """
+    Highs and lows of the calendar's sessions, fed every 1-minute bar.
+
+    A bar closing at ``ts`` covers the minute before it, so it belongs to the
+    sessions open at ``ts - 1``. Bars only update one running high and low for
+    the segment since the last session open or close. Session windows are whole
+    segments, so at each transition the segment is folded into int64 arrays
+    with a slot per session, masked to the sessions it was part of. A
+    ``SessionEntity`` is only built when its session closes.
+    """
+
+    def __init__(self, sessions: list[SessionMetadata], calendar: SessionCalendar):
+        self.sessions = sessions
+        self.calendar = calendar
+        self.high = np.full(len(sessions), _NO_HIGH, dtype=np.int64)
+        self.low = np.full(len(sessions), _NO_LOW, dtype=np.int64)
+        self.active = np.zeros(len(sessions), dtype=bool)
+        self.windows: list[tuple[int, int] | None] = [None] * len(sessions)
+        self.next_transition = 0
+        self.precision = 0
+        self._segment_high = _NO_HIGH
+        self._segment_low = _NO_LOW
+
+    def update(self, bar: RawBar) -> list[tuple[SessionEntity, tuple[int, int]]]:
+        """Add a bar, returning the sessions that closed before it with their windows."""
+        closed = []
+        if bar.ts_event > self.next_transition:
+            closed = self._refresh(bar.ts_event - 1)
+        if bar.high > self._segment_high:
+            self._segment_high = bar.high
+        if bar.low < self._segment_low:
+            self._segment_low = bar.low
+        self.precision = bar.precision
+        return closed
+
+    def _refresh(self, ts: int) -> list[tuple[SessionEntity, tuple[int, int]]]:
+        np.maximum(self.high, self._segment_high, out=self.high, where=self.active)
+        np.minimum(self.low, self._segment_low, out=self.low, where=self.active)
+        self._segment_high, self._segment_low = _NO_HIGH, _NO_LOW
+
+        closed = []
+        for i, metadata in enumerate(self.sessions):
+            window = self.calendar.window(metadata, ts)
+            if self.windows[i] is not None and self.windows[i] != window:
+                closed.append((self._session(i), self.windows[i]))
+                self.windows[i] = None
+                self.active[i] = False
+            if window is not None and self.windows[i] is None:
+                self.windows[i] = window
+                self.active[i] = True
+                self.high[i], self.low[i] = _NO_HIGH, _NO_LOW
+        self.next_transition = self.calendar.next_transition(ts)
+        return closed
+
+    def _session(self, i: int) -> SessionEntity:
+        high, low = int(self.high[i]), int(self.low[i])
+        open_ts, close_ts = self.windows[i]
+        state = SessionState(
+            high=Price.from_raw(high, self.precision) if high != _NO_HIGH else None,
+            low=Price.from_raw(low, self.precision) if low != _NO_LOW else None,
+            open_utc=unix_nanos_to_dt(open_ts),
+            close_utc=unix_nanos_to_dt(close_ts),
+        )
+        return SessionEntity(self.sessions[i], state)
@@ -1,163 +1,313 @@
+from typing import Callable
+
 from nautilus_trader.model import InstrumentId
-from nautilus_trader.model.data import Bar, BarType
+from nautilus_trader.model.data import Bar, BarType, BarSpecification
 from nautilus_trader.trading.strategy import Strategy, StrategyConfig
 
-from strategy.bar import bar_is_high, bar_max_high, bar_is_low, bar_min_low
+from strategy.bar import (
+    RawBar,
+    raw_bar_is_high,
+    raw_bar_is_low,
+    raw_bar_max_high,
+    raw_bar_min_low,
+)
+from strategy.bar_buffer import BarBuffer
 from strategy.confluence.manager import ConfluenceManager
-from strategy.history import StrategyHistory
-from strategy.key_level import KeyLevels, KeyLevel
+from strategy.history_store import HistoryWriter
+from strategy.key_level import KeyLevels, KeyLevel, KeyLevelBook
+from strategy.latency import LatencyRecorder
 from strategy.session import (
-    SessionState,
     SessionMetadataList,
-    SessionMetadata,
     SessionEntity,
+    SessionCalendar,
+    SessionTracker,
 )
 from strategy.timeframe import Timeframe
+from strategy.tracing import TraceRecorder
 
 
 # noinspection PyDataclass
 class ICTConfig(StrategyConfig):
     instrument_id: InstrumentId
     history_file: str
+    history_batch_days: int = 1
+    # Only days and sessions starting in [record_start_ns, record_end_ns) are
+    # written to the history; bars outside it still warm the strategy up
+    record_start_ns: int | None = None
+    record_end_ns: int | None = None
+    # Consume higher-timeframe bars pre-aggregated into the catalog (see
+    # catalog_setup.aggregate_catalog_bars) instead of aggregating 1-minute bars
+    external_htf_bars: bool = False
+    # Latest bars kept per timeframe for the detectors and pivots
+    bar_buffer_capacity: int = 64
+    # When set, bar handlers, the session tracker and each confluence detector
+    # record latency histograms, logged and written to this JSON file on stop.
+    # Nothing is wrapped otherwise, so there is no cost when it is off
+    latency_stats_file: str | None = None
+    # When set, bar handlers, the session tracker, detectors and history writes
+    # are traced and written to this file on stop as Chrome trace-event JSON,
+    # for Perfetto or chrome://tracing, with each span's simulated time as
+    # arguments. Every trace_sample_every-th handler call is kept, along with
+    # everything it called, as is any taking trace_slow_us or longer
+    trace_file: str | None = None
+    trace_sample_every: int = 1
+    trace_slow_us: int = 1_000
 
 
 class ICTStrategy(Strategy):
     def __init__(self, config: ICTConfig):
         super().__init__(config)
-        self.active_sessions: dict[SessionMetadata, SessionEntity] = dict()
+        sessions = [s.value for s in SessionMetadataList]
+        self.session_tracker = SessionTracker(sessions, SessionCalendar(sessions))
         self.key_levels: KeyLevels = KeyLevels()
-        self.history = StrategyHistory()
+        # Levels stay in the book across days until price reaches them
+        self.key_level_book = KeyLevelBook()
+        self.history: HistoryWriter | None = None
         self.cm = ConfluenceManager()
+        self.bar_buffers: dict[Timeframe, BarBuffer] = {
+            tf: BarBuffer(max(config.bar_buffer_capacity, self.cm.window_size(tf)))
+            for tf in Timeframe
+        }
+        self.latency: LatencyRecorder | None = None
+        if config.latency_stats_file is not None:
+            self._instrument_latency()
+        self.tracer: TraceRecorder | None = None
+        if config.trace_file is not None:
+            self._instrument_tracing()
 
         self.bar_types: dict[Timeframe, BarType] = dict()
         for tf in Timeframe:
-            self.bar_types[tf] = tf.to_bar_type(config.instrument_id)
+            if config.external_htf_bars:
+                self.bar_types[tf] = tf.to_external_bar_type(config.instrument_id)
+            else:
+                self.bar_types[tf] = tf.to_bar_type(config.instrument_id)
         self.bar_subs: list[BarType] = []
         for tf in Timeframe:
-            if tf is Timeframe.ONE_MINUTE:
-                self.bar_subs.append(tf.to_bar_type(config.instrument_id))
+            if tf is Timeframe.ONE_MINUTE or config.external_htf_bars:
+                self.bar_subs.append(self.bar_types[tf])
                 continue
             self.bar_subs.append(tf.to_composite_bar_type(config.instrument_id))
 
+        # Bars are routed by their specification: the strategy only subscribes to
+        # a single instrument, and hashing a BarSpecification is an order of
+        # magnitude cheaper than hashing or comparing a full BarType. Handlers get
+        # the bar as a RawBar, so they compare plain ints rather than Prices, once
+        # it is in its timeframe's buffer.
+        self.bar_handlers: dict[
+            BarSpecification, tuple[BarBuffer, Callable[[RawBar], None]]
+        ] = dict()
+        self.register_bar_handler(Timeframe.ONE_MINUTE, self._handle_minutely_bar)
+        self.register_bar_handler(Timeframe.FIVE_MINUTE, self._handle_minute5ly_bar)
+        self.register_bar_handler(Timeframe.FIFTEEN_MINUTE, self._handle_minute15ly_bar)
+        self.register_bar_handler(Timeframe.ONE_HOUR, self._handle_hour1ly_bar)
+        self.register_bar_handler(Timeframe.FOUR_HOUR, self._handle_hour4ly_bar)
+        self.register_bar_handler(Timeframe.ONE_DAY, self._handle_daily_bar)
+
+    def register_bar_handler(
+        self, timeframe: Timeframe, handler: Callable[[RawBar], None]
+    ) -> None:
+        if self.latency is not None:
+            handler = self.latency.timed(handler.__name__, handler)
+        if self.tracer is not None:
+            handler = self.tracer.timed(
+                handler.__name__, handler, args=lambda bar: {"ts": bar.ts_event}
+            )
+        self.bar_handlers[self.bar_types[timeframe].spec] = (
+            self.bar_buffers[timeframe],
+            handler,
+        )
+
+    def _instrument_latency(self) -> None:
+        self.latency = LatencyRecorder()
+        tracker = self.session_tracker
+        tracker.update = self.latency.timed("SessionTracker.update", tracker.update)
+        for detector in self.cm.detectors:
+            name = f"{type(detector).__name__}.detect"
+            detector.detect = self.latency.timed(name, detector.detect)
+
+    def _instrument_tracing(self) -> None:
+        self.tracer = TraceRecorder(
+            self.config.trace_sample_every, self.config.trace_slow_us
+        )
+        tracker = self.session_tracker
+        tracker.update = self.tracer.timed(
+            "SessionTracker.update",
+            tracker.update,
+            args=lambda bar: {"ts": bar.ts_event},
+        )
+        for detector in self.cm.detectors:
+            detector.detect = self.tracer.timed(
+                f"{type(detector).__name__}.detect",
+                detector.detect,
+                "detector",
+                lambda tf, window: {"tf": tf.value, "ts": int(window.ts_init[-1])},
+            )
+
     def on_start(self):
+        self.history = HistoryWriter(
+            self.config.history_file,
+            batch_days=self.config.history_batch_days,
+            tracer=self.tracer,
+        )
         for bt in self.bar_subs:
             self.subscribe_bars(bt)
 
     def on_stop(self):
         for bt in self.bar_subs:
             self.unsubscribe_bars(bt)
-        self.history.dump_to_json_file(file_path=self.config.history_file)
+        if self.history is not None:
+            self.history.close()
+        if self.latency is not None:
+            self.log.info(self.latency.summary())
+            self.latency.write(self.config.latency_stats_file)
+        if self.tracer is not None:
+            self.tracer.write(self.config.trace_file)
 
     def on_bar(self, bar: Bar):
-        if self._bar_is_tf(bar, Timeframe.ONE_MINUTE):
-            self._handle_minutely_bar(bar)
-        if self._bar_is_tf(bar, Timeframe.ONE_HOUR):
-            self._handle_hour1ly_bar(bar)
-        if self._bar_is_tf(bar, Timeframe.FOUR_HOUR):
-            self._handle_hour4ly_bar(bar)
-        if self._bar_is_tf(bar, Timeframe.ONE_DAY):
-            self._handle_daily_bar(bar)
-
-    def _handle_minutely_bar(self, bar: Bar):
-        self._check_session_key_levels(bar)
-
-    def _handle_hour1ly_bar(self, bar: Bar):
-        self._refresh_active_sessions()
-        bars: list[Bar] = self.cache.bars(self.bar_types[Timeframe.ONE_HOUR])
-
-        self.cm.detect_confluences(Timeframe.ONE_HOUR, bars[:5])
-        last_bar = bars[-1]
-        if last_bar is None:
+        route = self.bar_handlers.get(bar.bar_type.spec)
+        if route is not None:
+            bars, handler = route
+            raw_bar = RawBar.from_bar(bar)
+            bars.append(raw_bar)
+            handler(raw_bar)
+
+    def _handle_minutely_bar(self, bar: RawBar):
+        self.cm.update_confluences(
+            Timeframe.ONE_MINUTE, self.bar_buffers[Timeframe.ONE_MINUTE]
+        )
+        for session, window in self.session_tracker.update(bar):
+            self._add_session_liquidity(session, window[1])
+            if self._should_record(window[0]):
+                self.history.add_session(session)
+        for touch in self.key_level_book.update(bar):
+            if self._should_record(touch.ts):
+                self.history.add_key_level_touch(touch)
+        for fill in self.cm.update_fvg_fills(bar):
+            if self._should_record(fill.ts):
+                self.history.add_fvg_fill(fill)
+
+    def _handle_minute5ly_bar(self, bar: RawBar):
+        self.cm.update_confluences(
+            Timeframe.FIVE_MINUTE, self.bar_buffers[Timeframe.FIVE_MINUTE]
+        )
+
+    def _handle_minute15ly_bar(self, bar: RawBar):
+        self.cm.update_confluences(
+            Timeframe.FIFTEEN_MINUTE, self.bar_buffers[Timeframe.FIFTEEN_MINUTE]
+        )
+
+    def _handle_hour1ly_bar(self, bar: RawBar):
+        bars = self.bar_buffers[Timeframe.ONE_HOUR]
+        self.cm.update_confluences(Timeframe.ONE_HOUR, bars)
+        if len(bars) < 2:
             return
-        if bar_is_high(last_bar, bar):
-            high_bar = bar_max_high(last_bar, bar)
-            self.key_levels.hour_1_high.append(
-                KeyLevel(
-                    price=high_bar.high,
-                    name="H1H",
-                    ts=high_bar.ts_init,
-                    observed_tf=Timeframe.ONE_HOUR,
-                )
+        last_bar = bars.bar(2)
+        if raw_bar_is_high(last_bar, bar):
+            high_bar = raw_bar_max_high(last_bar, bar)
+            level = KeyLevel(
+                price=high_bar.price(high_bar.high),
+                name="H1H",
+                ts=high_bar.ts_init,
+                observed_tf=Timeframe.ONE_HOUR,
             )
-        if bar_is_low(last_bar, bar):
-            low_bar = bar_min_low(last_bar, bar)
-            self.key_levels.hour_1_low.append(
-                KeyLevel(
-                    price=low_bar.low,
-                    name="H1L",
-                    ts=low_bar.ts_init,
-                    observed_tf=Timeframe.ONE_HOUR,
-                )
+            self.key_levels.hour_1_high.append(level)
+            self._add_key_level(level, is_high=True, active_from=bar.ts_init)
+        if raw_bar_is_low(last_bar, bar):
+            low_bar = raw_bar_min_low(last_bar, bar)
+            level = KeyLevel(
+                price=low_bar.price(low_bar.low),
+                name="H1L",
+                ts=low_bar.ts_init,
+                observed_tf=Timeframe.ONE_HOUR,
             )
+            self.key_levels.hour_1_low.append(level)
+            self._add_key_level(level, is_high=False, active_from=bar.ts_init)
 
-    def _handle_hour4ly_bar(self, bar: Bar):
-        last_bar = self.cache.bar(self.bar_types[Timeframe.FOUR_HOUR], 1)
-        if last_bar is None:
+    def _handle_hour4ly_bar(self, bar: RawBar):
+        bars = self.bar_buffers[Timeframe.FOUR_HOUR]
+        self.cm.update_confluences(Timeframe.FOUR_HOUR, bars)
+        if len(bars) < 2:
             return
-        if bar_is_high(last_bar, bar):
-            high_bar = bar_max_high(last_bar, bar)
-            self.key_levels.hour_4_high.append(
-                KeyLevel(
-                    price=high_bar.high,
-                    name="H4H",
-                    ts=high_bar.ts_init,
-                    observed_tf=Timeframe.FOUR_HOUR,
-                )
+        last_bar = bars.bar(2)
+        if raw_bar_is_high(last_bar, bar):
+            high_bar = raw_bar_max_high(last_bar, bar)
+            level = KeyLevel(
+                price=high_bar.price(high_bar.high),
+                name="H4H",
+                ts=high_bar.ts_init,
+                observed_tf=Timeframe.FOUR_HOUR,
             )
-        if bar_is_low(last_bar, bar):
-            low_bar = bar_min_low(last_bar, bar)
-            self.key_levels.hour_4_low.append(
-                KeyLevel(
-                    price=low_bar.low,
-                    name="H4L",
-                    ts=low_bar.ts_init,
-                    observed_tf=Timeframe.FOUR_HOUR,
-                )
+            self.key_levels.hour_4_high.append(level)
+            self._add_key_level(level, is_high=True, active_from=bar.ts_init)
+        if raw_bar_is_low(last_bar, bar):
+            low_bar = raw_bar_min_low(last_bar, bar)
+            level = KeyLevel(
+                price=low_bar.price(low_bar.low),
+                name="H4L",
+                ts=low_bar.ts_init,
+                observed_tf=Timeframe.FOUR_HOUR,
             )
+            self.key_levels.hour_4_low.append(level)
+            self._add_key_level(level, is_high=False, active_from=bar.ts_init)
 
-    def _handle_daily_bar(self, bar: Bar):
-        prev_day_bar = self.cache.bar(self.bar_types[Timeframe.ONE_DAY], 1)
-        if prev_day_bar is not None:
+    def _handle_daily_bar(self, bar: RawBar):
+        bars = self.bar_buffers[Timeframe.ONE_DAY]
+        self.cm.update_confluences(Timeframe.ONE_DAY, bars)
+        if len(bars) >= 2:
+            prev_day_bar = bars.bar(2)
             self.key_levels.prev_day_low = KeyLevel(
-                price=prev_day_bar.low,
+                price=prev_day_bar.price(prev_day_bar.low),
                 name="PDL",
                 ts=prev_day_bar.ts_init,
                 observed_tf=Timeframe.ONE_DAY,
             )
             self.key_levels.prev_day_high = KeyLevel(
-                price=prev_day_bar.high,
+                price=prev_day_bar.price(prev_day_bar.high),
                 name="PDH",
                 ts=prev_day_bar.ts_init,
                 observed_tf=Timeframe.ONE_DAY,
             )
-        self.history.daily_key_levels.append(self.key_levels)
-        self.history.daily_confluences.append(self.cm.confluences.copy())
+            self._add_key_level(
+                self.key_levels.prev_day_low, is_high=False, active_from=bar.ts_init
+            )
+            self._add_key_level(
+                self.key_levels.prev_day_high, is_high=True, active_from=bar.ts_init
+            )
+        if self._should_record(bar.ts_event):
+            self.history.add_day(
+                bar.ts_event, self.key_levels, self.cm.confluences.copy()
+            )
         self.cm.init_confluences()
         self.key_levels = KeyLevels()
 
-    def _check_session_key_levels(self, bar: Bar):
-        for session in self.active_sessions.values():
-            if session.state.high is None or bar.high > session.state.high:
-                session.state.high = bar.high
-            if session.state.low is None or bar.low < session.state.low:
-                session.state.low = bar.low
-
-    def _refresh_active_sessions(self):
-        now = self.clock.utc_now()
-        for session_metadata in SessionMetadataList:
-            if session_metadata.value.is_active(now):
-                if session_metadata.value not in self.active_sessions.keys():
-                    session_entity = SessionEntity(
-                        session_metadata.value, SessionState()
-                    )
-                    session_entity.state.open_utc = now
-                    self.active_sessions[session_metadata.value] = session_entity
-            else:
-                if session_metadata.value in self.active_sessions.keys():
-                    ss_entity = self.active_sessions.pop(session_metadata.value)
-                    if ss_entity not in self.history.sessions:
-                        ss_entity.state.close_utc = now
-                        self.history.sessions.append(ss_entity)
-
-    def _bar_is_tf(self, bar: Bar, timeframe: Timeframe) -> bool:
-        return bar.bar_type == self.bar_types[timeframe]
+    def _add_key_level(self, level: KeyLevel, is_high: bool, active_from: int):
+        if is_high:
+            self.key_level_book.add_high(level)
+        else:
+            self.key_level_book.add_low(level)
+        self.cm.add_liquidity_level(level, is_high, active_from)
+
+    def _add_session_liquidity(self, session: SessionEntity, close_ts: int):
+        # A closed session's extremes are liquidity for the sweep detectors only;
+        # they are not key levels of the day
+        state = session.state
+        for price, is_high, suffix in (
+            (state.high, True, "H"),
+            (state.low, False, "L"),
+        ):
+            if price is None:
+                continue
+            level = KeyLevel(
+                price=price,
+                name=f"{session.metadata.name} {suffix}",
+                ts=close_ts,
+                observed_tf=Timeframe.ONE_MINUTE,
+            )
+            self.cm.add_liquidity_level(level, is_high, close_ts)
+
+    def _should_record(self, ts: int) -> bool:
+        if self.config.record_start_ns is not None and ts < self.config.record_start_ns:
+            return False
+        if self.config.record_end_ns is not None and ts >= self.config.record_end_ns:
+            return False
+        return True
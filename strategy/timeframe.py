@@ -20,6 +20,9 @@ class Timeframe(enum.Enum):
         agg_src = "INTERNAL" if self in INTERNAL_AGG_TF else "EXTERNAL"
         return BarType.from_str(f"{instrument_id}-{self.value}-LAST-{agg_src}")
 
+    def to_external_bar_type(self, instrument_id: InstrumentId) -> BarType:
+        return BarType.from_str(f"{instrument_id}-{self.value}-LAST-EXTERNAL")
+
 
 EXTERNAL_AGG_TF = [Timeframe.ONE_MINUTE]
 INTERNAL_AGG_TF = [
@@ -28,4 +31,4 @@ INTERNAL_AGG_TF = [
     Timeframe.ONE_HOUR,
     Timeframe.FOUR_HOUR,
     Timeframe.ONE_DAY,
-]
\ No newline at end of file
+]
@@ -0,0 +1,141 @@
+"""
+Chrome trace-event export of timed calls and blocks.
+
+``TraceRecorder`` records complete ("X") events that Perfetto or
+chrome://tracing show as spans per thread. Top-level spans are sampled, so
+long runs give files of a manageable size: on each thread, every
+``sample_every``-th span of each name is kept, and so is any taking ``slow_us``
+or longer. A kept span comes with every span nested in it, a dropped one with
+none of them. Spans carrying a simulated ``ts`` argument get it as an ISO 8601
+``sim_time`` too.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import wraps
+from os import PathLike
+from pathlib import Path
+
+from nautilus_trader.core.datetime import unix_nanos_to_iso8601
+
+
+class TraceRecorder:
+    def __init__(self, sample_every: int = 1, slow_us: float | None = None):
+        self.events: list[dict] = []
+        self.sample_every = max(sample_every, 1)
+        self.slow_ns = None if slow_us is None else slow_us * 1_000
+        self._pid = os.getpid()
+        self._local = threading.local()
+
+    def timed(
+        self,
+        name: str,
+        fn: Callable,
+        category: str = "strategy",
+        args: Callable[..., dict] | None = None,
+    ) -> Callable:
+        """
+        ``fn`` recording each call as a span.
+
+        ``args`` is given the call's arguments once it returns and gives the
+        span's arguments.
+        """
+        clock = time.perf_counter_ns
+
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            state = self._thread_state()
+            state.depth += 1
+            start = clock()
+            try:
+                return fn(*a, **kw)
+            finally:
+                end = clock()
+                span_args = None if args is None else args(*a, **kw)
+                self._end(state, name, category, start, end, span_args)
+
+        return wrapper
+
+    @contextmanager
+    def span(self, name: str, category: str = "backtest", **args) -> Iterator[None]:
+        state = self._thread_state()
+        state.depth += 1
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._end(state, name, category, start, time.perf_counter_ns(), args)
+
+    def write(self, path: PathLike[str] | str, append: bool = False) -> None:
+        """Write the trace, after the events already in ``path`` if ``append``."""
+        events = []
+        if append and Path(path).exists():
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        for event in self.events:
+            args = event.get("args")
+            if args is not None and "ts" in args and "sim_time" not in args:
+                args["sim_time"] = unix_nanos_to_iso8601(args["ts"])
+        events.extend(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def _thread_state(self) -> threading.local:
+        state = self._local
+        if not hasattr(state, "depth"):
+            state.depth = 0
+            # Top-level spans ended so far, by name
+            state.calls = {}
+            # Spans nested in the running top-level span, kept along with it
+            state.pending = []
+            state.tid = threading.get_native_id()
+            self.events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": state.tid,
+                    "args": {"name": threading.current_thread().name},
+                }
+            )
+        return state
+
+    def _end(
+        self,
+        state: threading.local,
+        name: str,
+        category: str,
+        start: int,
+        end: int,
+        args: dict | None,
+    ) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            # Trace events are in microseconds
+            "ts": start / 1e3,
+            "dur": (end - start) / 1e3,
+            "pid": self._pid,
+            "tid": state.tid,
+        }
+        if args:
+            event["args"] = args
+        state.depth -= 1
+        if state.depth > 0:
+            state.pending.append(event)
+            return
+
+        calls = state.calls.get(name, 0)
+        state.calls[name] = calls + 1
+        keep = calls % self.sample_every == 0 or (
+            self.slow_ns is not None and end - start >= self.slow_ns
+        )
+        if keep:
+            self.events.append(event)
+            self.events.extend(state.pending)
+        state.pending = []
@@ -0,0 +1,224 @@
+"""
+Parameter sweep over ``ICTConfig`` values and date windows.
+
+Every combination of the parameter grid and the date windows becomes one
+backtest. Runs are spread over a process pool, each writing its own history
+under ``<output>/<run_id>/history`` along with its order fills report, and their
+summary stats are collected into ``<output>/results.csv``.
+
+The grid maps ``ICTConfig`` fields to the values to try, given as JSON or a
+JSON file, and the windows are given as start/end pairs or cut from a range:
+
+    python sweep.py --grid '{"bar_buffer_capacity": [64, 128]}' --windows \\
+        2000-06-05/2000-06-10 2000-06-12/2000-06-17
+    python sweep.py --grid grid.json --range 2000-06-05 2000-12-29 --window-days 7
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from strategy.strategy import ICTConfig
+
+ROOT = Path(__file__).parent
+SWEEP_DIR = ROOT / "sweeps"
+# ICTConfig fields every run sets itself
+RUN_FIELDS = ("instrument_id", "history_file")
+DEFAULT_WINDOWS = [
+    ("2000-06-05", "2000-06-10"),
+    ("2000-06-12", "2000-06-17"),
+    ("2000-06-19", "2000-06-24"),
+    ("2000-06-26", "2000-07-01"),
+]
+
+
+@dataclass(frozen=True)
+class SweepRun:
+    run_id: str
+    start_time: str
+    end_time: str
+    params: dict = field(default_factory=dict)
+
+
+def load_grid(value: str) -> dict[str, list]:
+    """Parameter grid from a JSON object or a JSON file holding one."""
+    path = Path(value)
+    grid = json.loads(path.read_text() if path.is_file() else value)
+    if not isinstance(grid, dict):
+        raise TypeError("The grid must map ICTConfig fields to lists of values")
+    return {
+        name: values if isinstance(values, list) else [values]
+        for name, values in grid.items()
+    }
+
+
+def check_grid(param_grid: dict[str, list]) -> None:
+    fields = set(ICTConfig.__struct_fields__) - set(RUN_FIELDS)
+    unknown = sorted(set(param_grid) - fields)
+    if unknown:
+        raise ValueError(f"Not ICTConfig fields a sweep can set: {', '.join(unknown)}")
+    empty = sorted(name for name, values in param_grid.items() if not values)
+    if empty:
+        raise ValueError(f"No values to sweep for: {', '.join(empty)}")
+
+
+def parse_window(value: str) -> tuple[str, str]:
+    start, sep, end = value.partition("/")
+    if not sep or pd.Timestamp(start) >= pd.Timestamp(end):
+        raise ValueError(f"Expected a START/END window, got {value!r}")
+    return start, end
+
+
+def make_windows(
+    start: str, end: str, window_days: int, step_days: int | None = None
+) -> list[tuple[str, str]]:
+    """Windows of ``window_days`` days every ``step_days`` (default: back to back)."""
+    step = pd.Timedelta(days=step_days or window_days)
+    length = pd.Timedelta(days=window_days)
+    end_ts = pd.Timestamp(end)
+    windows = []
+    window_start = pd.Timestamp(start)
+    while window_start < end_ts:
+        window_end = min(window_start + length, end_ts)
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start += step
+    return windows
+
+
+def expand_grid(
+    param_grid: dict[str, list], windows: list[tuple[str, str]]
+) -> list[SweepRun]:
+    check_grid(param_grid)
+    names = list(param_grid.keys())
+    runs = []
+    for values in itertools.product(*param_grid.values()):
+        params = dict(zip(names, values))
+        for start_time, end_time in windows:
+            runs.append(
+                SweepRun(
+                    run_id=f"run-{len(runs):04d}",
+                    start_time=start_time,
+                    end_time=end_time,
+                    params=params,
+                )
+            )
+    return runs
+
+
+def run_one(run: SweepRun, output_dir: Path) -> dict:
+    # Imported here so the parent process never builds a Nautilus kernel
+    from nautilus_trader.backtest.node import BacktestNode
+
+    from backtest import build_run_config
+    from strategy.history_store import TIME_COLUMNS, read_table
+
+    run_dir = output_dir / run.run_id
+    history_path = run_dir / "history"
+    config = build_run_config(
+        run.start_time, run.end_time, history_path, strategy_config=run.params
+    )
+    node = BacktestNode(configs=[config])
+    result = node.run()[0]
+
+    engine = node.get_engine(result.run_config_id)
+    fills = engine.trader.generate_order_fills_report()
+    fills.to_parquet(run_dir / "fills.parquet")
+
+    summary = {
+        "run_id": run.run_id,
+        "start_time": run.start_time,
+        "end_time": run.end_time,
+        **run.params,
+        "elapsed_time": result.elapsed_time,
+        "iterations": result.iterations,
+        "total_events": result.total_events,
+        "total_orders": result.total_orders,
+        "total_positions": result.total_positions,
+    }
+    for currency, stats in result.stats_pnls.items():
+        for stat, value in stats.items():
+            summary[f"{stat} [{currency}]"] = value
+    summary.update(result.stats_returns)
+    for table, ts_column in TIME_COLUMNS.items():
+        summary[f"history_{table}"] = read_table(
+            history_path, table, [ts_column]
+        ).num_rows
+    summary["history_path"] = str(history_path)
+    return summary
+
+
+def run_sweep(
+    runs: list[SweepRun],
+    output_dir: Path = SWEEP_DIR,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Nautilus starts native threads, which don't survive a fork
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(), mp_context=context
+    ) as pool:
+        futures = {pool.submit(run_one, run, output_dir): run for run in runs}
+        for future in as_completed(futures):
+            run = futures[future]
+            try:
+                rows.append(future.result())
+                print(f"{run.run_id} done ({run.start_time} - {run.end_time})")
+            except Exception as e:
+                print(f"{run.run_id} failed: {e}")
+                rows.append({"run_id": run.run_id, "error": repr(e)})
+
+    results = pd.DataFrame(rows).sort_values("run_id").reset_index(drop=True)
+    results.to_csv(output_dir / "results.csv", index=False)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--grid",
+        default='{"history_batch_days": [1]}',
+        help="JSON object, or a file holding one, of ICTConfig field to values",
+    )
+    windows_group = parser.add_mutually_exclusive_group()
+    windows_group.add_argument(
+        "--windows", nargs="+", metavar="START/END", help="date windows to run"
+    )
+    windows_group.add_argument(
+        "--range",
+        nargs=2,
+        metavar=("START", "END"),
+        help="cut windows of --window-days from this range",
+    )
+    parser.add_argument("--window-days", type=int, default=7)
+    parser.add_argument(
+        "--step-days",
+        type=int,
+        default=None,
+        help="days between window starts (default: --window-days)",
+    )
+    parser.add_argument("--output", type=Path, default=SWEEP_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        param_grid = load_grid(args.grid)
+        if args.windows:
+            windows = [parse_window(window) for window in args.windows]
+        elif args.range:
+            windows = make_windows(*args.range, args.window_days, args.step_days)
+        else:
+            windows = DEFAULT_WINDOWS
+        runs = expand_grid(param_grid, windows)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+
+    print(run_sweep(runs, args.output, args.workers))
@@ -0,0 +1,126 @@
+"""Decoding catalog fixed-point columns against Nautilus's own Arrow encoding."""
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from nautilus_trader.model import Price, Quantity
+from nautilus_trader.model.data import Bar, BarType
+from nautilus_trader.model.objects import FIXED_PRECISION, FIXED_SCALAR
+from nautilus_trader.persistence.catalog import ParquetDataCatalog
+from nautilus_trader.serialization.arrow.serializer import ArrowSerializer
+
+from catalog_setup import (
+    BAR_VALUE_COLUMNS,
+    bar_interval_ns,
+    fixed_to_float,
+    fixed_to_raw,
+)
+
+BAR_TYPE = BarType.from_str("EUR/USD.SIM-1-MINUTE-LAST-EXTERNAL")
+MINUTE_NS = 60 * 1_000_000_000
+
+
+def make_bar(
+    open_: str, high: str, low: str, close: str, ts: int, bar_type: BarType = BAR_TYPE
+) -> Bar:
+    return Bar(
+        bar_type,
+        Price.from_str(open_),
+        Price.from_str(high),
+        Price.from_str(low),
+        Price.from_str(close),
+        Quantity.from_int(1_000_000),
+        ts,
+        ts,
+    )
+
+
+def fixed_column(values: list[int], width: int) -> pa.ChunkedArray:
+    data = b"".join(v.to_bytes(width, "little", signed=True) for v in values)
+    array = pa.Array.from_buffers(
+        pa.binary(width), len(values), [None, pa.py_buffer(data)]
+    )
+    return pa.chunked_array([array])
+
+
+def test_matches_nautilus_encoding():
+    bars = [
+        make_bar("1.10000", "1.10020", "1.09990", "1.10010", 1),
+        make_bar("-0.00050", "0.00010", "-0.00120", "-0.00100", 2),
+        make_bar("-2.50000", "-2.40000", "-2.60000", "-2.45000", 3),
+    ]
+    table = ArrowSerializer.serialize_batch(bars, Bar)
+
+    for name in ["open", "high", "low", "close"]:
+        expected = [getattr(bar, name).raw for bar in bars]
+        assert fixed_to_raw(table.column(name)).tolist() == expected
+        # A column sliced off the middle of its buffer
+        assert fixed_to_raw(table.column(name).slice(1)).tolist() == expected[1:]
+    for name in BAR_VALUE_COLUMNS:
+        expected = [getattr(bar, name).as_double() for bar in bars]
+        assert fixed_to_float(table.column(name)).tolist() == expected
+
+
+@pytest.mark.skipif(FIXED_PRECISION != 16, reason="needs the high-precision build")
+def test_large_sizes_only_decode_to_floats():
+    # A million units is 1e22 raw, past an int64
+    bars = [make_bar("1.10000", "1.10020", "1.09990", "1.10010", 1)]
+    volume = ArrowSerializer.serialize_batch(bars, Bar).column("volume")
+    with pytest.raises(ValueError):
+        fixed_to_raw(volume)
+    assert fixed_to_float(volume).tolist() == [1_000_000.0]
+
+
+@pytest.mark.skipif(FIXED_PRECISION != 16, reason="needs the high-precision build")
+def test_rejects_values_beyond_int64():
+    limit = np.iinfo(np.int64).max
+    assert fixed_to_raw(fixed_column([limit, -limit - 1], 16)).tolist() == [
+        limit,
+        -limit - 1,
+    ]
+    for value in (limit + 1, -limit - 2, 1 << 100, -(1 << 100)):
+        with pytest.raises(ValueError):
+            fixed_to_raw(fixed_column([0, value], 16))
+        assert fixed_to_float(fixed_column([value], 16)).tolist() == [
+            value / FIXED_SCALAR
+        ]
+
+
+@pytest.mark.skipif(FIXED_PRECISION != 16, reason="needs the high-precision build")
+def test_rescales_standard_precision_columns():
+    # 8-byte columns are scaled by 1e9
+    column = fixed_column([1_500_000_000, -2_000_000], 8)
+    assert fixed_to_raw(column).tolist() == [
+        int(1.5 * FIXED_SCALAR),
+        int(-0.002 * FIXED_SCALAR),
+    ]
+    with pytest.raises(ValueError):
+        fixed_to_raw(fixed_column([10**12 * 10**3], 8))
+
+
+def test_bar_interval_is_read_from_the_data(tmp_path):
+    catalog = ParquetDataCatalog(tmp_path)
+    five_minute = BarType.from_str("EUR/USD.SIM-5-MINUTE-LAST-EXTERNAL")
+    one_hour = BarType.from_str("EUR/USD.SIM-1-HOUR-LAST-EXTERNAL")
+    # A gap in the 1-minute bars does not change their interval
+    minutes = [1, 2, 3, 10, 11]
+    catalog.write_data(
+        [make_bar("1.1", "1.1", "1.1", "1.1", m * MINUTE_NS) for m in minutes]
+    )
+    # 1-minute bars filed as 5-minute ones show their real interval
+    catalog.write_data(
+        [
+            make_bar("1.1", "1.1", "1.1", "1.1", m * MINUTE_NS, five_minute)
+            for m in minutes
+        ]
+    )
+    catalog.write_data([make_bar("1.1", "1.1", "1.1", "1.1", MINUTE_NS, one_hour)])
+
+    assert bar_interval_ns(tmp_path, BAR_TYPE) == MINUTE_NS
+    assert bar_interval_ns(tmp_path, five_minute) == MINUTE_NS
+    # Too few bars, or none at all
+    assert bar_interval_ns(tmp_path, one_hour) is None
+    assert (
+        bar_interval_ns(tmp_path, BarType.from_str("EUR/USD.SIM-1-DAY-LAST-EXTERNAL"))
+        is None
+    )
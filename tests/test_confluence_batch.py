@@ -0,0 +1,248 @@
+"""
+The batch order block and sweep detectors against the streaming ones, bar by bar.
+
+Bars are a random walk over a few ticks, so equal closes, opens, highs and
+level prices are common, after hand-made bars for the boundary cases.
+"""
+
+import numpy as np
+import pytest
+from nautilus_trader.model import Price
+from nautilus_trader.model.objects import FIXED_PRECISION
+
+from strategy.bar import RawBar
+from strategy.bar_buffer import BarBuffer
+from strategy.confluence.detector import ConfluenceDetector
+from strategy.confluence.liquidity_sweep import (
+    LiquiditySweepDetector,
+    detect_sweep_arrays,
+)
+from strategy.confluence.order_block import (
+    OrderBlockDetector,
+    detect_order_block_arrays,
+)
+from strategy.key_level import KeyLevel
+from strategy.timeframe import Timeframe
+
+PRECISION = 5
+TICK = 10 ** (FIXED_PRECISION - PRECISION)
+BASE = 100_000
+MINUTE_NS = 60 * 1_000_000_000
+TF_NS = {
+    Timeframe.ONE_MINUTE: MINUTE_NS,
+    Timeframe.FIVE_MINUTE: 5 * MINUTE_NS,
+    Timeframe.FIFTEEN_MINUTE: 15 * MINUTE_NS,
+    Timeframe.ONE_HOUR: 60 * MINUTE_NS,
+    Timeframe.FOUR_HOUR: 240 * MINUTE_NS,
+    Timeframe.ONE_DAY: 1440 * MINUTE_NS,
+}
+
+# (open, high, low, close) in ticks above BASE
+EDGE_BARS = [
+    # Down bar, then an up bar closing at its high: no block
+    (5, 6, 3, 4),
+    (4, 6, 4, 6),
+    # Down bar, then an up bar closing a tick above its high: bullish
+    (6, 6, 2, 3),
+    (3, 7, 3, 7),
+    # Doji, then an up bar closing above it: no block
+    (7, 8, 6, 7),
+    (7, 9, 7, 9),
+    # Up bar, then a down bar closing at its low: no block
+    (8, 10, 8, 10),
+    (10, 10, 8, 8),
+    # Up bar, then a down bar closing below its low: bearish, and the next
+    # down bar is no block either way
+    (8, 10, 7, 9),
+    (9, 9, 5, 6),
+    (6, 6, 4, 5),
+    # Wicks up to 12: exactly, through and closing at it, through and back
+    (5, 12, 5, 11),
+    (11, 13, 11, 12),
+    (12, 14, 10, 11),
+    # Wicks down to 2: exactly, through and closing at it, through and back
+    (11, 11, 2, 3),
+    (3, 3, 1, 2),
+    (2, 4, 0, 3),
+]
+# (price, is_high, index of the bar whose ts_init it becomes active from),
+# watched from the bar after that one
+EDGE_LEVELS = [
+    # Reached exactly by bar 11
+    (12, True, -1),
+    # Bar 12 trades through and closes at it
+    (12, True, 11),
+    # Swept by bar 13
+    (12, True, 12),
+    # Reached exactly by bar 12
+    (13, True, 10),
+    # Reached exactly by bar 2, long before the wicks down
+    (2, False, -1),
+    # Reached exactly by bar 14
+    (2, False, 13),
+    # Bar 15 trades through and closes at it
+    (2, False, 14),
+    # Swept by bar 16
+    (2, False, 15),
+    # Reached exactly by bar 15
+    (1, False, 14),
+    # Out of reach of the hand-made bars
+    (50, True, 0),
+    (-50, False, 0),
+]
+
+
+def make_bars(tf: Timeframe, seed: int, n: int = 2_000) -> list[RawBar]:
+    rng = np.random.default_rng(seed)
+    ohlc = [list(bar) for bar in EDGE_BARS]
+    close = ohlc[-1][3]
+    for _ in range(n):
+        open_ = close + int(rng.integers(-1, 2))
+        close = open_ + int(rng.integers(-3, 4))
+        high = max(open_, close) + int(rng.integers(0, 3))
+        low = min(open_, close) - int(rng.integers(0, 3))
+        ohlc.append([open_, high, low, close])
+    step = TF_NS[tf]
+    return [
+        RawBar(
+            *((BASE + ticks) * TICK for ticks in bar),
+            ts_event=(i + 1) * step,
+            ts_init=(i + 1) * step,
+            precision=PRECISION,
+        )
+        for i, bar in enumerate(ohlc)
+    ]
+
+
+def make_levels(
+    bars: list[RawBar], seed: int, n: int = 300
+) -> list[tuple[KeyLevel, bool, int]]:
+    rng = np.random.default_rng(seed)
+    step = bars[1].ts_init - bars[0].ts_init
+    levels = [
+        ((BASE + price) * TICK, is_high, bars[0].ts_init + i * step)
+        for price, is_high, i in EDGE_LEVELS
+    ]
+    for _ in range(n):
+        bar = bars[int(rng.integers(len(bars)))]
+        is_high = bool(rng.integers(2))
+        levels.append((bar.high if is_high else bar.low, is_high, bar.ts_init))
+    return [
+        (
+            KeyLevel(
+                Price.from_raw(raw, PRECISION),
+                "H1H" if is_high else "H1L",
+                ts,
+                Timeframe.ONE_HOUR,
+            ),
+            is_high,
+            ts,
+        )
+        for raw, is_high, ts in levels
+    ]
+
+
+def stream(detector: ConfluenceDetector, tf: Timeframe, bars: list[RawBar]) -> list:
+    """The detector's confluences after each bar."""
+    buffer = BarBuffer(detector.window_size)
+    found = []
+    for bar in bars:
+        buffer.append(bar)
+        if len(buffer) < detector.window_size:
+            found.append([])
+            continue
+        found.append(detector.detect(tf, buffer.window(detector.window_size)))
+    return found
+
+
+def columns(bars: list[RawBar]) -> dict[str, np.ndarray]:
+    return {
+        name: np.array([getattr(bar, name) for bar in bars], dtype=np.int64)
+        for name in ("open", "high", "low", "close", "ts_init")
+    }
+
+
+def by_bar(rows: list[tuple], bars: list[RawBar]) -> list[list[tuple]]:
+    """Rows, each led by its formation ``ts_init``, grouped per bar."""
+    index = {bar.ts_init: i for i, bar in enumerate(bars)}
+    grouped = [[] for _ in bars]
+    for row in rows:
+        grouped[index[row[0]]].append(row[1:])
+    return [sorted(group) for group in grouped]
+
+
+@pytest.mark.parametrize("tf", list(Timeframe))
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_order_blocks_match_streaming(tf: Timeframe, seed: int):
+    bars = make_bars(tf, seed)
+    a = columns(bars)
+
+    batch = detect_order_block_arrays(
+        a["open"], a["high"], a["low"], a["close"], a["ts_init"]
+    ).to_order_blocks(tf, PRECISION)
+    streamed = stream(OrderBlockDetector([tf]), tf, bars)
+
+    def row(block):
+        return (
+            block.formation_ts,
+            tuple(block.related_ts),
+            block.type,
+            block.range.min_price.raw,
+            block.range.max_price.raw,
+            block.observed_tf,
+        )
+
+    expected = [sorted(row(block)[1:] for block in found) for found in streamed]
+    assert by_bar([row(block) for block in batch], bars) == expected
+    # The hand-made bullish and bearish blocks
+    assert [block.type.value for block in streamed[3] + streamed[9]] == [
+        "BULLISH",
+        "BEARISH",
+    ]
+    assert not any(streamed[i] for i in (1, 5, 7, 10))
+
+
+@pytest.mark.parametrize("tf", list(Timeframe))
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_liquidity_sweeps_match_streaming(tf: Timeframe, seed: int):
+    bars = make_bars(tf, seed)
+    levels = make_levels(bars, seed)
+    a = columns(bars)
+
+    batch = detect_sweep_arrays(
+        a["high"],
+        a["low"],
+        a["close"],
+        a["ts_init"],
+        np.array([level.price.raw for level, _, _ in levels], dtype=np.int64),
+        np.array([is_high for _, is_high, _ in levels]),
+        np.array([ts for _, _, ts in levels], dtype=np.int64),
+    ).to_liquidity_sweeps([level for level, _, _ in levels], tf, PRECISION)
+
+    detector = LiquiditySweepDetector([tf])
+    for level, is_high, active_from in levels:
+        detector.add_level(level, is_high, active_from)
+    streamed = stream(detector, tf, bars)
+
+    position = {id(level): i for i, (level, _, _) in enumerate(levels)}
+
+    def row(sweep):
+        return (
+            sweep.ts,
+            position[id(sweep.level)],
+            sweep.type,
+            sweep.range.min_price.raw,
+            sweep.range.max_price.raw,
+            sweep.observed_tf,
+        )
+
+    expected = [sorted(row(sweep)[1:] for sweep in found) for found in streamed]
+    assert by_bar([row(sweep) for sweep in batch], bars) == expected
+    # Of the hand-made levels, only wicks through and back sweep, each level once
+    edge = [
+        (i, position[id(sweep.level)])
+        for i, found in enumerate(streamed[: len(EDGE_BARS)])
+        for sweep in found
+        if position[id(sweep.level)] < len(EDGE_LEVELS)
+    ]
+    assert edge == [(13, 2), (16, 7)]
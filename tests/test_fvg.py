@@ -0,0 +1,180 @@
+"""FVG detection, batch against streaming, and mitigation tracking."""
+
+import numpy as np
+import pytest
+from nautilus_trader.model import Price
+from nautilus_trader.model.objects import FIXED_PRECISION
+
+from strategy.bar import RawBar
+from strategy.bar_buffer import BarBuffer
+from strategy.confluence.fvg import (
+    FairValueGap,
+    FairValueGapDetector,
+    FairValueGapTracker,
+    FairValueGapType,
+    detect_fvg_arrays,
+)
+from strategy.price_range import PriceRange
+from strategy.timeframe import Timeframe
+
+PRECISION = 5
+TICK = 10 ** (FIXED_PRECISION - PRECISION)
+BASE = 100_000
+MINUTE_NS = 60 * 1_000_000_000
+
+
+def raw(ticks: int) -> int:
+    return (BASE + ticks) * TICK
+
+
+def make_bar(minute: int, open_: int, high: int, low: int, close: int) -> RawBar:
+    ts = minute * MINUTE_NS
+    return RawBar(
+        raw(open_), raw(high), raw(low), raw(close), ts, ts, precision=PRECISION
+    )
+
+
+def make_fvg(low: int, high: int, type_: FairValueGapType) -> FairValueGap:
+    rg = PriceRange(
+        min_price=Price.from_raw(raw(low), PRECISION),
+        max_price=Price.from_raw(raw(high), PRECISION),
+    )
+    return FairValueGap(rg, [low, high, 0], Timeframe.FIVE_MINUTE, type_)
+
+
+def fvg_row(fvg: FairValueGap) -> tuple:
+    return (
+        tuple(fvg.related_ts),
+        fvg.type,
+        fvg.range.min_price.raw,
+        fvg.range.max_price.raw,
+        fvg.observed_tf,
+    )
+
+
+def detect_batch(bars: list[RawBar], tf: Timeframe) -> list[FairValueGap]:
+    arrays = detect_fvg_arrays(
+        np.array([bar.high for bar in bars], dtype=np.int64),
+        np.array([bar.low for bar in bars], dtype=np.int64),
+        np.array([bar.ts_init for bar in bars], dtype=np.int64),
+    )
+    return arrays.to_fair_value_gaps(tf, PRECISION)
+
+
+def detect_streaming(bars: list[RawBar], tf: Timeframe) -> list[FairValueGap]:
+    detector = FairValueGapDetector([tf])
+    buffer = BarBuffer(detector.window_size)
+    found = []
+    for bar in bars:
+        buffer.append(bar)
+        if len(buffer) == detector.window_size:
+            found.extend(detector.detect(tf, buffer.window(detector.window_size)))
+    return found
+
+
+def test_detects_gaps_on_both_sides():
+    # (high, low) in ticks:
+    # - bars 0-2: bullish, bar 0's high below bar 2's low
+    # - bars 2-4: bar 2's low equals bar 4's high, no gap
+    # - bars 3-5: bearish, bar 3's low above bar 5's high
+    # - bars 6-8: bar 6's high equals bar 8's low, no gap
+    ranges = [
+        (10, 5),
+        (20, 8),
+        (25, 12),
+        (20, 15),
+        (12, 8),
+        (12, 5),
+        (14, 5),
+        (12, 3),
+        (20, 14),
+    ]
+    bars = [make_bar(i, low, high, low, high) for i, (high, low) in enumerate(ranges)]
+    ts = [bar.ts_init for bar in bars]
+    expected = [
+        (tuple(ts[0:3]), FairValueGapType.BULLISH, raw(10), raw(12)),
+        (tuple(ts[3:6]), FairValueGapType.BEARISH, raw(12), raw(15)),
+    ]
+
+    for found in (
+        detect_batch(bars, Timeframe.FIVE_MINUTE),
+        detect_streaming(bars, Timeframe.FIVE_MINUTE),
+    ):
+        assert [fvg_row(fvg)[:4] for fvg in found] == expected
+
+
+@pytest.mark.parametrize("n", [0, 1, 2])
+def test_fewer_than_three_bars_have_no_gaps(n: int):
+    bars = [make_bar(i, 0, 10 * i + 5, 10 * i, 0) for i in range(n)]
+    arrays = detect_fvg_arrays(
+        np.array([bar.high for bar in bars], dtype=np.int64),
+        np.array([bar.low for bar in bars], dtype=np.int64),
+        np.array([bar.ts_init for bar in bars], dtype=np.int64),
+    )
+    assert len(arrays) == 0
+    assert arrays.related_ts.shape == (0, 3)
+    assert detect_streaming(bars, Timeframe.ONE_MINUTE) == []
+
+
+@pytest.mark.parametrize("tf", list(Timeframe))
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_streaming(tf: Timeframe, seed: int):
+    # A random walk over a few ticks, so gaps and equal highs/lows are common
+    rng = np.random.default_rng(seed)
+    bars = []
+    close = 0
+    for i in range(2_000):
+        open_ = close + int(rng.integers(-2, 3))
+        close = open_ + int(rng.integers(-4, 5))
+        high = max(open_, close) + int(rng.integers(0, 2))
+        low = min(open_, close) - int(rng.integers(0, 2))
+        bars.append(make_bar(i, open_, high, low, close))
+
+    streamed = [fvg_row(fvg) for fvg in detect_streaming(bars, tf)]
+    assert [fvg_row(fvg) for fvg in detect_batch(bars, tf)] == streamed
+    types = {row[1] for row in streamed}
+    assert types == {FairValueGapType.BULLISH, FairValueGapType.BEARISH}
+
+
+def test_fills_from_the_far_side():
+    bullish = make_fvg(10, 20, FairValueGapType.BULLISH)
+    bearish = make_fvg(30, 40, FairValueGapType.BEARISH)
+    tracker = FairValueGapTracker()
+    tracker.add(bullish)
+    tracker.add(bearish)
+
+    # Bullish gaps fill top down, bearish ones bottom up
+    fills = tracker.update(make_bar(1, 25, 32, 18, 25))
+    assert [(f.related_ts, f.fill_pct) for f in fills] == [
+        ((10, 20, 0), 0.2),
+        ((30, 40, 0), 0.2),
+    ]
+    # Not as deep as before: no event
+    assert tracker.update(make_bar(2, 25, 31, 19, 25)) == []
+    fills = tracker.update(make_bar(3, 25, 26, 5, 8))
+    assert [(f.related_ts, f.ts, f.fill_pct) for f in fills] == [
+        ((10, 20, 0), 3 * MINUTE_NS, 1.0)
+    ]
+    assert bullish.filled_ts == 3 * MINUTE_NS
+    assert bullish.obsolete
+    assert not bearish.obsolete
+    assert bullish not in tracker.active
+    assert bearish in tracker.active
+
+
+def test_gapped_bars_do_not_fill_what_they_jump_over():
+    bullish = make_fvg(10, 20, FairValueGapType.BULLISH)
+    bearish = make_fvg(30, 40, FairValueGapType.BEARISH)
+    tracker = FairValueGapTracker()
+    tracker.add(bullish)
+    tracker.add(bearish)
+
+    # Friday closes above both gaps, the week opens below both, and a hole in
+    # the data later jumps back over them
+    assert tracker.update(make_bar(1, 50, 52, 49, 50)) == []
+    assert tracker.update(make_bar(3 * 1440, 5, 6, 4, 5)) == []
+    assert tracker.update(make_bar(3 * 1440 + 1, 5, 7, 5, 7)) == []
+    assert tracker.update(make_bar(3 * 1440 + 30, 60, 61, 59, 60)) == []
+    assert bullish.fill_pct == bearish.fill_pct == 0.0
+    assert not bullish.obsolete and not bearish.obsolete
+    assert len(tracker.active) == 2
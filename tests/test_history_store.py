@@ -0,0 +1,139 @@
+"""Streaming a history to Parquet with HistoryWriter and reading it back."""
+
+import json
+from datetime import time
+
+from nautilus_trader.model import Price
+
+from strategy import history_store
+from strategy.confluence.fvg import FairValueGap, FairValueGapFill, FairValueGapType
+from strategy.confluence.registry import ConfluenceRegistry
+from strategy.history import StrategyHistory
+from strategy.history_store import HistoryWriter, read_history
+from strategy.key_level import KeyLevel, KeyLevels, KeyLevelTouch
+from strategy.price_range import PriceRange
+from strategy.session import (
+    SessionEntity,
+    SessionMetadata,
+    SessionState,
+    unix_nanos_to_dt,
+)
+from strategy.timeframe import Timeframe
+
+DAY_NS = 86_400 * 1_000_000_000
+HOUR_NS = 3_600 * 1_000_000_000
+N_DAYS = 5
+LONDON = SessionMetadata("London", "Europe/London", time(8, 0), time(16, 0))
+
+
+def price(value: str) -> Price:
+    return Price.from_str(value)
+
+
+def day_records(i: int) -> dict:
+    """A day's worth of records, timestamped inside day ``i``."""
+    start = (10_000 + i) * DAY_NS
+    high = KeyLevel(price(f"1.10{i}00"), "H1H", start + HOUR_NS, Timeframe.ONE_HOUR)
+    low = KeyLevel(price(f"1.09{i}00"), "PDL", start, Timeframe.ONE_DAY)
+    levels = KeyLevels()
+    levels.hour_1_high.append(high)
+    levels.prev_day_low = low
+
+    fvg = FairValueGap(
+        PriceRange(min_price=price(f"1.10{i}10"), max_price=price(f"1.10{i}30")),
+        [start + k * HOUR_NS for k in range(3)],
+        Timeframe.FIVE_MINUTE,
+        FairValueGapType.BULLISH,
+    )
+    confluences = {tf: ConfluenceRegistry() for tf in Timeframe}
+    confluences[Timeframe.FIVE_MINUTE].add([fvg])
+
+    session = SessionEntity(
+        LONDON,
+        SessionState(
+            high=price(f"1.10{i}50"),
+            low=price(f"1.09{i}50"),
+            open_utc=unix_nanos_to_dt(start + 7 * HOUR_NS),
+            close_utc=unix_nanos_to_dt(start + 15 * HOUR_NS),
+        ),
+    )
+    return {
+        "ts": start + 23 * HOUR_NS,
+        "levels": levels,
+        "confluences": confluences,
+        "session": session,
+        "touch": KeyLevelTouch(high, start + 4 * HOUR_NS, swept=i % 2 == 0),
+        "fill": FairValueGapFill(
+            Timeframe.FIVE_MINUTE, fvg.key, start + 5 * HOUR_NS, 1.0 - 0.25 * (i % 2)
+        ),
+    }
+
+
+def record(history: StrategyHistory | HistoryWriter, days: list[dict]) -> None:
+    for day in days:
+        history.add_session(day["session"])
+        history.add_key_level_touch(day["touch"])
+        history.add_fvg_fill(day["fill"])
+        history.add_day(day["ts"], day["levels"], day["confluences"])
+
+
+def as_json(history: StrategyHistory, tmp_path) -> dict:
+    path = tmp_path / "history.json"
+    history.dump_to_json_file(str(path))
+    with open(path) as f:
+        return json.load(f)
+
+
+def expected_history(days: list[dict]) -> StrategyHistory:
+    history = StrategyHistory()
+    record(history, days)
+    history.mark_touched_key_levels()
+    history.mark_fvg_fills()
+    return history
+
+
+def test_round_trip_and_time_range(tmp_path, monkeypatch):
+    written = []
+    write_part = history_store.write_part
+
+    def recording_write_part(path, name, table, part):
+        written.append((part, name))
+        write_part(path, name, table, part)
+
+    monkeypatch.setattr(history_store, "write_part", recording_write_part)
+
+    path = tmp_path / "history"
+    writer = HistoryWriter(path, batch_days=2)
+    record(writer, [day_records(i) for i in range(N_DAYS)])
+    writer.close()
+
+    # Two-day batches, the last one flushed on close
+    assert sorted((path / "days").glob("part-*.parquet")) == [
+        path / "days" / f"part-{part:06d}.parquet" for part in range(3)
+    ]
+    assert not list(path.glob("*/.part-*"))
+    # Each part's days go last, so a day only shows up once its rows are on disk
+    for part in range(3):
+        names = [name for p, name in written if p == part]
+        assert names[-1] == "days"
+
+    loaded = read_history(path)
+    expected = expected_history([day_records(i) for i in range(N_DAYS)])
+    assert as_json(loaded, tmp_path) == as_json(expected, tmp_path)
+    assert all(levels.hour_1_high[0].touched for levels in loaded.daily_key_levels)
+
+    # Days 1 and 2 only, with the sessions, touches and fills inside them
+    start_ts, end_ts = (10_001 * DAY_NS, 10_003 * DAY_NS)
+    loaded = read_history(path, start_ts, end_ts)
+    expected = expected_history([day_records(i) for i in (1, 2)])
+    assert loaded.daily_ts == expected.daily_ts
+    assert as_json(loaded, tmp_path) == as_json(expected, tmp_path)
+
+
+def test_empty_history_reads_back_empty(tmp_path):
+    writer = HistoryWriter(tmp_path / "history")
+    writer.close()
+    history = read_history(tmp_path / "history")
+    assert history.daily_ts == []
+    assert history.sessions == []
+    assert history.key_level_touches == []
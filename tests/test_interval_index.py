@@ -0,0 +1,126 @@
+"""IntervalIndex overlap queries against a linear scan."""
+
+from math import isqrt
+
+import numpy as np
+import pytest
+
+from strategy.interval_index import IntervalIndex
+
+
+class Item:
+    def __init__(self, lo: int, hi: int):
+        self.lo = lo
+        self.hi = hi
+
+    def __repr__(self) -> str:
+        return f"Item({self.lo}, {self.hi})"
+
+
+def scan(items: list[Item], lo: int, hi: int) -> list[Item]:
+    return [item for item in items if item.lo <= hi and item.hi >= lo]
+
+
+def ids(items: list[Item]) -> list[int]:
+    return sorted(id(item) for item in items)
+
+
+def make_index(items: list[Item]) -> IntervalIndex[Item]:
+    index = IntervalIndex()
+    for item in items:
+        index.add(item.lo, item.hi, item)
+    return index
+
+
+def test_add_and_remove():
+    a, b, c = Item(0, 10), Item(5, 15), Item(20, 30)
+    index = make_index([a, b, c])
+    assert len(index) == 3
+    assert ids(index.overlapping(8, 12)) == ids([a, b])
+
+    index.remove(b)
+    assert b not in index
+    assert len(index) == 2
+    assert ids(index.overlapping(8, 12)) == ids([a])
+    # Removing twice, or something never added, is a no-op
+    index.remove(b)
+    index.remove(Item(0, 0))
+    assert len(index) == 2
+    # Adding twice keeps one entry
+    index.add(a.lo, a.hi, a)
+    assert index.overlapping(0, 0) == [a]
+
+
+def test_closed_bounds_and_zero_width_intervals():
+    point, left, right = Item(10, 10), Item(0, 10), Item(10, 20)
+    index = make_index([point, left, right])
+    # Intervals touching at 10 share it
+    assert ids(index.containing(10)) == ids([point, left, right])
+    assert ids(index.overlapping(0, 9)) == ids([left])
+    assert ids(index.overlapping(11, 11)) == ids([right])
+    assert ids(index.overlapping(20, 25)) == ids([right])
+    assert index.overlapping(21, 25) == []
+    assert index.overlapping(-5, -1) == []
+
+
+@pytest.mark.parametrize("n", [7, 8, 9, 10, 40])
+def test_queries_around_the_merge_threshold(n: int):
+    # The pending buffer holds 8 entries before the first merge
+    items = [Item(i * 3, i * 3 + 4) for i in range(n)]
+    index = make_index(items)
+    assert len(index._pending) <= max(8, isqrt(len(index._items)))
+    for lo in range(-2, n * 3 + 6):
+        assert ids(index.overlapping(lo, lo + 1)) == ids(scan(items, lo, lo + 1))
+
+    # Removing from the tree and the pending buffer alike
+    for item in items[::2]:
+        index.remove(item)
+    kept = items[1::2]
+    assert len(index) == len(kept)
+    for lo in range(-2, n * 3 + 6):
+        assert ids(index.overlapping(lo, lo)) == ids(scan(kept, lo, lo))
+
+
+def test_removed_entries_do_not_come_back():
+    items = [Item(i, i + 2) for i in range(20)]
+    index = make_index(items)
+    removed = items[0]
+    assert index._removed == set()
+    # In the tree, so only marked removed
+    index.remove(removed)
+    assert id(removed) in index._removed
+    assert removed not in index.containing(1)
+
+    # Adding it back purges the stale tree entry first, so it is found once
+    index.add(removed.lo, removed.hi, removed)
+    assert index.containing(1).count(removed) == 1
+    index.remove(removed)
+    assert removed not in index.containing(1)
+
+    # Once half the tree is removed, it is rebuilt without them
+    tree_size = len(index._items)
+    for item in items[:12]:
+        index.remove(item)
+    assert len(index._items) < tree_size
+    assert len(index._removed) * 2 <= len(index._items)
+    assert ids(index.overlapping(0, 30)) == ids(items[12:])
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_linear_scan(seed: int):
+    rng = np.random.default_rng(seed)
+    index = IntervalIndex()
+    live: list[Item] = []
+    for _ in range(2_000):
+        if live and rng.random() < 0.4:
+            item = live.pop(int(rng.integers(len(live))))
+            index.remove(item)
+        else:
+            lo = int(rng.integers(0, 1_000))
+            item = Item(lo, lo + int(rng.integers(0, 30)))
+            index.add(item.lo, item.hi, item)
+            live.append(item)
+        lo = int(rng.integers(-10, 1_010))
+        hi = lo + int(rng.integers(0, 20))
+        assert ids(index.overlapping(lo, hi)) == ids(scan(live, lo, hi))
+    assert len(index) == len(live)
@@ -0,0 +1,107 @@
+"""Key level touches and sweeps in a KeyLevelBook."""
+
+from nautilus_trader.model import Price
+from nautilus_trader.model.objects import FIXED_PRECISION
+
+from strategy.bar import RawBar
+from strategy.key_level import KeyLevel, KeyLevelBook
+from strategy.timeframe import Timeframe
+
+PRECISION = 5
+TICK = 10 ** (FIXED_PRECISION - PRECISION)
+BASE = 100_000
+MINUTE_NS = 60 * 1_000_000_000
+
+
+def raw(ticks: int) -> int:
+    return (BASE + ticks) * TICK
+
+
+def make_bar(minute: int, open_: int, high: int, low: int, close: int) -> RawBar:
+    ts = minute * MINUTE_NS
+    return RawBar(
+        raw(open_), raw(high), raw(low), raw(close), ts, ts, precision=PRECISION
+    )
+
+
+def make_level(ticks: int, name: str) -> KeyLevel:
+    return KeyLevel(
+        price=Price.from_raw(raw(ticks), PRECISION),
+        name=name,
+        ts=0,
+        observed_tf=Timeframe.ONE_HOUR,
+    )
+
+
+def touched(book: KeyLevelBook, bar: RawBar) -> list[tuple[str, bool]]:
+    return [(touch.level.name, touch.swept) for touch in book.update(bar)]
+
+
+def test_highs_are_touched_or_swept_from_below():
+    book = KeyLevelBook()
+    levels = {ticks: make_level(ticks, f"H{ticks}") for ticks in (10, 12, 14, 20)}
+    for level in levels.values():
+        book.add_high(level)
+
+    assert touched(book, make_bar(1, 5, 9, 4, 8)) == []
+    # Up to 10 exactly: touched, not swept
+    assert touched(book, make_bar(2, 8, 10, 8, 10)) == [("H10", False)]
+    # Through 12 and 14, closing back below both: swept, nearest level last
+    assert touched(book, make_bar(3, 10, 15, 10, 11)) == [
+        ("H14", True),
+        ("H12", True),
+    ]
+    # Through 20 but closing at it: touched, not swept
+    assert touched(book, make_bar(4, 11, 21, 11, 20)) == [("H20", False)]
+    assert len(book) == 0
+    # Touches are marked on the levels as they happen
+    assert all(level.touched for level in levels.values())
+
+
+def test_lows_are_touched_or_swept_from_above():
+    book = KeyLevelBook()
+    levels = {ticks: make_level(ticks, f"L{ticks}") for ticks in (-10, -12, -14)}
+    for level in levels.values():
+        book.add_low(level)
+
+    # Wicks through -10 and -12 and closes back above both
+    assert touched(book, make_bar(1, 0, 1, -13, -5)) == [
+        ("L-12", True),
+        ("L-10", True),
+    ]
+    assert not levels[-14].touched
+    # Closes below -14
+    assert touched(book, make_bar(2, -5, -5, -15, -15)) == [("L-14", False)]
+    assert all(level.touched for level in levels.values())
+
+
+def test_only_the_reached_tail_is_retired():
+    book = KeyLevelBook()
+    highs = [make_level(ticks, f"H{ticks}") for ticks in (10, 20, 30)]
+    lows = [make_level(ticks, f"L{ticks}") for ticks in (-10, -20, -30)]
+    # Added out of price order, and with a duplicate price
+    for level in reversed(highs):
+        book.add_high(level)
+    for level in lows:
+        book.add_low(level)
+    duplicate = make_level(20, "H20 again")
+    book.add_high(duplicate)
+
+    # A bar reaching both sides retires from both tails
+    assert sorted(touched(book, make_bar(1, 0, 20, -10, 0))) == [
+        ("H10", True),
+        ("H20", False),
+        ("H20 again", False),
+        ("L-10", False),
+    ]
+    assert len(book) == 3
+    assert not highs[2].touched
+    assert not lows[1].touched
+    # Retired levels do not come back
+    assert touched(book, make_bar(2, 0, 20, -10, 0)) == []
+    assert sorted(touched(book, make_bar(3, 0, 40, -40, 0))) == [
+        ("H30", True),
+        ("L-20", True),
+        ("L-30", True),
+    ]
+    assert len(book) == 0
@@ -0,0 +1,34 @@
+"""Latency histograms written to JSON and read back."""
+
+import numpy as np
+
+from strategy.latency import SUMMARY_PERCENTILES, LatencyRecorder
+
+
+def test_written_histograms_read_back(tmp_path):
+    recorder = LatencyRecorder()
+    rng = np.random.default_rng(0)
+    for name in ("on_1_minute_bar", "SessionTracker.update"):
+        record = recorder.timed(name, lambda: None)
+        for _ in range(100):
+            record()
+        # Values across several magnitudes, exact and bucketed alike
+        for value in rng.lognormal(8, 2, 1_000).astype(int):
+            recorder.histograms[name].record(int(value))
+
+    path = tmp_path / "latency.json"
+    recorder.write(path)
+    loaded = LatencyRecorder.read(path)
+
+    assert loaded.summary() == recorder.summary()
+    for name, h in recorder.histograms.items():
+        got = loaded.histograms[name]
+        assert got.counts == h.counts
+        assert (got.count, got.total, got.min, got.max) == (
+            h.count,
+            h.total,
+            h.min,
+            h.max,
+        )
+        for p in SUMMARY_PERCENTILES:
+            assert got.percentile(p) == h.percentile(p)
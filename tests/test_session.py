@@ -0,0 +1,194 @@
+"""
+Session windows from a SessionCalendar against the time zone arithmetic, and the
+session extremes a SessionTracker builds from them.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from nautilus_trader.model.objects import FIXED_PRECISION
+
+from strategy.bar import RawBar
+from strategy.session import (
+    SessionCalendar,
+    SessionMetadataList,
+    SessionTracker,
+    dt_to_unix_nanos,
+    unix_nanos_to_dt,
+)
+
+SESSIONS = [s.value for s in SessionMetadataList]
+TOKYO = SessionMetadataList.TOKYO.value
+LONDON = SessionMetadataList.LONDON.value
+NEW_YORK = SessionMetadataList.NEW_YORK.value
+MINUTE_NS = 60 * 1_000_000_000
+TICK = 10 ** (FIXED_PRECISION - 5)
+
+
+def utc_ns(*args) -> int:
+    return dt_to_unix_nanos(datetime(*args, tzinfo=timezone.utc))
+
+
+def expected_window(metadata, day: date) -> tuple[int, int]:
+    open_utc, close_utc = metadata.open_close_on(day)
+    return dt_to_unix_nanos(open_utc), dt_to_unix_nanos(close_utc)
+
+
+@pytest.mark.parametrize(
+    ("metadata", "before", "after", "hours"),
+    [
+        # British Summer Time started on 2000-03-26 and ended on 2000-10-29
+        (LONDON, date(2000, 3, 24), date(2000, 3, 27), (8, 7)),
+        (LONDON, date(2000, 10, 27), date(2000, 10, 30), (7, 8)),
+        # US daylight saving time started on 2000-04-02 and ended on 2000-10-29
+        (NEW_YORK, date(2000, 3, 31), date(2000, 4, 3), (13, 12)),
+        (NEW_YORK, date(2000, 10, 27), date(2000, 10, 30), (12, 13)),
+    ],
+)
+def test_windows_follow_dst(metadata, before, after, hours):
+    calendar = SessionCalendar(SESSIONS)
+    for day, hour in zip((before, after), hours):
+        open_ts = utc_ns(day.year, day.month, day.day, hour)
+        window = calendar.window(metadata, open_ts)
+        assert window == expected_window(metadata, day)
+        assert window[0] == open_ts
+        assert calendar.window(metadata, open_ts - 1) is None
+        assert calendar.window(metadata, window[1] - 1) == window
+        assert calendar.window(metadata, window[1]) is None
+
+
+def test_windows_across_blocks_in_both_directions():
+    calendar = SessionCalendar(SESSIONS, block_days=366)
+    first = date(2000, 6, 5)
+    # The first query covers 366 days from its own day
+    calendar.window(LONDON, utc_ns(2000, 6, 5, 12))
+    last = first + timedelta(365)
+
+    days = [first, last, last + timedelta(1), first - timedelta(1)]
+    days += [first + timedelta(k) for k in range(-400, 800, 7)]
+    for day in days:
+        for metadata in SESSIONS:
+            open_ts, close_ts = expected_window(metadata, day)
+            for ts in (open_ts, close_ts - 1):
+                assert calendar.window(metadata, ts) == (open_ts, close_ts)
+                at = unix_nanos_to_dt(ts)
+                assert metadata.is_active(at, calendar)
+                assert metadata.is_active(at)
+            assert not calendar.is_active(metadata, close_ts)
+
+
+def test_next_transition_crosses_block_ends():
+    calendar = SessionCalendar(SESSIONS, block_days=366)
+    ts = utc_ns(2000, 6, 5)
+    last_day = date(2000, 6, 5) + timedelta(365)
+
+    transitions = []
+    while ts < utc_ns(2001, 6, 10):
+        ts = calendar.next_transition(ts)
+        transitions.append(ts)
+
+    # Every open and close of every session, in order, with none skipped at the
+    # end of the first block
+    expected = sorted(
+        {
+            ts
+            for k in range(-1, 372)
+            for metadata in SESSIONS
+            for ts in expected_window(metadata, date(2000, 6, 5) + timedelta(k))
+            if utc_ns(2000, 6, 5) < ts <= transitions[-1]
+        }
+    )
+    assert transitions == expected
+    assert any(
+        ts > utc_ns(last_day.year, last_day.month, last_day.day) for ts in expected
+    )
+
+
+def test_overlapping_sessions():
+    calendar = SessionCalendar(SESSIONS)
+    # In June, London is open 07:00-15:00 UTC and New York 12:00-21:00 UTC
+    ts = utc_ns(2000, 6, 6, 13)
+    assert calendar.window(LONDON, ts) == (
+        utc_ns(2000, 6, 6, 7),
+        utc_ns(2000, 6, 6, 15),
+    )
+    assert calendar.window(NEW_YORK, ts) == (
+        utc_ns(2000, 6, 6, 12),
+        utc_ns(2000, 6, 6, 21),
+    )
+    assert calendar.window(TOKYO, ts) is None
+    # London closes while New York stays open
+    assert calendar.next_transition(ts) == utc_ns(2000, 6, 6, 15)
+    assert calendar.is_active(NEW_YORK, utc_ns(2000, 6, 6, 15))
+    assert not calendar.is_active(LONDON, utc_ns(2000, 6, 6, 15))
+
+
+def make_bars(start: int, minutes: int, seed: int) -> list[RawBar]:
+    """1-minute bars closing every minute after ``start``, on a random walk."""
+    rng = np.random.default_rng(seed)
+    bars = []
+    close = 110_000
+    for i in range(1, minutes + 1):
+        open_ = close
+        close = open_ + int(rng.integers(-5, 6))
+        high = max(open_, close) + int(rng.integers(0, 4))
+        low = min(open_, close) - int(rng.integers(0, 4))
+        ts = start + i * MINUTE_NS
+        bars.append(RawBar(*(p * TICK for p in (open_, high, low, close)), ts, ts, 5))
+    return bars
+
+
+def test_tracker_matches_a_scan_of_each_window():
+    start = utc_ns(2000, 6, 5)
+    bars = make_bars(start, 3 * 1440, seed=0)
+    tracker = SessionTracker(SESSIONS, SessionCalendar(SESSIONS))
+    closed = [session for bar in bars for session in tracker.update(bar)]
+
+    expected = []
+    for k in range(-1, 4):
+        for metadata in SESSIONS:
+            open_ts, close_ts = expected_window(
+                metadata, date(2000, 6, 5) + timedelta(k)
+            )
+            # A bar closing at ts covers the minute before it
+            inside = [b for b in bars if open_ts <= b.ts_event - 1 < close_ts]
+            # Only sessions closed before the last bar are reported
+            if not inside or close_ts > bars[-1].ts_event - 1:
+                continue
+            expected.append(
+                (
+                    metadata.name,
+                    open_ts,
+                    close_ts,
+                    max(b.high for b in inside),
+                    min(b.low for b in inside),
+                )
+            )
+
+    got = [
+        (
+            session.metadata.name,
+            dt_to_unix_nanos(session.state.open_utc),
+            dt_to_unix_nanos(session.state.close_utc),
+            session.state.high.raw,
+            session.state.low.raw,
+        )
+        for session, _ in closed
+    ]
+    assert sorted(got) == sorted(expected)
+    # Overlapping London and New York sessions are both there every day
+    names = [row[0] for row in got]
+    assert names.count("London") == names.count("New York") == 3
+
+
+def test_first_tokyo_session_opens_at_its_scheduled_time():
+    # 09:00 in Tokyo is midnight UTC. The session is recorded from its scheduled
+    # open, not from the first hourly bar seen inside it
+    start = utc_ns(2000, 6, 5)
+    tracker = SessionTracker([TOKYO], SessionCalendar([TOKYO]))
+    closed = [s for bar in make_bars(start, 1440, seed=1) for s in tracker.update(bar)]
+    session, window = closed[0]
+    assert session.state.open_utc == datetime(2000, 6, 5, 0, tzinfo=timezone.utc)
+    assert session.state.close_utc == datetime(2000, 6, 5, 9, tzinfo=timezone.utc)
+    assert window == (start, utc_ns(2000, 6, 5, 9))
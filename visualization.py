@@ -1,97 +1,294 @@
-from datetime import datetime, timezone
+from datetime import timedelta
+from os import PathLike
+
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
+from nautilus_trader.analysis.themes import get_theme
+from nautilus_trader.backtest.engine import BacktestEngine
 from nautilus_trader.model import InstrumentId
 from nautilus_trader.model.data import Bar, BarType
-from nautilus_trader.analysis.tearsheet import create_bars_with_fills
-from nautilus_trader.backtest.engine import BacktestEngine
-from strategy.timeframe import Timeframe
+from nautilus_trader.model.objects import FIXED_SCALAR
+
+from catalog_setup import catalog_bar_dir, read_catalog_bar_arrays
 from strategy.history import StrategyHistory
+from strategy.timeframe import Timeframe
+
+# Candles a timeframe trace keeps outside the detail window in LOD mode
+LOD_MAX_POINTS = 5_000
+OHLC_COLUMNS = ["open", "high", "low", "close"]
+
+
+def bar_arrays(bars: list[Bar]) -> dict[str, np.ndarray]:
+    """Bars as oldest first ``ts_init`` and float OHLC columns."""
+    bars = sorted(bars, key=lambda b: b.ts_init)
+    arrays = {"ts_init": np.fromiter((b.ts_init for b in bars), np.int64, len(bars))}
+    for name in OHLC_COLUMNS:
+        raw = np.fromiter((getattr(b, name).raw for b in bars), np.int64, len(bars))
+        arrays[name] = raw / FIXED_SCALAR
+    return arrays
+
+
+def catalog_bar_arrays(
+    catalog_path: PathLike[str] | str,
+    bar_type: BarType,
+    start: int | None = None,
+    end: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Like ``bar_arrays`` for the catalog bars of ``bar_type`` in [start, end]."""
+    raw = read_catalog_bar_arrays(catalog_path, bar_type, OHLC_COLUMNS, start, end)
+    arrays = {"ts_init": raw["ts_init"]}
+    for name in OHLC_COLUMNS:
+        arrays[name] = raw[name] / FIXED_SCALAR
+    return arrays
+
+
+def decimate_ohlc(arrays: dict[str, np.ndarray], step: int) -> dict[str, np.ndarray]:
+    """
+    Merge every ``step`` consecutive bars into one, keeping their OHLC.
+
+    A merged bar opens at the first bar's open, closes at the last one's close
+    and is stamped with its ``ts_init``, spanning the highest high and lowest
+    low in between, so no extreme is lost however coarse the level.
+    """
+    n = len(arrays["ts_init"])
+    if step <= 1 or n == 0:
+        return arrays
+    starts = np.arange(0, n, step)
+    ends = np.minimum(starts + step, n) - 1
+    return {
+        "ts_init": arrays["ts_init"][ends],
+        "open": arrays["open"][starts],
+        "high": np.maximum.reduceat(arrays["high"], starts),
+        "low": np.minimum.reduceat(arrays["low"], starts),
+        "close": arrays["close"][ends],
+    }
+
+
+def lod_ohlc(
+    arrays: dict[str, np.ndarray],
+    max_points: int,
+    detail_window: tuple[int, int] | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Decimate bars to about ``max_points`` candles over their whole range.
+
+    Bars inside ``detail_window``, given as ``(start, end)`` nanoseconds, are
+    kept at full resolution on top of that budget.
+    """
+    ts = arrays["ts_init"]
+    if detail_window is None:
+        lo = hi = len(ts)
+    else:
+        lo = np.searchsorted(ts, detail_window[0], side="left")
+        hi = np.searchsorted(ts, detail_window[1], side="right")
+    outside = len(ts) - (hi - lo)
+    step = -(-outside // max_points) if outside > 0 else 1
+    parts = [
+        decimate_ohlc({k: v[:lo] for k, v in arrays.items()}, step),
+        {k: v[lo:hi] for k, v in arrays.items()},
+        decimate_ohlc({k: v[hi:] for k, v in arrays.items()}, step),
+    ]
+    return {k: np.concatenate([part[k] for part in parts]) for k in arrays}
+
+
+def _ms(ts: np.ndarray) -> np.ndarray:
+    # Plotly reads numbers on a date axis as epoch milliseconds, and ships
+    # float arrays base64 encoded rather than as decimal text
+    return np.asarray(ts, dtype=np.int64) / 1e6
+
+
+def _prices(prices: np.ndarray) -> np.ndarray:
+    # Seven significant digits still round back to any price tick a chart shows,
+    # at half the bytes of float64
+    return prices.astype(np.float32)
+
+
+def _segments(
+    start: np.ndarray, end: np.ndarray, y: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Horizontal segments as NaN-separated x/y arrays for one line trace."""
+    gap = np.full(len(start), np.nan)
+    x = np.stack([_ms(start), _ms(end), gap], axis=1).ravel()
+    y = np.broadcast_to(np.asarray(y, dtype=np.float64), len(start))
+    return x, np.stack([y, y, gap], axis=1).ravel()
+
+
+def _boxes(
+    start: np.ndarray, end: np.ndarray, low: np.ndarray, high: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Rectangles as NaN-separated polygons for one ``fill="toself"`` trace."""
+    gap = np.full(len(start), np.nan)
+    start, end = _ms(start), _ms(end)
+    low = np.broadcast_to(np.asarray(low, dtype=np.float64), len(start))
+    high = np.broadcast_to(np.asarray(high, dtype=np.float64), len(start))
+    x = np.stack([start, end, end, start, gap], axis=1).ravel()
+    y = np.stack([low, low, high, high, gap], axis=1).ravel()
+    return x, y
 
 
 class ChartBuilder:
+    """
+    Candles of every timeframe with the strategy's history overlaid.
+
+    Bars are read from ``catalog_path`` over [start, end] when given, the
+    backtest range by default, falling back to the engine's cache, which only
+    keeps its latest bars. Without an engine there are no order fills. In
+    LOD mode, the default, each timeframe is decimated to ``max_points``
+    candles, so long runs stay light in the browser. Only bars inside
+    ``detail_window`` are shipped at full resolution, and the chart opens on
+    that window. A saved chart has that one coarse level, whatever range is in
+    view; ``chart_server.py`` builds each visible range at its own level on
+    demand instead.
+    """
+
     def __init__(
         self,
-        engine: BacktestEngine,
+        engine: BacktestEngine | None,
         base_bar_type: BarType,
         title: str = "Strategy Chart",
+        lod: bool = True,
+        max_points: int = LOD_MAX_POINTS,
+        detail_window: tuple[str, str] | None = None,
+        catalog_path: PathLike[str] | str | None = None,
+        start: int | None = None,
+        end: int | None = None,
     ):
         self.engine = engine
         self.base_bar_type = base_bar_type
-        self.fig = create_bars_with_fills(
-            engine=engine,
-            bar_type=base_bar_type,
+        self.lod = lod
+        self.max_points = max_points
+        self.detail_window = (
+            None
+            if detail_window is None
+            else (
+                pd.Timestamp(detail_window[0], tz="UTC").value,
+                pd.Timestamp(detail_window[1], tz="UTC").value,
+            )
+        )
+        self.catalog_path = catalog_path
+        if engine is not None and engine.backtest_start is not None:
+            start = engine.backtest_start.value if start is None else start
+            end = engine.backtest_end.value if end is None else end
+        self.start, self.end = start, end
+        # "1-MINUTE-LAST" -> Timeframe.ONE_MINUTE
+        self.base_tf = Timeframe(str(base_bar_type.spec).rsplit("-", 1)[0])
+        self.theme = get_theme("plotly_white")
+
+        self.fig = go.Figure()
+        self.fig.update_layout(
             title=title,
+            yaxis_title="Price",
+            template=self.theme["template"],
+            height=800,
+            showlegend=True,
+            xaxis={"type": "date", "title": "Time", "rangeslider": {"visible": True}},
         )
-        # Dictionary to keep track of trace indices for each timeframe
-        # The default 1-minute traces are already added by create_bars_with_fills
-        self.trace_indices = {Timeframe.ONE_MINUTE: list(range(len(self.fig.data)))}
-        self.persistent_indices = []
+        self.fig.update_yaxes(fixedrange=False)
+        if self.detail_window is not None:
+            self.fig.update_xaxes(range=_ms(np.array(self.detail_window)).tolist())
 
-        # Initialize mix/max with initial 1m data if available
-        # Note: Plotly figures from `create_bars_with_fills` should have data.
-        # We'll refine this in add_timeframes.
         self.min_y = float("inf")
         self.max_y = float("-inf")
+        # Gaps that never got filled stay open until the last base bar
+        self.end_ts = None
+
+        bars = self._load_bars(self.base_tf, base_bar_type)
+        if len(bars["ts_init"]) > 0:
+            self.end_ts = int(bars["ts_init"][-1])
+            self.fig.add_trace(self._candles(bars, name="OHLC", showlegend=False))
+        self._add_fills()
+
+        # Dictionary to keep track of trace indices for each timeframe
+        # The base candles and the order fills toggle together
+        self.trace_indices = {self.base_tf: list(range(len(self.fig.data)))}
+        self.persistent_indices = []
+
+    def _load_bars(self, tf: Timeframe, bar_type: BarType) -> dict[str, np.ndarray]:
+        if self.catalog_path is not None:
+            external = tf.to_external_bar_type(bar_type.instrument_id)
+            if catalog_bar_dir(self.catalog_path, external).exists():
+                return catalog_bar_arrays(
+                    self.catalog_path, external, self.start, self.end
+                )
+        if self.engine is None:
+            return bar_arrays([])
+        return bar_arrays(self.engine.cache.bars(bar_type))
+
+    def _candles(self, arrays: dict[str, np.ndarray], **kwargs) -> go.Candlestick:
+        # Update Global Min/Max
+        self.min_y = min(self.min_y, float(arrays["low"].min()))
+        self.max_y = max(self.max_y, float(arrays["high"].max()))
+
+        if self.lod:
+            arrays = lod_ohlc(arrays, self.max_points, self.detail_window)
+        return go.Candlestick(
+            x=_ms(arrays["ts_init"]),
+            open=_prices(arrays["open"]),
+            high=_prices(arrays["high"]),
+            low=_prices(arrays["low"]),
+            close=_prices(arrays["close"]),
+            **kwargs,
+        )
 
-        # Capture initial range from existing traces if possible
-        for trace in self.fig.data:
-            if hasattr(trace, "close") and trace.close is not None:
-                # Approximate with available data
-                self.min_y = min(self.min_y, min(trace.low))
-                self.max_y = max(self.max_y, max(trace.high))
+    def _add_fills(self):
+        if self.engine is None:
+            return
+        fills = self.engine.trader.generate_order_fills_report()
+        if fills.empty:
+            return
+        fills = fills[fills["instrument_id"] == str(self.base_bar_type.instrument_id)]
+
+        colors = self.theme["colors"]
+        for side, symbol, color, name in (
+            ("BUY", "triangle-up", colors["positive"], "Buy Fills"),
+            ("SELL", "triangle-down", colors["negative"], "Sell Fills"),
+        ):
+            side_fills = fills[fills["side"] == side]
+            if side_fills.empty:
+                continue
+            ts = pd.DatetimeIndex(pd.to_datetime(side_fills["ts_init"], utc=True))
+            self.fig.add_trace(
+                go.Scatter(
+                    x=_ms(ts.asi8),
+                    y=pd.to_numeric(side_fills["avg_px"]).to_numpy(np.float64),
+                    customdata=pd.to_numeric(side_fills["filled_qty"]).to_numpy(),
+                    mode="markers",
+                    marker_symbol=symbol,
+                    marker_size=13,
+                    marker_line_width=2,
+                    marker_line_color="rgba(0,0,0,0.7)",
+                    marker_color=color,
+                    opacity=0.7,
+                    name=name,
+                    hovertemplate=(
+                        "<b>%{x}</b><br>Price: %{y}<br>"
+                        "Quantity: %{customdata}<extra></extra>"
+                    ),
+                )
+            )
 
     def add_timeframes(self, timeframes: list[Timeframe], instrument_id: InstrumentId):
         for tf in timeframes:
-            if tf == Timeframe.ONE_MINUTE:
-                # Update min/max from likely existing 1m traces if we haven't successfully yet
-                # ...but simpler to just do it when we process bars.
-                # However, 1m bars are already in self.fig.
-                # Optimization: We already probably set min/max in __init__.
+            if tf == self.base_tf:
+                # Base bars are already in self.fig
                 continue
 
             bt = tf.to_bar_type(instrument_id)
 
-            # Fetch bars from the engine
-            bars: list[Bar] = []
-            if hasattr(self.engine, "cache"):
-                try:
-                    bars = self.engine.cache.bars(bt)
-                except Exception as e:
-                    print(f"Failed to get bars from engine.cache for {tf}: {e}")
+            # Fetch bars from the catalog or the engine
+            bars = bar_arrays([])
+            try:
+                bars = self._load_bars(tf, bt)
+            except Exception as e:
+                print(f"Failed to get bars for {tf}: {e}")
 
-            if not bars:
+            if len(bars["ts_init"]) == 0:
                 print(f"No bars found for {tf.value}")
                 continue
 
-            # Extract data
-            opens = [float(b.open) for b in bars]
-            highs = [float(b.high) for b in bars]
-            lows = [float(b.low) for b in bars]
-            closes = [float(b.close) for b in bars]
-
-            # Update Global Min/Max
-            current_min = min(lows)
-            current_max = max(highs)
-            self.min_y = min(self.min_y, current_min)
-            self.max_y = max(self.max_y, current_max)
-
-            times = [
-                datetime.fromtimestamp(b.ts_init / 1_000_000_000, tz=timezone.utc)
-                for b in bars
-            ]
-
             # Add trace
-            self.fig.add_trace(
-                go.Candlestick(
-                    x=times,
-                    open=opens,
-                    high=highs,
-                    low=lows,
-                    close=closes,
-                    name=tf.value,
-                    visible=False,
-                )
-            )
+            self.fig.add_trace(self._candles(bars, name=tf.value, visible=False))
 
             self.trace_indices[tf] = [len(self.fig.data) - 1]
 
@@ -105,14 +302,28 @@ class ChartBuilder:
         y_low_bg = self.min_y - margin
         y_high_bg = self.max_y + margin
 
-        # Track which groups we've added to show legend only once per group
-        added_legend_groups = set()
+        # One trace per session name for the backgrounds and per name and
+        # side for the high/low lines, each session a NaN-separated segment
+        # structure: name -> {open: [], close: [], high: [], low: []}
+        aggregated_data = {}
 
         for session in history.sessions:
             if not session.state.open_utc or not session.state.close_utc:
                 continue
 
             name = session.metadata.name
+            if name not in aggregated_data:
+                aggregated_data[name] = {
+                    part: [] for part in ("open", "close", "high", "low")
+                }
+            data = aggregated_data[name]
+            data["open"].append(pd.Timestamp(session.state.open_utc).value)
+            data["close"].append(pd.Timestamp(session.state.close_utc).value)
+            for part in ("high", "low"):
+                price = getattr(session.state, part)
+                data[part].append(float(price) if price else np.nan)
+
+        for name, data in aggregated_data.items():
             color = "rgba(0, 0, 255, 0.1)"
             if name == "Tokyo":
                 color = "rgba(255, 0, 0, 0.1)"
@@ -121,65 +332,49 @@ class ChartBuilder:
             elif name == "New York":
                 color = "rgba(0, 0, 255, 0.1)"
 
-            show_legend = name not in added_legend_groups
-            added_legend_groups.add(name)
+            open_ts = np.array(data["open"], dtype=np.int64)
+            close_ts = np.array(data["close"], dtype=np.int64)
 
-            # Background Rectangle as a Scatter Trace
+            # Background Rectangles
+            x, y = _boxes(open_ts, close_ts, y_low_bg, y_high_bg)
             self.fig.add_trace(
                 go.Scatter(
-                    x=[
-                        session.state.open_utc,
-                        session.state.close_utc,
-                        session.state.close_utc,
-                        session.state.open_utc,
-                    ],
-                    y=[y_low_bg, y_low_bg, y_high_bg, y_high_bg],
+                    x=x,
+                    y=y,
                     fill="toself",
                     fillcolor=color,
                     mode="none",
                     name=name,
                     legendgroup=name,
-                    showlegend=show_legend,
+                    showlegend=True,
                     hoverinfo="skip",
                 )
             )
             self.persistent_indices.append(len(self.fig.data) - 1)
 
-            # Session High Line
-            if session.state.high:
-                self.fig.add_trace(
-                    go.Scatter(
-                        x=[session.state.open_utc, session.state.close_utc],
-                        y=[float(session.state.high), float(session.state.high)],
-                        mode="lines",
-                        line=dict(color="green", width=1, dash="dash"),
-                        name=f"{name} High",
-                        legendgroup=name,
-                        showlegend=False,  # Controlled by main group
-                        hoverinfo="name+y",
-                    )
-                )
-                self.persistent_indices.append(len(self.fig.data) - 1)
-
-            # Session Low Line
-            if session.state.low:
+            # Session High/Low Lines
+            for part, line_color in (("high", "green"), ("low", "red")):
+                price = np.array(data[part])
+                known = ~np.isnan(price)
+                if not known.any():
+                    continue
+                x, y = _segments(open_ts[known], close_ts[known], price[known])
                 self.fig.add_trace(
-                    go.Scatter(
-                        x=[session.state.open_utc, session.state.close_utc],
-                        y=[float(session.state.low), float(session.state.low)],
+                    go.Scattergl(
+                        x=x,
+                        y=y,
                         mode="lines",
-                        line=dict(color="red", width=1, dash="dash"),
-                        name=f"{name} Low",
+                        line=dict(color=line_color, width=1, dash="dash"),
+                        name=f"{name} {part.capitalize()}",
                         legendgroup=name,
                         showlegend=False,  # Controlled by main group
                         hoverinfo="name+y",
+                        connectgaps=False,
                     )
                 )
                 self.persistent_indices.append(len(self.fig.data) - 1)
 
     def add_key_levels(self, history: StrategyHistory):
-        from datetime import timedelta
-
         # Helper to map Timeframe to timedelta duration
         def get_duration(tf_value):
             if tf_value == "1-MINUTE":
@@ -197,7 +392,7 @@ class ChartBuilder:
             return timedelta(hours=1)  # Default fallback
 
         # Aggregate data by (name, timeframe_value) to create single traces
-        # structure: key -> {x: [], y: [], color: str}
+        # structure: key -> {ts: [], price: [], color: str}
         aggregated_data = {}
 
         def collect_level(kl, color):
@@ -206,15 +401,10 @@ class ChartBuilder:
 
             key = (kl.name, kl.observed_tf.value)
             if key not in aggregated_data:
-                aggregated_data[key] = {"x": [], "y": [], "color": color}
+                aggregated_data[key] = {"ts": [], "price": [], "color": color}
 
-            start_time = datetime.fromtimestamp(kl.ts / 1_000_000_000, tz=timezone.utc)
-            duration = get_duration(kl.observed_tf.value)
-            end_time = start_time + duration
-
-            # Add segment followed by None to break the line
-            aggregated_data[key]["x"].extend([start_time, end_time, None])
-            aggregated_data[key]["y"].extend([float(kl.price), float(kl.price), None])
+            aggregated_data[key]["ts"].append(kl.ts)
+            aggregated_data[key]["price"].append(float(kl.price))
 
         for levels in history.daily_key_levels:
             # Previous Day High/Low
@@ -237,10 +427,13 @@ class ChartBuilder:
 
         # Create traces from aggregated data
         for (name, tf_value), data in aggregated_data.items():
+            start = np.array(data["ts"], dtype=np.int64)
+            duration = pd.Timedelta(get_duration(tf_value)).value
+            x, y = _segments(start, start + duration, np.array(data["price"]))
             self.fig.add_trace(
-                go.Scatter(
-                    x=data["x"],
-                    y=data["y"],
+                go.Scattergl(
+                    x=x,
+                    y=y,
                     mode="lines",
                     line=dict(color=data["color"], width=2),
                     name=f"{name} ({tf_value})",
@@ -252,78 +445,86 @@ class ChartBuilder:
             )
             self.persistent_indices.append(len(self.fig.data) - 1)
 
-    def add_confluences(self, history: StrategyHistory):
+    def add_confluences(
+        self, history: StrategyHistory, timeframes: list[Timeframe] | None = None
+    ):
         from strategy.confluence.fvg import FairValueGapType
 
+        # One trace of NaN-separated boxes per timeframe and direction
+        # structure: (tf, type) -> {start: [], end: [], min: [], max: []}
+        aggregated_data = {}
+
         for daily in history.daily_confluences:
             for tf, registry in daily.items():
+                if timeframes is not None and tf not in timeframes:
+                    continue
                 for fvg in registry.fvgs:
-                    sorted_ts = sorted(fvg.related_ts)
-                    formation_start_ts = sorted_ts[0]
-                    formation_end_ts = sorted_ts[-1]
-
-                    # Convert to datetime
-                    formation_start_time = datetime.fromtimestamp(
-                        formation_start_ts / 1_000_000_000, tz=timezone.utc
-                    )
-                    formation_end_time = datetime.fromtimestamp(
-                        formation_end_ts / 1_000_000_000, tz=timezone.utc
-                    )
-                    # Determine color
-                    color = "rgba(0, 255, 0, 0.2)"  # Bullish Green
-                    if fvg.type == FairValueGapType.BEARISH:
-                        color = "rgba(255, 0, 0, 0.2)"  # Bearish Red
-
-                    formation_duration = formation_end_time - formation_start_time
-                    forward_extension = formation_duration * 5
-
-                    plot_start_time = formation_start_time
-                    plot_end_time = formation_end_time + forward_extension
-
-                    min_price = float(fvg.range.min_price)
-                    max_price = float(fvg.range.max_price)
-
-                    self.fig.add_trace(
-                        go.Scatter(
-                            x=[
-                                plot_start_time,
-                                plot_end_time,
-                                plot_end_time,
-                                plot_start_time,
-                            ],
-                            y=[min_price, min_price, max_price, max_price],
-                            fill="toself",
-                            fillcolor=color,
-                            mode="none",
-                            name=f"FVG {fvg.type.value}",
-                            legendgroup=f"FVG {tf.value}",
-                            showlegend=False,
-                            hoverinfo="name+y",
-                        )
-                    )
+                    formation_start_ts = min(fvg.related_ts)
+                    formation_end_ts = max(fvg.related_ts)
+
+                    if fvg.filled_ts is not None:
+                        plot_end_ts = fvg.filled_ts
+                    elif self.end_ts is not None:
+                        plot_end_ts = max(self.end_ts, formation_end_ts)
+                    else:
+                        formation_duration = formation_end_ts - formation_start_ts
+                        plot_end_ts = formation_end_ts + formation_duration * 5
+
+                    key = (tf, fvg.type)
+                    if key not in aggregated_data:
+                        aggregated_data[key] = {
+                            part: [] for part in ("start", "end", "min", "max")
+                        }
+                    data = aggregated_data[key]
+                    data["start"].append(formation_start_ts)
+                    data["end"].append(plot_end_ts)
+                    data["min"].append(float(fvg.range.min_price))
+                    data["max"].append(float(fvg.range.max_price))
+
+        for (tf, fvg_type), data in aggregated_data.items():
+            # Determine color
+            color = "rgba(0, 255, 0, 0.2)"  # Bullish Green
+            if fvg_type == FairValueGapType.BEARISH:
+                color = "rgba(255, 0, 0, 0.2)"  # Bearish Red
+
+            x, y = _boxes(
+                np.array(data["start"], dtype=np.int64),
+                np.array(data["end"], dtype=np.int64),
+                np.array(data["min"]),
+                np.array(data["max"]),
+            )
+            self.fig.add_trace(
+                go.Scatter(
+                    x=x,
+                    y=y,
+                    fill="toself",
+                    fillcolor=color,
+                    mode="none",
+                    name=f"FVG {fvg_type.value}",
+                    legendgroup=f"FVG {tf.value}",
+                    showlegend=False,
+                    hoverinfo="name+y",
+                )
+            )
 
-                    self.trace_indices[tf].append(len(self.fig.data) - 1)
+            self.trace_indices.setdefault(tf, []).append(len(self.fig.data) - 1)
 
     def _add_updatemenus(self):
         buttons = []
 
         # Collect all trace indices that belong to Timeframes (the ones we want to toggle via buttons)
-        all_tf_indices = []
-        for indices in self.trace_indices.values():
-            all_tf_indices.extend(indices)
-        all_tf_indices.sort()
+        all_tf_indices = sorted(
+            idx for indices in self.trace_indices.values() for idx in indices
+        )
+        # Position of each global index in 'all_tf_indices'
+        position = {global_idx: i for i, global_idx in enumerate(all_tf_indices)}
 
         for tf, indices in self.trace_indices.items():
             # Create visibility list ONLY for the timeframe traces
             # The length and order must match 'all_tf_indices' which we will pass as the 'traces' arg
-
-            # Map global index to boolean
-            visible_status = []
-            for global_idx in all_tf_indices:
-                if global_idx in indices:
-                    visible_status.append(True)
-                else:
-                    visible_status.append(False)
+            visible_status = np.zeros(len(all_tf_indices), dtype=bool)
+            visible_status[[position[idx] for idx in indices]] = True
+            visible_status = visible_status.tolist()
 
             buttons.append(
                 dict(
@@ -0,0 +1,133 @@
+"""
+Date-sharded backtests with stitched results.
+
+The requested range is cut into shards that run in parallel through the sweep
+runner. Each shard starts ``warmup_days`` early and runs ``tail_days`` past its
+end, so the previous-day bar, key levels, session state and FVG windows are
+already built at the shard's first bar, and sessions opened just before its end
+still get closed. The strategy only records days and sessions that start inside
+the shard's own window, so stitching the shard histories end to end gives the
+same history as a single serial run over the whole range.
+
+Key levels, session extremes and FVGs are tracked until price reaches them,
+which can take longer than the warmup. A shard never sees levels or gaps from
+before its warmup, so touches, sweeps and fills of those are missing from the
+stitched history unless ``warmup_days`` covers their lifetime.
+
+Fills are stitched the same way, by keeping each shard's fills inside its own
+window. Positions held across a shard edge are not carried over to the next
+shard, so equivalence only holds for the fills while the strategy is flat at
+shard edges.
+"""
+
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from strategy.history import StrategyHistory
+from strategy.history_store import read_history, write_history
+from sweep import SweepRun, run_sweep
+
+ROOT = Path(__file__).parent
+WALK_FORWARD_DIR = ROOT / "walkforward"
+
+
+def make_shards(
+    start: str,
+    end: str,
+    shard_days: int = 7,
+    warmup_days: int = 7,
+    tail_days: int = 3,
+) -> list[SweepRun]:
+    start_ts = pd.Timestamp(start, tz="UTC")
+    end_ts = pd.Timestamp(end, tz="UTC")
+    shards = []
+    shard_start = start_ts
+    while shard_start < end_ts:
+        shard_end = min(shard_start + pd.Timedelta(days=shard_days), end_ts)
+        shards.append(
+            SweepRun(
+                run_id=f"shard-{len(shards):04d}",
+                start_time=(shard_start - pd.Timedelta(days=warmup_days)).isoformat(),
+                end_time=(shard_end + pd.Timedelta(days=tail_days)).isoformat(),
+                params={
+                    "record_start_ns": shard_start.value,
+                    "record_end_ns": shard_end.value,
+                },
+            )
+        )
+        shard_start = shard_end
+    return shards
+
+
+def stitch_histories(history_paths: list[Path]) -> StrategyHistory:
+    stitched = StrategyHistory()
+    for path in history_paths:
+        history = read_history(path)
+        for session in history.sessions:
+            stitched.add_session(session)
+        for ts, key_levels, confluences in zip(
+            history.daily_ts, history.daily_key_levels, history.daily_confluences
+        ):
+            stitched.add_day(ts, key_levels, confluences)
+        for touch in history.key_level_touches:
+            stitched.add_key_level_touch(touch)
+        for fill in history.fvg_fills:
+            stitched.add_fvg_fill(fill)
+    stitched.mark_touched_key_levels()
+    stitched.mark_fvg_fills()
+    return stitched
+
+
+def stitch_fills(shards: list[SweepRun], output_dir: Path) -> pd.DataFrame:
+    frames = []
+    for shard in shards:
+        fills = pd.read_parquet(output_dir / shard.run_id / "fills.parquet")
+        if fills.empty:
+            continue
+        ts = pd.to_datetime(fills["ts_event"], utc=True)
+        start = pd.Timestamp(shard.params["record_start_ns"], tz="UTC")
+        end = pd.Timestamp(shard.params["record_end_ns"], tz="UTC")
+        frames.append(fills[(ts >= start) & (ts < end)])
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames)
+
+
+def run_walk_forward(
+    shards: list[SweepRun],
+    output_dir: Path = WALK_FORWARD_DIR,
+    max_workers: int | None = None,
+) -> tuple[StrategyHistory, pd.DataFrame]:
+    results = run_sweep(shards, output_dir, max_workers)
+    if "error" in results and results["error"].notna().any():
+        raise RuntimeError(f"Shards failed:\n{results[results['error'].notna()]}")
+
+    history = stitch_histories([output_dir / s.run_id / "history" for s in shards])
+    write_history(history, output_dir / "history")
+
+    fills = stitch_fills(shards, output_dir)
+    fills.to_parquet(output_dir / "fills.parquet")
+    return history, fills
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--start", default="2000-06-05")
+    parser.add_argument("--end", default="2000-12-29")
+    parser.add_argument("--shard-days", type=int, default=7)
+    parser.add_argument("--warmup-days", type=int, default=7)
+    parser.add_argument("--tail-days", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=WALK_FORWARD_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    shards = make_shards(
+        args.start, args.end, args.shard_days, args.warmup_days, args.tail_days
+    )
+    history, fills = run_walk_forward(shards, args.output, args.workers)
+    print(
+        f"Stitched {len(shards)} shards: {len(history.daily_ts)} days, "
+        f"{len(history.sessions)} sessions, {len(fills)} fills"
+    )